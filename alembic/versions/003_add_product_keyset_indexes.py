@@ -0,0 +1,27 @@
+"""Add composite indexes for product keyset pagination
+
+Revision ID: 003_product_keyset_idx
+Revises: 002_add_client_id
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003_product_keyset_idx'
+down_revision = '002_add_client_id'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add (name, id_key) and (price, id_key) indexes used by cursor pagination"""
+    op.create_index('ix_products_name_id_key', 'products', ['name', 'id_key'], unique=False)
+    op.create_index('ix_products_price_id_key', 'products', ['price', 'id_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove product keyset pagination indexes"""
+    op.drop_index('ix_products_price_id_key', table_name='products')
+    op.drop_index('ix_products_name_id_key', table_name='products')
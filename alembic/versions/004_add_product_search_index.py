@@ -0,0 +1,46 @@
+"""Add accent-insensitive trigram index for product search
+
+Revision ID: 004_product_search_idx
+Revises: 003_product_keyset_idx
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004_product_search_idx'
+down_revision = '003_product_keyset_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add pg_trgm GIN index over f_unaccent(lower(name)) (Postgres only)"""
+    if op.get_bind().dialect.name != 'postgresql':
+        # Other databases use the in-process index in utils/search.py
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() is only STABLE; an IMMUTABLE wrapper can be used in an index
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """)
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_products_name_search
+        ON products USING gin (f_unaccent(lower(name)) gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    """Remove product search index and helper function"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_products_name_search")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,26 @@
+"""Add lower(name) functional index for checkout product resolution
+
+Revision ID: 005_product_lower_name_idx
+Revises: 004_product_search_idx
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_product_lower_name_idx'
+down_revision = '004_product_search_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add index over lower(name), used by case-insensitive name lookups"""
+    op.create_index('ix_products_lower_name', 'products', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade() -> None:
+    """Remove lower(name) index"""
+    op.drop_index('ix_products_lower_name', table_name='products')
@@ -0,0 +1,29 @@
+"""Flag products created by the checkout as placeholders
+
+Revision ID: 006_product_placeholder
+Revises: 005_product_lower_name_idx
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_product_placeholder'
+down_revision = '005_product_lower_name_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add products.placeholder (existing products are catalog products)"""
+    op.add_column(
+        'products',
+        sa.Column('placeholder', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    """Remove products.placeholder"""
+    op.drop_column('products', 'placeholder')
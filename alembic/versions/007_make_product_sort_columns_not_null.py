@@ -0,0 +1,30 @@
+"""Make products.name and products.price NOT NULL
+
+Revision ID: 007_product_sort_not_null
+Revises: 006_product_placeholder
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_product_sort_not_null'
+down_revision = '006_product_placeholder'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Backfill missing names and prices, then forbid NULL in the keyset sort columns"""
+    op.execute("UPDATE products SET name = 'Producto ' || id_key WHERE name IS NULL")
+    op.execute("UPDATE products SET price = 0 WHERE price IS NULL")
+    op.alter_column('products', 'name', existing_type=sa.String(), nullable=False)
+    op.alter_column('products', 'price', existing_type=sa.Float(), nullable=False)
+
+
+def downgrade() -> None:
+    """Allow NULL names and prices again"""
+    op.alter_column('products', 'price', existing_type=sa.Float(), nullable=True)
+    op.alter_column('products', 'name', existing_type=sa.String(), nullable=True)
@@ -21,8 +21,64 @@ class CacheConfig:
     DEFAULT_TTL = 300  # 5 minutes
     PRODUCT_LIST_TTL = 300  # 5 minutes
     PRODUCT_ITEM_TTL = 300  # 5 minutes
+    PRODUCT_COUNT_TTL = 60  # 1 minute (also cleared by every product write and stock reservation)
     CATEGORY_LIST_TTL = 3600  # 1 hour (rarely changes)
     CATEGORY_ITEM_TTL = 3600  # 1 hour
+    NEGATIVE_TTL = int(os.getenv('CACHE_NEGATIVE_TTL', '30'))  # Tombstones for ids that don't exist
+
+    # Optional per-worker L1 cache in front of Redis
+    L1_ENABLED = os.getenv('CACHE_L1_ENABLED', 'false').lower() == 'true'
+    L1_MAX_ENTRIES = int(os.getenv('CACHE_L1_MAX_ENTRIES', '10000'))
+    L1_MAX_BYTES = int(os.getenv('CACHE_L1_MAX_BYTES', str(64 * 1024 * 1024)))  # 64 MB
+    L1_MAX_TTL = int(os.getenv('CACHE_L1_TTL', '60'))  # Bounds staleness if an invalidation is missed
+    INVALIDATION_CHANNEL = 'cache:invalidate'
+    REFRESH_WORKERS = 4  # Background get_or_set refreshes per worker
+
+    # Value serialization (services/cache_codec.py)
+    CODEC = os.getenv('CACHE_CODEC', 'msgpack').lower()  # msgpack | json
+    COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))  # 0 disables
+    COMPRESS_LEVEL = 1  # zlib: favor speed, payloads are mostly repetitive JSON-like data
+
+    # Warm-up of hot entries on startup and after invalidations (services/cache_warmer.py)
+    WARMUP_ENABLED = os.getenv('CACHE_WARMUP_ENABLED', 'true').lower() == 'true'
+    WARMUP_CONCURRENCY = int(os.getenv('CACHE_WARMUP_CONCURRENCY', '2'))  # DB sessions used at once
+    WARMUP_CATALOG_PAGES = int(os.getenv('CACHE_WARMUP_CATALOG_PAGES', '3'))  # Per sort order
+    WARMUP_TOP_PRODUCTS = int(os.getenv('CACHE_WARMUP_TOP_PRODUCTS', '20'))
+    WARMUP_DEBOUNCE_SECONDS = 2.0  # Coalesces bursts of writes into one warm-up
+    WARMUP_LOCK_TTL = 300  # Seconds; frees the warm-up lock if its holder dies mid-run
+
+    # Key index used by delete_pattern (must outlive the longest TTL above)
+    KEY_INDEX_TTL = 3660
+    DELETE_BATCH_SIZE = 500
+
+
+class SearchConfig:
+    """Product search constants"""
+    # Max age of the in-process search index (bounds staleness across workers)
+    INDEX_TTL = int(os.getenv('SEARCH_INDEX_TTL', '60'))
+
+
+class MetricsConfig:
+    """Prometheus /metrics constants"""
+    # Shared directory for multi-worker metrics (set by run_production.py)
+    MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR', '')
+    # Request latency histogram buckets (seconds)
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    # Min seconds between DB/Redis pool gauge refreshes per worker
+    POOL_REFRESH_SECONDS = 1.0
+
+
+class RedisBreakerConfig:
+    """Circuit breaker shared by every Redis caller (utils/circuit_breaker.py)"""
+    FAILURE_RATE = float(os.getenv('REDIS_BREAKER_FAILURE_RATE', '0.5'))
+    SLOW_CALL_SECONDS = float(os.getenv('REDIS_BREAKER_SLOW_CALL_MS', '250')) / 1000
+    SLOW_CALL_RATE = float(os.getenv('REDIS_BREAKER_SLOW_CALL_RATE', '0.5'))
+    MIN_CALLS = int(os.getenv('REDIS_BREAKER_MIN_CALLS', '20'))  # Per window, before rates count
+    WINDOW_SECONDS = float(os.getenv('REDIS_BREAKER_WINDOW_SECONDS', '10'))
+    OPEN_SECONDS = float(os.getenv('REDIS_BREAKER_OPEN_SECONDS', '5'))
+    HALF_OPEN_CALLS = int(os.getenv('REDIS_BREAKER_HALF_OPEN_CALLS', '3'))
+    # /health_check skips its ping when a call succeeded this recently
+    HEALTH_PING_SECONDS = float(os.getenv('REDIS_HEALTH_PING_SECONDS', '5'))
 
 
 class LogConfig:
@@ -37,6 +93,20 @@ class RateLimitConfig:
     GLOBAL_CALLS_PER_PERIOD = 100
     GLOBAL_PERIOD_SECONDS = 60
 
+    # fixed_window | sliding_window | gcra (middleware/rate_limit_backends.py)
+    ALGORITHM = os.getenv('RATE_LIMIT_ALGORITHM', 'sliding_window').lower()
+
+    # Route groups with their own budget (per IP); other routes use RATE_LIMIT_CALLS/PERIOD
+    CATALOG_CALLS = int(os.getenv('RATE_LIMIT_CATALOG_CALLS', '300'))  # GET product/category reads
+    CATALOG_PERIOD = int(os.getenv('RATE_LIMIT_CATALOG_PERIOD', '60'))
+    CATALOG_ALGORITHM = os.getenv('RATE_LIMIT_CATALOG_ALGORITHM', ALGORITHM).lower()
+    CHECKOUT_CALLS = int(os.getenv('RATE_LIMIT_CHECKOUT_CALLS', '10'))  # POST /api/boletas
+    CHECKOUT_PERIOD = int(os.getenv('RATE_LIMIT_CHECKOUT_PERIOD', '60'))
+    CHECKOUT_ALGORITHM = os.getenv('RATE_LIMIT_CHECKOUT_ALGORITHM', 'gcra').lower()
+
+    # In-memory per-worker fallback while Redis is unreachable
+    LOCAL_MAX_KEYS = int(os.getenv('RATE_LIMIT_LOCAL_MAX_KEYS', '10000'))  # LRU of client keys
+
     # Endpoint-specific limits
     ORDER_CREATE_CALLS = 10  # requests per minute
     ORDER_CREATE_PERIOD = 60  # seconds
@@ -56,6 +126,13 @@ class DatabaseConfig:
     DEFAULT_POOL_RECYCLE = 3600  # 1 hour
 
 
+class ConcurrencyConfig:
+    """Worker threadpool constants for blocking (sync) route handlers"""
+    # Max sync handlers running at once per worker (anyio default is 40).
+    # Keep it <= DB_POOL_SIZE + DB_MAX_OVERFLOW so threads never starve on connections.
+    THREADPOOL_SIZE = int(os.getenv('THREADPOOL_SIZE', '40'))
+
+
 class ValidationConfig:
     """Validation-related constants"""
     # Price validation
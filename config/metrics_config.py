@@ -0,0 +1,180 @@
+"""
+Metrics Configuration Module
+
+Prometheus instruments for the HTTP layer and the connection pools, and the
+text exposition served at /metrics.
+
+Multi-worker: when PROMETHEUS_MULTIPROC_DIR is set (run_production.py sets
+it before starting the workers), every worker writes its samples to files in
+that directory and a scrape served by any worker aggregates all of them.
+Counters and histograms are summed; gauges are summed over live workers.
+Without it (single worker, tests) the default in-process registry is used.
+
+Routes are labelled with their path template ("/products/{id_key}"), never
+the raw path, so label cardinality stays bounded.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, MutableMapping, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from config.constants import MetricsConfig
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template",
+    ["method", "route"],
+    buckets=MetricsConfig.LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL = Gauge(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state (size, checked_in, checked_out, overflow)",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+REDIS_POOL = Gauge(
+    "redis_pool_connections",
+    "Redis pool connections by pool and state (max, created, in_use, idle)",
+    ["pool", "state"],
+    multiprocess_mode="livesum",
+)
+
+_refresh_lock = threading.Lock()
+_last_refresh = 0.0
+
+
+def multiprocess_enabled() -> bool:
+    """True if samples are shared between workers through PROMETHEUS_MULTIPROC_DIR"""
+    return bool(MetricsConfig.MULTIPROC_DIR)
+
+
+def prepare_multiprocess_dir(path: str) -> str:
+    """
+    Create an empty multi-worker metrics directory
+
+    Must run in the parent process before workers start, so files left by
+    a previous run are not aggregated into this one.
+
+    Args:
+        path: Directory for the per-worker sample files
+
+    Returns:
+        The directory path
+    """
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def route_label(scope: MutableMapping[str, Any]) -> str:
+    """
+    Path template of the route that served the request
+
+    FastAPI stores the matched route in the scope; plain Starlette routes
+    (docs, openapi.json) only set the endpoint, and their paths are static.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    if scope.get("endpoint") is not None:
+        return scope.get("path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float) -> None:
+    """Record one finished request"""
+    HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+    HTTP_LATENCY.labels(method, route).observe(seconds)
+
+
+def refresh_pool_gauges(force: bool = False) -> None:
+    """
+    Copy this worker's DB and Redis pool counts into the gauges
+
+    Called after requests (at most once per POOL_REFRESH_SECONDS) and on
+    every scrape. Never raises.
+    """
+    global _last_refresh
+
+    now = time.monotonic()
+    if not force and now - _last_refresh < MetricsConfig.POOL_REFRESH_SECONDS:
+        return
+    if not _refresh_lock.acquire(blocking=False):
+        return  # Another thread is refreshing
+    try:
+        _last_refresh = now
+        for state, value in db_pool_stats().items():
+            DB_POOL.labels(state).set(value)
+        from config.redis_config import redis_config
+        for pool, stats in redis_config.pool_stats().items():
+            for state, value in stats.items():
+                REDIS_POOL.labels(pool, state).set(value)
+    except Exception as e:
+        logger.debug(f"Pool gauge refresh failed: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def db_pool_stats() -> Dict[str, int]:
+    """Connection counts of the sync engine pool in this worker"""
+    from config.database import engine
+
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Prometheus text exposition of every worker's metrics
+
+    Returns:
+        (body, content type)
+    """
+    refresh_pool_gauges(force=True)
+
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MetricsConfig.MULTIPROC_DIR)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: Optional[int] = None) -> None:
+    """Drop a stopped worker's live gauges from the aggregation (shutdown)"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid or os.getpid(), path=MetricsConfig.MULTIPROC_DIR)
@@ -3,27 +3,143 @@ Redis Configuration Module
 
 Provides Redis client connection and configuration for caching,
 sessions, and rate limiting.
+
+Every Redis caller shares one circuit breaker (redis_breaker): while Redis
+is failing or slow, the cache and the rate limiters skip it instead of each
+waiting for the socket timeout.
 """
 import os
+import inspect
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 import redis
+import redis.asyncio as aioredis
 from redis.connection import ConnectionPool
 
+from config.constants import RedisBreakerConfig
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
+# Errors that mean Redis itself is unhealthy (others, e.g. a wrong type, don't
+# count against the circuit)
+REDIS_FAILURES = (redis.ConnectionError, redis.TimeoutError, OSError)
+
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_rate=RedisBreakerConfig.FAILURE_RATE,
+    slow_call_seconds=RedisBreakerConfig.SLOW_CALL_SECONDS,
+    slow_call_rate=RedisBreakerConfig.SLOW_CALL_RATE,
+    min_calls=RedisBreakerConfig.MIN_CALLS,
+    window_seconds=RedisBreakerConfig.WINDOW_SECONDS,
+    open_seconds=RedisBreakerConfig.OPEN_SECONDS,
+    half_open_calls=RedisBreakerConfig.HALF_OPEN_CALLS,
+)
+
+
+class GuardedRedis:
+    """
+    Redis client (sync or asyncio) whose commands go through a CircuitBreaker
+
+    A command raises CircuitOpenError without touching the network while
+    the circuit is open; otherwise its duration and outcome are recorded.
+    A pipeline counts as one call, on execute(). pubsub() and scan_iter()
+    pass through unguarded.
+    """
+
+    PASSTHROUGH = frozenset({"pubsub", "scan_iter", "register_script", "get_encoder"})
+
+    def __init__(self, client: Any, breaker: CircuitBreaker):
+        self.client = client
+        self.breaker = breaker
+
+    def pipeline(self, *args, **kwargs) -> "GuardedPipeline":
+        return GuardedPipeline(self.client.pipeline(*args, **kwargs), self.breaker)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.client, name)
+        if name in self.PASSTHROUGH or name.startswith("_") or not callable(attr):
+            return attr
+        return guard_call(attr, self.breaker)
+
+
+class GuardedPipeline:
+    """Pipeline whose execute() is one guarded call; commands queue as usual"""
+
+    def __init__(self, pipe: Any, breaker: CircuitBreaker):
+        self.pipe = pipe
+        self.execute = guard_call(pipe.execute, breaker)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pipe, name)
+
+
+def guard_call(method, breaker: CircuitBreaker):
+    """
+    Wrap a Redis call (returning a value or an awaitable) with the breaker
+
+    Raises:
+        CircuitOpenError: If the circuit is open
+    """
+    async def finish(awaitable, start: float):
+        try:
+            result = await awaitable
+        except BaseException as e:
+            breaker.record(time.perf_counter() - start, failed=isinstance(e, REDIS_FAILURES))
+            raise
+        breaker.record(time.perf_counter() - start)
+        return result
+
+    def call(*args, **kwargs):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit '{breaker.name}' is open")
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException as e:
+            breaker.record(time.perf_counter() - start, failed=isinstance(e, REDIS_FAILURES))
+            raise
+        if inspect.isawaitable(result):
+            return finish(result, start)
+        breaker.record(time.perf_counter() - start)
+        return result
+
+    return call
+
+
+def guarded(client: Any, breaker: CircuitBreaker = redis_breaker) -> Any:
+    """Wrap a Redis client with the circuit breaker (None stays None)"""
+    return GuardedRedis(client, breaker) if client is not None else None
+
 
 class RedisConfig:
     """
     Singleton Redis configuration class
 
     Manages Redis connection pool and provides a single client instance
-    across the application.
+    across the application. A second client without response decoding
+    serves the cache, whose values are binary (services/cache_codec.py).
+
+    ``redis.asyncio`` counterparts of both clients, each on its own pool,
+    serve code running on the event loop (rate limiting, CacheService's
+    async methods), so Redis calls there don't block the loop. Every client
+    is kept even when Redis is down at startup: connections open lazily,
+    so the cache and rate limiting switch to Redis once it comes up (the
+    circuit breaker keeps calls cheap until then). Async connections are
+    opened on the worker's event loop and closed by the app shutdown hook
+    (aclose).
     """
 
     _instance: Optional['RedisConfig'] = None
     _client: Optional[redis.Redis] = None
     _pool: Optional[ConnectionPool] = None
+    _binary_client: Optional[redis.Redis] = None
+    _binary_pool: Optional[ConnectionPool] = None
+    _async_client: Optional[aioredis.Redis] = None
+    _async_pool: Optional[aioredis.ConnectionPool] = None
+    _async_binary_client: Optional[aioredis.Redis] = None
+    _async_binary_pool: Optional[aioredis.ConnectionPool] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -41,61 +157,167 @@ class RedisConfig:
         redis_db = int(os.getenv('REDIS_DB', '0'))
         redis_password = os.getenv('REDIS_PASSWORD', None)
         max_connections = int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+        pool_timeout = float(os.getenv('REDIS_POOL_TIMEOUT', '2'))  # Seconds an async call waits for a connection
+
+        pool_kwargs = dict(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            password=redis_password,
+            max_connections=max_connections,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            retry_on_timeout=True
+        )
 
         try:
+            # Async connections belong to the worker's event loop; opened lazily.
+            # Blocking pools: past max_connections concurrent calls, callers
+            # wait for a free connection instead of failing with "Too many
+            # connections", which the breaker would count as Redis failing.
+            self._async_pool = aioredis.BlockingConnectionPool(
+                decode_responses=True, timeout=pool_timeout, **pool_kwargs
+            )
+            self._async_client = aioredis.Redis(connection_pool=self._async_pool)
+
             # Create connection pool
             self._pool = ConnectionPool(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                password=redis_password,
-                max_connections=max_connections,
                 decode_responses=True,  # Auto-decode bytes to str
-                socket_timeout=5,
-                socket_connect_timeout=5,
-                retry_on_timeout=True
+                **pool_kwargs
             )
 
             # Create Redis client
             self._client = redis.Redis(connection_pool=self._pool)
 
+            # Cache payloads are binary; connections are opened lazily
+            self._binary_pool = ConnectionPool(decode_responses=False, **pool_kwargs)
+            self._binary_client = redis.Redis(connection_pool=self._binary_pool)
+            self._async_binary_pool = aioredis.BlockingConnectionPool(
+                decode_responses=False, timeout=pool_timeout, **pool_kwargs
+            )
+            self._async_binary_client = aioredis.Redis(connection_pool=self._async_binary_pool)
+
             # Test connection
             self._client.ping()
             logger.info(f"✅ Redis connected successfully: {redis_host}:{redis_port} (DB: {redis_db})")
 
         except redis.ConnectionError as e:
+            # Clients are kept: they connect on first use once Redis is up
             logger.warning(f"⚠️  Redis connection failed: {e}")
-            logger.warning("Application will run without caching")
-            self._client = None
+            logger.warning("Application will run without caching until Redis is reachable")
         except Exception as e:
             logger.error(f"❌ Redis initialization error: {e}")
             self._client = None
+            self._binary_client = None
+            self._async_client = None
+            self._async_binary_client = None
 
     def get_client(self) -> Optional[redis.Redis]:
         """
         Get Redis client instance
 
         Returns:
-            Redis client or None if connection failed
+            Redis client (possibly not connected yet) or None if the client
+            could not be configured
         """
         return self._client
 
+    def get_binary_client(self) -> Optional[redis.Redis]:
+        """
+        Get the Redis client that returns raw bytes (used by the cache)
+
+        Returns:
+            Redis client (possibly not connected yet) or None if the client
+            could not be configured
+        """
+        return self._binary_client
+
+    def get_async_client(self) -> Optional[aioredis.Redis]:
+        """
+        Get the asyncio Redis client (for code running on the event loop)
+
+        Returns:
+            Async Redis client (possibly not connected yet) or None if the
+            client could not be configured
+        """
+        return self._async_client
+
+    def get_async_binary_client(self) -> Optional[aioredis.Redis]:
+        """
+        Get the asyncio Redis client that returns raw bytes (async cache calls)
+
+        Returns:
+            Async Redis client (possibly not connected yet) or None if the
+            client could not be configured
+        """
+        return self._async_binary_client
+
     def is_available(self) -> bool:
         """
         Check if Redis is available
 
+        Answered from the circuit breaker when it can: False while the
+        circuit is open, True if a Redis call succeeded in the last
+        HEALTH_PING_SECONDS. Only otherwise is Redis pinged.
+
         Returns:
             True if Redis is connected and responsive
         """
         if self._client is None:
             return False
+        if redis_breaker.succeeded_within(RedisBreakerConfig.HEALTH_PING_SECONDS):
+            return True
 
         try:
-            return self._client.ping()
-        except (redis.ConnectionError, redis.TimeoutError, Exception) as e:
+            return bool(guarded(self._client).ping())
+        except (redis.ConnectionError, redis.TimeoutError, CircuitOpenError, Exception) as e:
             logger.debug(f"Redis ping failed: {e}")
             return False
 
+    async def aping(self) -> bool:
+        """
+        Check that the async client reaches Redis from this event loop
+
+        Returns:
+            True if Redis answered the ping
+        """
+        if self._async_client is None:
+            return False
+
+        try:
+            return bool(await self._async_client.ping())
+        except Exception as e:
+            logger.debug(f"Redis async ping failed: {e}")
+            return False
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connection counts of each pool in this worker (no round trip)
+
+        Returns:
+            {"default"|"binary"|"async"|"async_binary": {"max", "created", "in_use", "idle"}}
+        """
+        stats = {}
+        pools = (
+            ("default", self._pool),
+            ("binary", self._binary_pool),
+            ("async", self._async_pool),
+            ("async_binary", self._async_binary_pool),
+        )
+        for name, pool in pools:
+            if pool is None:
+                continue
+            stats[name] = {
+                "max": pool.max_connections,
+                "in_use": len(getattr(pool, "_in_use_connections", ())),
+                "idle": len(getattr(pool, "_available_connections", ())),
+            }
+            # Async pools don't count created connections: in use + idle
+            stats[name]["created"] = getattr(
+                pool, "_created_connections", stats[name]["in_use"] + stats[name]["idle"]
+            )
+        return stats
+
     def close(self):
         """Close Redis connection and pool"""
         if self._client:
@@ -106,6 +328,18 @@ class RedisConfig:
             self._pool.disconnect()
             logger.info("Redis connection pool disconnected")
 
+        if self._binary_pool:
+            self._binary_pool.disconnect()
+
+    async def aclose(self):
+        """Close the asyncio pools (must run on the event loop that used them)"""
+        if self._async_pool:
+            await self._async_pool.disconnect()
+            logger.info("Redis async connection pool disconnected")
+
+        if self._async_binary_pool:
+            await self._async_binary_pool.disconnect()
+
 
 # Global Redis instance
 redis_config = RedisConfig()
@@ -121,6 +355,36 @@ def get_redis_client() -> Optional[redis.Redis]:
     return redis_config.get_client()
 
 
+def get_redis_binary_client() -> Optional[redis.Redis]:
+    """
+    Redis client without response decoding, for binary cache payloads
+
+    Returns:
+        Redis client instance or None
+    """
+    return redis_config.get_binary_client()
+
+
+def get_redis_async_client() -> Optional[aioredis.Redis]:
+    """
+    Asyncio Redis client, for middleware and async route handlers
+
+    Returns:
+        Async Redis client instance or None
+    """
+    return redis_config.get_async_client()
+
+
+def get_redis_async_binary_client() -> Optional[aioredis.Redis]:
+    """
+    Asyncio Redis client without response decoding, for async cache calls
+
+    Returns:
+        Async Redis client instance or None
+    """
+    return redis_config.get_async_binary_client()
+
+
 def check_redis_connection() -> bool:
     """
     Check if Redis is available
@@ -0,0 +1,53 @@
+"""
+Threadpool Configuration Module
+
+Sync route handlers (plain ``def``) and ``run_in_threadpool`` calls are
+executed by anyio's worker threads. This module bounds that pool per worker
+so blocking SQLAlchemy calls never run on the event loop and never outnumber
+the database connections available to serve them.
+"""
+import logging
+from typing import Optional
+
+from anyio import to_thread
+
+from config.constants import ConcurrencyConfig
+
+logger = logging.getLogger(__name__)
+
+
+def configure_threadpool(size: Optional[int] = None) -> int:
+    """
+    Set the maximum number of concurrent worker threads for the running loop
+
+    Must be called from inside the event loop (e.g. a startup hook), since
+    anyio keeps one default limiter per loop.
+
+    Args:
+        size: Max concurrent threads (default: THREADPOOL_SIZE env var)
+
+    Returns:
+        The configured threadpool size
+
+    Raises:
+        ValueError: If size (or THREADPOOL_SIZE) is below 1
+    """
+    from config.database import POOL_SIZE, MAX_OVERFLOW
+
+    if size is None:
+        size = ConcurrencyConfig.THREADPOOL_SIZE
+    if size < 1:
+        raise ValueError(f"threadpool size must be >= 1, got {size}")
+
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+    db_capacity = POOL_SIZE + MAX_OVERFLOW
+    if size > db_capacity:
+        logger.warning(
+            f"⚠️  Threadpool size {size} exceeds DB pool capacity {db_capacity}; "
+            f"extra threads will block waiting for connections"
+        )
+
+    logger.info(f"✅ Sync handler threadpool limited to {size} threads per worker")
+    return size
+
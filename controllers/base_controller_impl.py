@@ -1,11 +1,13 @@
 """Base controller implementation module with FastAPI dependency injection."""
-from typing import Type, List, Callable
-from fastapi import APIRouter, Depends, status
+from typing import Type, List, Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from controllers.base_controller import BaseController
 from schemas.base_schema import BaseSchema
-from config.database import get_db
+from config.database import get_db, get_async_db, ASYNC_DB_ENABLED
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
 
 
 class BaseControllerImpl(BaseController):
@@ -13,13 +15,33 @@ class BaseControllerImpl(BaseController):
     Base controller implementation using FastAPI dependency injection.
 
     This class creates standard CRUD endpoints and properly manages database sessions.
+
+    Handlers are declared as plain ``def`` because the service layer is blocking
+    (sync SQLAlchemy). FastAPI dispatches them to the worker threadpool, bounded
+    by THREADPOOL_SIZE (see config/threadpool_config.py), so a slow query never
+    stalls the event loop for other requests.
+
+    When ``async_service_factory`` is given and ASYNC_DB_ENABLED is set, the read
+    routes (list and get by id) use an AsyncSession instead and never touch the
+    threadpool. Products and categories provide one.
+
+    List routes support two pagination modes: ``skip``/``limit`` (offset) and
+    ``cursor``/``limit`` (keyset). A full page carries an ``X-Next-Cursor``
+    header with the opaque token for the next keyset page.
+
+    With ``raw_json_reads`` the read routes return the service's
+    pre-serialized JSON (``get_all_json``/``get_one_json``) as-is, skipping
+    response_model validation and serialization. The service is then
+    responsible for producing exactly the response_model's JSON.
     """
 
     def __init__(
         self,
         schema: Type[BaseSchema],
         service_factory: Callable[[Session], 'BaseService'],
-        tags: List[str] = None
+        tags: List[str] = None,
+        async_service_factory: Optional[Callable[[AsyncSession], 'BaseAsyncServiceImpl']] = None,
+        raw_json_reads: bool = False
     ):
         """
         Initialize the controller with dependency injection support.
@@ -28,9 +50,15 @@ class BaseControllerImpl(BaseController):
             schema: The Pydantic schema class for validation
             service_factory: A callable that creates a service instance given a DB session
             tags: Optional list of tags for API documentation
+            async_service_factory: Optional callable that creates an async service
+                given an AsyncSession (used for read routes when ASYNC_DB_ENABLED)
+            raw_json_reads: Serve sync read routes from the service's JSON
+                methods (for services that cache serialized responses)
         """
         self.schema = schema
         self.service_factory = service_factory
+        self.async_service_factory = async_service_factory if ASYNC_DB_ENABLED else None
+        self.raw_json_reads = raw_json_reads
         self.router = APIRouter(tags=tags or [])
 
         # Register all CRUD endpoints with proper dependency injection
@@ -39,27 +67,44 @@ class BaseControllerImpl(BaseController):
     def _register_routes(self):
         """Register all CRUD routes with proper dependency injection."""
 
-        @self.router.get("/", response_model=List[self.schema], status_code=status.HTTP_200_OK)
-        async def get_all(
-            skip: int = 0,
-            limit: int = 100,
-            db: Session = Depends(get_db)
-        ):
-            """Get all records with pagination."""
-            service = self.service_factory(db)
-            return service.get_all(skip=skip, limit=limit)
+        if self.async_service_factory is not None:
+            self._register_async_read_routes()
+        else:
+            @self.router.get("/", response_model=List[self.schema], status_code=status.HTTP_200_OK)
+            def get_all(
+                response: Response,
+                skip: int = 0,
+                limit: int = 100,
+                cursor: Optional[str] = None,
+                db: Session = Depends(get_db)
+            ):
+                """Get all records with offset or cursor pagination."""
+                service = self.service_factory(db)
+                after_id = self._after_id(cursor)
+                if self.raw_json_reads:
+                    body, ids = service.get_all_json(skip=skip, limit=limit, after_id=after_id)
+                    raw = Response(content=body, media_type="application/json")
+                    if ids and len(ids) >= limit:
+                        raw.headers["X-Next-Cursor"] = encode_cursor({"id": ids[-1]})
+                    return raw
 
-        @self.router.get("/{id_key}", response_model=self.schema, status_code=status.HTTP_200_OK)
-        async def get_one(
-            id_key: int,
-            db: Session = Depends(get_db)
-        ):
-            """Get a single record by ID."""
-            service = self.service_factory(db)
-            return service.get_one(id_key)
+                items = service.get_all(skip=skip, limit=limit, after_id=after_id)
+                self._set_next_cursor(response, items, limit)
+                return items
+
+            @self.router.get("/{id_key}", response_model=self.schema, status_code=status.HTTP_200_OK)
+            def get_one(
+                id_key: int,
+                db: Session = Depends(get_db)
+            ):
+                """Get a single record by ID."""
+                service = self.service_factory(db)
+                if self.raw_json_reads:
+                    return Response(content=service.get_one_json(id_key), media_type="application/json")
+                return service.get_one(id_key)
 
         @self.router.post("/", response_model=self.schema, status_code=status.HTTP_201_CREATED)
-        async def create(
+        def create(
             schema_in: self.schema,
             db: Session = Depends(get_db)
         ):
@@ -68,7 +113,7 @@ class BaseControllerImpl(BaseController):
             return service.save(schema_in)
 
         @self.router.put("/{id_key}", response_model=self.schema, status_code=status.HTTP_200_OK)
-        async def update(
+        def update(
             id_key: int,
             schema_in: self.schema,
             db: Session = Depends(get_db)
@@ -78,7 +123,7 @@ class BaseControllerImpl(BaseController):
             return service.update(id_key, schema_in)
 
         @self.router.delete("/{id_key}", status_code=status.HTTP_204_NO_CONTENT)
-        async def delete(
+        def delete(
             id_key: int,
             db: Session = Depends(get_db)
         ):
@@ -86,3 +131,55 @@ class BaseControllerImpl(BaseController):
             service = self.service_factory(db)
             service.delete(id_key)
             return None
+
+    @staticmethod
+    def _after_id(cursor: Optional[str]) -> Optional[int]:
+        """Decode a list cursor into the last id_key already returned."""
+        if cursor is None:
+            return None
+        try:
+            return int(decode_cursor(cursor)["id"])
+        except (InvalidCursorError, KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    @staticmethod
+    def _set_next_cursor(response: Response, items: list, limit: int):
+        """Expose the keyset cursor for the next page when this page is full."""
+        if items and len(items) >= limit:
+            response.headers["X-Next-Cursor"] = encode_cursor({"id": items[-1].id_key})
+
+    def _register_async_read_routes(self):
+        """Register non-blocking read routes backed by an AsyncSession."""
+
+        @self.router.get("/", response_model=List[self.schema], status_code=status.HTTP_200_OK)
+        async def get_all(
+            response: Response,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+            db: AsyncSession = Depends(get_async_db)
+        ):
+            """Get all records with offset or cursor pagination."""
+            service = self.async_service_factory(db)
+            after_id = self._after_id(cursor)
+            if self.raw_json_reads:
+                body, ids = await service.get_all_json(skip=skip, limit=limit, after_id=after_id)
+                raw = Response(content=body, media_type="application/json")
+                if ids and len(ids) >= limit:
+                    raw.headers["X-Next-Cursor"] = encode_cursor({"id": ids[-1]})
+                return raw
+
+            items = await service.get_all(skip=skip, limit=limit, after_id=after_id)
+            self._set_next_cursor(response, items, limit)
+            return items
+
+        @self.router.get("/{id_key}", response_model=self.schema, status_code=status.HTTP_200_OK)
+        async def get_one(
+            id_key: int,
+            db: AsyncSession = Depends(get_async_db)
+        ):
+            """Get a single record by ID."""
+            service = self.async_service_factory(db)
+            if self.raw_json_reads:
+                return Response(content=await service.get_one_json(id_key), media_type="application/json")
+            return await service.get_one(id_key)
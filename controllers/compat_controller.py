@@ -5,23 +5,29 @@ import secrets
 import hashlib
 import logging
 from datetime import datetime
-from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 import requests
-from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Response, UploadFile
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
+from config.constants import CacheConfig
 from config.database import get_db
-from models.bill import BillModel
 from models.category import CategoryModel
 from models.client import ClientModel
-from models.enums import DeliveryMethod, PaymentType, Status
+from models.enums import Status
 from models.order import OrderModel
 from models.order_detail import OrderDetailModel
 from models.product import ProductModel
+from repositories.product_repository import ProductRepository
+from services.cache_service import cache_service
+from services.cache_warmer import cache_warmer
+from services.checkout_service import CheckoutService
+from services.stock_service import InsufficientStockError
+from utils.pagination import InvalidCursorError, decode_cursor, keyset_filter, next_cursor, order_by_clauses
+from utils.search import normalize_text, product_search_filter, product_search_index
 
 router = APIRouter(prefix="/api", tags=["Compat"])
 logger = logging.getLogger(__name__)
@@ -34,9 +40,7 @@ PLACEHOLDER_IMAGE = os.getenv(
     "https://via.placeholder.com/400x400.png?text=Producto"
 )
 
-# Estado en memoria para MVP
-carts: Dict[str, List[Dict[str, Any]]] = {}
-favorites: Dict[str, List[Dict[str, Any]]] = {}
+# Estado en memoria para MVP (carts and favorites are defined below)
 bills: List[Dict[str, Any]] = []
 
 RESET_TOKENS_FILE = os.getenv(
@@ -99,7 +103,7 @@ reset_tokens: Dict[str, Dict[str, Any]] = load_reset_tokens()
 
 # Carts and favorites in memory (acceptable for MVP)
 carts: Dict[str, List[Dict[str, Any]]] = {}
-favorites = load_favorites()
+favorites: Dict[str, List[Dict[str, Any]]] = load_favorites()
 
 DEFAULT_PRODUCT_MEDIA = {
     "resma a4 autor 75g (500 hojas)": {
@@ -129,6 +133,25 @@ DEFAULT_PRODUCT_MEDIA = {
 }
 
 
+# Sort orders for /productos: (column attribute, ascending). Every order ends in
+# id_key so keyset cursors always point at a unique row.
+PRODUCT_SORT_ORDERS = {
+    "reciente": [("id_key", False)],
+    "nombre_asc": [("name", True), ("id_key", True)],
+    "nombre_desc": [("name", False), ("id_key", False)],
+    "precio_asc": [("price", True), ("id_key", True)],
+    "precio_desc": [("price", False), ("id_key", False)],
+}
+DEFAULT_PRODUCT_SORT = "reciente"
+
+# Compat responses and counts live under products:list: so ProductService
+# writes clear them too. Admin writes here clear every product cache
+# (including ProductService's id lists and per-id entries).
+PRODUCT_CACHE_PATTERN = "products:*"
+PRODUCT_LIST_CACHE_PATTERN = "products:list:*"
+CATEGORY_CACHE_PATTERN = "categories:*"
+
+
 class RegisterBody(BaseModel):
     nombre: str
     email: str
@@ -214,9 +237,104 @@ def get_or_create_category(db: Session, name: str) -> CategoryModel:
     db.add(category)
     db.commit()
     db.refresh(category)
+    invalidate_category_caches()
     return category
 
 
+def invalidate_product_caches():
+    cache_service.delete_pattern(PRODUCT_CACHE_PATTERN)
+    product_search_index.invalidate()
+    cache_warmer.schedule("products", reason="catalog write")
+
+
+def invalidate_product_stock_caches(product_ids: Iterable[int]):
+    # Stock changed: the products' own entries and every catalog response
+    # and count (stock is in their bodies and behind the conStock filter).
+    # Id pages and the name search index keep the same products, and the
+    # warmer isn't scheduled: orders would keep it running.
+    cache_service.delete_many([cache_service.build_key("products", "id", id=product_id) for product_id in product_ids])
+    cache_service.delete_pattern(PRODUCT_LIST_CACHE_PATTERN)
+
+
+def invalidate_category_caches():
+    cache_service.delete_pattern(CATEGORY_CACHE_PATTERN)
+    cache_warmer.schedule("categories", reason="catalog write")
+
+
+def product_filters(
+    q: Optional[str],
+    categoria: Optional[str],
+    precio_min: Optional[float],
+    precio_max: Optional[float],
+    con_stock: Optional[bool],
+) -> Dict[str, Any]:
+    # Normalize so equivalent requests (missing vs empty, 10 vs 10.0) share a key
+    return {
+        "q": normalize_text(q) or None,
+        "categoria": categoria or None,
+        "precioMin": float(precio_min) if precio_min is not None else None,
+        "precioMax": float(precio_max) if precio_max is not None else None,
+        "conStock": bool(con_stock),
+    }
+
+
+def params_digest(params: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def product_count_key(
+    q: Optional[str],
+    categoria: Optional[str],
+    precio_min: Optional[float],
+    precio_max: Optional[float],
+    con_stock: Optional[bool],
+) -> str:
+    digest = params_digest(product_filters(q, categoria, precio_min, precio_max, con_stock))
+    return cache_service.build_key("products", "list", "count", digest)
+
+
+def cached_json_response(
+    key: str,
+    ttl: int,
+    build: Callable[[], Any],
+    not_found: Optional[str] = None
+) -> Response:
+    # Cache the serialized body, so hits skip both the DB and JSON encoding.
+    # Strings are stored as plain text by the cache codec; anything else
+    # (e.g. a body cached before the codec existed) is rebuilt.
+    # With not_found set, build() returning None means 404, remembered
+    # with a short-lived tombstone.
+    body = cache_service.get(key)
+    status = "HIT"
+    if not_found is not None and cache_service.is_tombstone(body):
+        raise HTTPException(status_code=404, detail=not_found, headers={"X-Cache": status})
+    if not isinstance(body, str):
+        data = build()
+        if data is None and not_found is not None:
+            cache_service.set_tombstone(key)
+            raise HTTPException(status_code=404, detail=not_found, headers={"X-Cache": "MISS"})
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        cache_service.set(key, body, ttl=ttl)
+        status = "MISS"
+    return Response(content=body, media_type="application/json", headers={"X-Cache": status})
+
+
+def count_products(db: Session, query, count_key: str, estimate: bool) -> Dict[str, Any]:
+    # Planner estimate only makes sense for the whole table (no filters)
+    if estimate:
+        estimated = ProductRepository(db).estimated_count()
+        if estimated is not None:
+            return {"total": estimated, "exact": False}
+
+    cached = cache_service.get(count_key)
+    if cached is not None:
+        return {"total": int(cached), "exact": True}
+
+    total = query.order_by(None).count()
+    cache_service.set(count_key, total, ttl=CacheConfig.PRODUCT_COUNT_TTL)
+    return {"total": total, "exact": True}
+
+
 def upload_image_to_cloudinary(file: UploadFile) -> str:
     if not file:
         raise HTTPException(status_code=400, detail="Imagen requerida")
@@ -314,6 +432,11 @@ def to_bill_json(order: OrderModel) -> Dict[str, Any]:
     }
 
 
+# Offset mode (page) is kept for existing clients; cursor switches to keyset
+# mode, which costs the same at any depth. Full pages return siguienteCursor.
+# Totals come from a per-filter count cache; conteo=estimado on an unfiltered
+# listing uses planner statistics instead (paginacion.totalExacto = false).
+# Whole responses are cached per normalized query until a product write.
 @router.get("/productos")
 def list_productos(
     q: Optional[str] = None,
@@ -324,12 +447,56 @@ def list_productos(
     sort: Optional[str] = None,
     page: int = 1,
     limit: int = 12,
+    cursor: Optional[str] = None,
+    conteo: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
+    filters = product_filters(q, categoria, precioMin, precioMax, conStock)
+    has_filters = bool(
+        filters["q"] or filters["categoria"] or filters["conStock"]
+        or filters["precioMin"] is not None or filters["precioMax"] is not None
+    )
+    sort_key = sort if sort in PRODUCT_SORT_ORDERS else DEFAULT_PRODUCT_SORT
+    page = max(page, 1)
+    limit = max(limit, 1)
+    estimate = conteo == "estimado" and not has_filters
+
+    params = {
+        **filters,
+        "sort": sort_key,
+        "limit": limit,
+        "page": None if cursor else page,
+        "cursor": cursor or None,
+        "estimado": estimate,
+    }
+    key = cache_service.build_key("products", "list", "compat", params_digest(params))
+
+    return cached_json_response(
+        key,
+        CacheConfig.PRODUCT_LIST_TTL,
+        lambda: build_product_listing(db, q, categoria, precioMin, precioMax, conStock,
+                                      sort_key, page, limit, cursor, estimate),
+    )
+
+
+def build_product_listing(
+    db: Session,
+    q: Optional[str],
+    categoria: Optional[str],
+    precio_min: Optional[float],
+    precio_max: Optional[float],
+    con_stock: Optional[bool],
+    sort_key: str,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    estimate: bool,
+) -> Dict[str, Any]:
     query = db.query(ProductModel).options(joinedload(ProductModel.category)).outerjoin(CategoryModel)
 
-    if q:
-        query = query.filter(ProductModel.name.ilike(f"%{q}%"))
+    search = product_search_filter(db, q)
+    if search is not None:
+        query = query.filter(search)
     if categoria:
         # Exact match first (handles accented chars that SQLite lower() can't)
         cat_filter = db.query(CategoryModel).filter(CategoryModel.name == categoria).first()
@@ -339,38 +506,50 @@ def list_productos(
             query = query.filter(ProductModel.category_id == cat_filter.id_key)
         else:
             query = query.filter(ProductModel.category_id == -1)  # No match
-    if precioMin is not None:
-        query = query.filter(ProductModel.price >= precioMin)
-    if precioMax is not None:
-        query = query.filter(ProductModel.price <= precioMax)
-    if conStock:
+    if precio_min is not None:
+        query = query.filter(ProductModel.price >= precio_min)
+    if precio_max is not None:
+        query = query.filter(ProductModel.price <= precio_max)
+    if con_stock:
         query = query.filter(ProductModel.stock > 0)
 
-    if sort == "nombre_asc":
-        query = query.order_by(ProductModel.name.asc())
-    elif sort == "nombre_desc":
-        query = query.order_by(ProductModel.name.desc())
-    elif sort == "precio_asc":
-        query = query.order_by(ProductModel.price.asc())
-    elif sort == "precio_desc":
-        query = query.order_by(ProductModel.price.desc())
-    else:
-        query = query.order_by(ProductModel.id_key.desc())
+    fields = [field for field, _ in PRODUCT_SORT_ORDERS[sort_key]]
+    order = [(getattr(ProductModel, field), ascending) for field, ascending in PRODUCT_SORT_ORDERS[sort_key]]
+    query = query.order_by(*order_by_clauses(order))
 
-    total = query.count()
-    page = max(page, 1)
-    limit = max(limit, 1)
-    offset = (page - 1) * limit
+    count = count_products(
+        db,
+        query,
+        product_count_key(q, categoria, precio_min, precio_max, con_stock),
+        estimate=estimate,
+    )
+    total = count["total"]
 
-    productos = query.offset(offset).limit(limit).all()
+    if cursor:
+        # Keyset mode: continue after the last row of the previous page
+        try:
+            position = decode_cursor(cursor)
+            if position.get("s") != sort_key:
+                raise InvalidCursorError("Cursor belongs to a different sort order")
+            query = query.filter(keyset_filter(order, position.get("v")))
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+        productos = query.limit(limit).all()
+    else:
+        offset = (page - 1) * limit
+        productos = query.offset(offset).limit(limit).all()
+
+    last = productos[-1] if len(productos) == limit else None
 
     return {
         "productos": [to_product_json(item) for item in productos],
         "paginacion": {
             "total": total,
-            "pagina": page,
+            "pagina": None if cursor else page,
             "porPagina": limit,
             "totalPaginas": (total + limit - 1) // limit,
+            "siguienteCursor": next_cursor(last, fields, s=sort_key),
+            "totalExacto": count["exact"],
         },
     }
 
@@ -382,22 +561,29 @@ def get_producto(id_key: str, db: Session = Depends(get_db)):
     except ValueError:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
 
-    product = (
-        db.query(ProductModel)
-        .options(joinedload(ProductModel.category))
-        .filter(ProductModel.id_key == pid)
-        .first()
-    )
-    if not product:
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    def build():
+        product = (
+            db.query(ProductModel)
+            .options(joinedload(ProductModel.category))
+            .filter(ProductModel.id_key == pid)
+            .first()
+        )
+        return to_product_json(product) if product else None
 
-    return to_product_json(product)
+    # Kept under products:list: so any product or category write clears it
+    # (including the tombstone of an id that didn't exist yet)
+    key = cache_service.build_key("products", "list", "compat", "item", pid)
+    return cached_json_response(key, CacheConfig.PRODUCT_ITEM_TTL, build, not_found="Producto no encontrado")
 
 
 @router.get("/categorias")
 def get_categorias(db: Session = Depends(get_db)):
-    categories = db.query(CategoryModel).order_by(CategoryModel.name.asc()).all()
-    return [c.name for c in categories]
+    def build():
+        categories = db.query(CategoryModel).order_by(CategoryModel.name.asc()).all()
+        return [c.name for c in categories]
+
+    key = cache_service.build_key("categories", "compat", "list")
+    return cached_json_response(key, CacheConfig.CATEGORY_LIST_TTL, build)
 
 
 @router.post("/categorias")
@@ -413,6 +599,7 @@ def create_categoria(body: CategoryBody, db: Session = Depends(get_db), admin_ch
     category = CategoryModel(name=name)
     db.add(category)
     db.commit()
+    invalidate_category_caches()
     return {"mensaje": "Categoría creada", "nombre": name}
 
 
@@ -445,6 +632,8 @@ def rename_categoria(old_name: str, body: CategoryRenameBody, db: Session = Depe
 
     db.delete(old_category)
     db.commit()
+    invalidate_product_caches()
+    invalidate_category_caches()
 
     return {
         "mensaje": "Categoría actualizada",
@@ -468,6 +657,8 @@ def delete_categoria(name: str, db: Session = Depends(get_db), admin_check: None
     if category.id_key != sin_categoria.id_key:
         db.delete(category)
     db.commit()
+    invalidate_product_caches()
+    invalidate_category_caches()
 
     return {
         "mensaje": "Categoría eliminada (productos movidos a Sin Categoría)",
@@ -736,80 +927,31 @@ def create_bill(body: BillBody, db: Session = Depends(get_db)):
     email = body.usuarioEmail.strip().lower()
     name = body.usuarioNombre.strip() if body.usuarioNombre else "Cliente"
 
-    client = db.query(ClientModel).filter(func.lower(ClientModel.email) == email).first()
-    if not client:
-        client = ClientModel(name=name, lastname="", email=email, telephone="0000000")
-        db.add(client)
-        db.commit()
-        db.refresh(client)
-
-    bill_number = f"B-{datetime.now().strftime('%Y%m%d%H%M%S%f')[-14:]}"
-    bill = BillModel(
-        bill_number=bill_number,
-        discount=0,
-        date=date.today(),
-        total=float(body.total or 0),
-        payment_type=PaymentType.CARD,
-        client_id=client.id_key,
-    )
-    db.add(bill)
-    db.commit()
-    db.refresh(bill)
-
-    order = OrderModel(
-        date=datetime.now(),
-        total=float(body.total or 0),
-        delivery_method=DeliveryMethod.HOME_DELIVERY,
-        status=Status.PENDING,
-        client_id=client.id_key,
-        bill_id=bill.id_key,
-    )
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    for product in body.productos or []:
-        product_name = str(product.get("nombre") or "").strip()
-        quantity = int(product.get("cantidad") or 1)
-        price = float(product.get("precio") or 0)
-
-        product_model = None
-        if product_name:
-            product_model = db.query(ProductModel).filter(func.lower(ProductModel.name) == product_name.lower()).first()
-            if not product_model:
-                fallback_category = get_or_create_category(db, "Sin Categoría")
-                product_model = ProductModel(
-                    name=product_name,
-                    price=max(price, 0),
-                    stock=0,
-                    category_id=fallback_category.id_key,
-                )
-                db.add(product_model)
-                db.commit()
-                db.refresh(product_model)
-
-        detail = OrderDetailModel(
-            quantity=max(quantity, 1),
-            price=price,
-            order_id=order.id_key,
-            product_id=product_model.id_key if product_model else None,
+    # One transaction: batched product lookup, one flush for bill and order,
+    # batched stock reservation and details, response rendered before commit
+    # expires the objects
+    try:
+        result = CheckoutService(db).place_order(
+            email=email,
+            name=name,
+            items=body.productos or [],
+            total=float(body.total or 0),
+            render=to_bill_json,
         )
-        db.add(detail)
-
-    db.commit()
-
-    order = (
-        db.query(OrderModel)
-        .options(
-            joinedload(OrderModel.bill),
-            joinedload(OrderModel.client),
-            joinedload(OrderModel.order_details).joinedload(OrderDetailModel.product),
+    except InsufficientStockError as exc:
+        faltantes = ", ".join(
+            f"producto {product_id} (disponible {available})"
+            for product_id, (_, available) in sorted(exc.shortages.items())
         )
-        .filter(OrderModel.id_key == order.id_key)
-        .first()
-    )
+        raise HTTPException(status_code=400, detail=f"Stock insuficiente: {faltantes}")
+    if result.created_products:
+        invalidate_product_caches()
+    elif result.reserved:
+        invalidate_product_stock_caches(result.reserved)
+    if result.created_category:
+        invalidate_category_caches()
 
-    boleta = to_bill_json(order)
+    boleta = result.receipt
 
     # Enviar email de confirmación via n8n
     if N8N_WEBHOOK_URL:
@@ -948,6 +1090,7 @@ def admin_create_product(body: ProductBody, db: Session = Depends(get_db), admin
         db.add(product)
         db.commit()
         db.refresh(product)
+        invalidate_product_caches()
 
         product = db.query(ProductModel).options(joinedload(ProductModel.category)).filter(ProductModel.id_key == product.id_key).first()
 
@@ -980,6 +1123,7 @@ def admin_update_product(id_key: str, body: ProductBody, db: Session = Depends(g
     product.category_id = category.id_key
 
     db.commit()
+    invalidate_product_caches()
 
     product = db.query(ProductModel).options(joinedload(ProductModel.category)).filter(ProductModel.id_key == pid).first()
 
@@ -999,5 +1143,6 @@ def admin_delete_product(id_key: str, db: Session = Depends(get_db), admin_check
 
     db.delete(product)
     db.commit()
+    invalidate_product_caches()
 
     return {"mensaje": "Producto eliminado"}
@@ -7,13 +7,21 @@ connection pool status, and threshold-based warnings.
 Thresholds:
 - DB Pool Utilization: Warning at 70%, Critical at 90%
 - DB Latency: Warning at 100ms, Critical at 500ms
-- Redis: Binary (up/down)
+- Redis: Binary (up/down); degraded while its circuit breaker isn't closed.
+  Redis is only pinged if no call succeeded recently and the circuit isn't
+  open, so frequent health checks don't add Redis round trips.
+
+/health_check/cache exposes the full per-namespace cache metrics of the
+worker that serves the request.
 """
+import os
 import time
 from fastapi import APIRouter
 from config.database import check_connection, engine
-from config.redis_config import check_redis_connection
-from datetime import datetime
+from config.redis_config import check_redis_connection, redis_breaker
+from services.cache_service import cache_service
+from services.cache_warmer import cache_warmer
+from datetime import datetime, timezone
 
 router = APIRouter()
 
@@ -58,7 +66,9 @@ def health_check():
 
     Returns the status of:
     - Database connection (with latency thresholds)
-    - Redis cache
+    - Redis cache (with its circuit breaker state)
+    - Cache hit ratios (this worker)
+    - Cache warm-up progress
     - Database connection pool metrics (with utilization thresholds)
     - System timestamp
     - Overall health level (healthy/warning/degraded/critical)
@@ -100,16 +110,24 @@ def health_check():
         }
     }
 
-    # Redis health check
+    # Redis health check (answered by the circuit breaker when possible)
     redis_status = check_redis_connection()
-    redis_health = "healthy" if redis_status else "degraded"
+    breaker = redis_breaker.snapshot()
+    redis_health = "healthy" if redis_status and breaker["state"] == "closed" else "degraded"
     component_statuses.append(redis_health)
 
     checks["redis"] = {
         "status": "up" if redis_status else "down",
-        "health": redis_health
+        "health": redis_health,
+        "circuit_breaker": breaker
     }
 
+    # Cache metrics summary for this worker (informational)
+    checks["cache"] = cache_service.metrics.summary()
+
+    # Cache warm-up progress (informational, doesn't affect overall status)
+    checks["cache_warmup"] = cache_warmer.status()
+
     # Database connection pool metrics with utilization thresholds
     try:
         pool = engine.pool
@@ -154,6 +172,24 @@ def health_check():
 
     return {
         "status": overall_status,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "checks": checks
     }
+
+
+@router.get("/cache")
+def cache_metrics():
+    """
+    Per-namespace cache counters and Redis latency histograms
+
+    Counters are kept per worker process; ``pid`` identifies the worker
+    that answered.
+
+    Returns:
+        Tier stats, codec, and {"namespaces": {...}, "totals": {...}}
+    """
+    return {
+        "pid": os.getpid(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **cache_service.metrics_snapshot(),
+    }
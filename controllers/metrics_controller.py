@@ -0,0 +1,23 @@
+"""
+Metrics Controller
+
+Serves Prometheus metrics for every worker (see config/metrics_config.py).
+"""
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from config.metrics_config import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus text exposition
+
+    Includes per-route request counts and latency histograms, in-flight
+    requests, and DB/Redis pool gauges, aggregated across workers.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,6 +1,7 @@
 """OrderDetail controller with proper dependency injection and rate limiting."""
 from fastapi import Depends, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
 from controllers.base_controller_impl import BaseControllerImpl
@@ -44,6 +45,9 @@ class OrderDetailController(BaseControllerImpl):
 
             This endpoint is rate-limited to 10 requests per minute per IP address
             to prevent order spam and abuse.
+
+            The handler must stay async for the rate limit decorator, so the
+            blocking service call is dispatched to the worker threadpool.
             """
             service = self.service_factory(db)
-            return service.save(schema_in)
\ No newline at end of file
+            return await run_in_threadpool(service.save, schema_in)
\ No newline at end of file
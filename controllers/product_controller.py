@@ -1,7 +1,7 @@
 """Product controller with proper dependency injection."""
 from controllers.base_controller_impl import BaseControllerImpl
 from schemas.product_schema import ProductSchema
-from services.product_service import ProductService
+from services.product_service import AsyncProductService, ProductService
 
 
 class ProductController(BaseControllerImpl):
@@ -11,5 +11,7 @@ class ProductController(BaseControllerImpl):
         super().__init__(
             schema=ProductSchema,
             service_factory=lambda db: ProductService(db),
+            async_service_factory=lambda db: AsyncProductService(db),  # Reads, when ASYNC_DB_ENABLED
+            raw_json_reads=True,  # Cache hits are served without re-validation
             tags=["Products"]
-        )
\ No newline at end of file
+        )
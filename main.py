@@ -13,8 +13,10 @@ from starlette import status
 from starlette.responses import JSONResponse
 
 from config.logging_config import setup_logging
-from config.database import create_tables, engine
+from config.database import create_tables, engine, dispose_async_engine
+from config.metrics_config import mark_worker_dead
 from config.redis_config import redis_config, check_redis_connection
+from config.threadpool_config import configure_threadpool
 from middleware.rate_limiter import RateLimiterMiddleware
 from middleware.request_id_middleware import RequestIDMiddleware
 
@@ -31,7 +33,10 @@ from controllers.product_controller import ProductController
 from controllers.review_controller import ReviewController
 from controllers.health_check import router as health_check_controller
 from controllers.compat_controller import router as compat_router
+from controllers.metrics_controller import router as metrics_router
 from repositories.base_repository_impl import InstanceNotFoundError
+from services.cache_service import cache_service
+from services.cache_warmer import cache_warmer
 
 
 def create_fastapi_app() -> FastAPI:
@@ -94,6 +99,7 @@ def create_fastapi_app() -> FastAPI:
 
     fastapi_app.include_router(health_check_controller, prefix="/health_check")
     fastapi_app.include_router(compat_router)
+    fastapi_app.include_router(metrics_router)
 
     # Add middleware (LIFO order - last added runs first / outermost)
     # 1) RequestID (innermost)
@@ -125,14 +131,31 @@ def create_fastapi_app() -> FastAPI:
         """Run on application startup"""
         logger.info("🚀 Starting FastAPI E-commerce API...")
 
+        # Bound the threadpool that runs sync (blocking DB) route handlers
+        configure_threadpool()
+
         # Ensure tables exist for MVP runs
         create_tables()
 
         # Check Redis connection
         if check_redis_connection():
             logger.info("✅ Redis cache is available")
+            # Open the async pool on this worker's loop (closed in shutdown)
+            if await redis_config.aping():
+                logger.info("✅ Redis async client connected")
+            else:
+                logger.warning("⚠️  Redis async client could not connect")
+            # Fill hot entries in the background so first requests don't all miss
+            # (one worker at a time: the others skip while it holds the warm-up lock)
+            if cache_warmer.start(reason="startup"):
+                logger.info("🔥 Cache warm-up started in background")
         else:
-            logger.warning("⚠️  Redis cache is NOT available - running without cache")
+            logger.warning("⚠️  Redis cache is NOT available - running without cache until it comes up")
+
+        # Also when Redis is down: the listener subscribes once it comes up,
+        # clearing L1 first, so the recovered cache starts coherent
+        if cache_service.start_invalidation_listener():
+            logger.info("✅ L1 cache enabled (cross-worker invalidation via pub/sub)")
 
     # Shutdown event: Graceful shutdown
     @fastapi_app.on_event("shutdown")
@@ -142,7 +165,10 @@ def create_fastapi_app() -> FastAPI:
 
         # Close Redis connection
         try:
+            cache_warmer.stop()
+            cache_service.stop_invalidation_listener()
             redis_config.close()
+            await redis_config.aclose()
             logger.info("✅ Redis connection closed")
         except Exception as e:
             logger.error(f"❌ Error closing Redis: {e}")
@@ -150,10 +176,14 @@ def create_fastapi_app() -> FastAPI:
         # Close database engine
         try:
             engine.dispose()
+            await dispose_async_engine()
             logger.info("✅ Database engine disposed")
         except Exception as e:
             logger.error(f"❌ Error disposing database engine: {e}")
 
+        # Stop counting this worker's in-flight/pool gauges in /metrics
+        mark_worker_dead()
+
         logger.info("✅ Shutdown complete")
 
     return fastapi_app
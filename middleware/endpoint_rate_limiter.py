@@ -3,13 +3,17 @@ Endpoint-Specific Rate Limiter
 
 Provides decorators for applying custom rate limits to specific endpoints.
 While global rate limiting protects the entire API, endpoint-specific limits
-protect expensive or abuse-prone operations.
+protect expensive or abuse-prone operations. Counting is one EVALSHA round
+trip on the asyncio Redis client (middleware/rate_limit_backends.py), or a
+per-worker in-memory token bucket while Redis is unreachable.
 """
 import logging
 import functools
 from typing import Callable
 from fastapi import Request, HTTPException, status
-from config.redis_config import get_redis_client
+from config.constants import RateLimitConfig
+from config.redis_config import get_redis_async_client
+from middleware.rate_limit_backends import FailoverRateLimitBackend, validate_algorithm
 
 logger = logging.getLogger(__name__)
 
@@ -27,17 +31,23 @@ class EndpointRateLimiter:
     This allows 10 order creations per 60 seconds per IP address.
     """
 
-    def __init__(self, calls: int, period: int):
+    def __init__(self, calls: int, period: int, algorithm: str = RateLimitConfig.ALGORITHM):
         """
         Initialize rate limiter
 
         Args:
             calls: Maximum number of calls allowed
             period: Time period in seconds
+            algorithm: fixed_window, sliding_window or gcra
+
+        Raises:
+            ValueError: If the algorithm is unknown
         """
         self.calls = calls
         self.period = period
-        self.redis_client = get_redis_client()
+        self.algorithm = validate_algorithm(algorithm)
+        self.redis_client = get_redis_async_client()
+        self.backend = FailoverRateLimitBackend(self.redis_client)
 
     def __call__(self, func: Callable) -> Callable:
         """
@@ -58,53 +68,33 @@ class EndpointRateLimiter:
             endpoint_path = request.url.path
             key = f"rate_limit:endpoint:{endpoint_path}:{client_ip}"
 
-            # Check if Redis is available
-            if self.redis_client is None:
-                logger.warning("Redis not available - endpoint rate limiting disabled")
-                return await func(request, *args, **kwargs)
-
             try:
-                # Get current request count
-                current = self.redis_client.get(key)
-
-                if current is None:
-                    # First request in this period
-                    pipe = self.redis_client.pipeline()
-                    pipe.set(key, 1)
-                    pipe.expire(key, self.period)
-                    pipe.execute()
-                    remaining = self.calls - 1
-                else:
-                    current = int(current)
-
-                    if current >= self.calls:
-                        # Rate limit exceeded
-                        ttl = self.redis_client.ttl(key)
-                        logger.warning(
-                            f"Endpoint rate limit exceeded for {client_ip} "
-                            f"on {endpoint_path}: {current}/{self.calls}"
-                        )
-                        raise HTTPException(
-                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                            detail=f"Rate limit exceeded for this endpoint. "
-                                   f"Maximum {self.calls} requests per {self.period} seconds. "
-                                   f"Try again in {ttl} seconds.",
-                            headers={
-                                "X-RateLimit-Limit": str(self.calls),
-                                "X-RateLimit-Remaining": "0",
-                                "X-RateLimit-Reset": str(ttl),
-                                "Retry-After": str(ttl),
-                            }
-                        )
-
-                    # Increment counter
-                    self.redis_client.incr(key)
-                    remaining = self.calls - current - 1
+                # Check, increment and expire atomically in one round trip
+                result = await self.backend.hit(key, self.calls, self.period, self.algorithm)
+
+                if not result.allowed:
+                    # Rate limit exceeded
+                    logger.warning(
+                        f"Endpoint rate limit exceeded for {client_ip} "
+                        f"on {endpoint_path}: limit {self.calls}"
+                    )
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail=f"Rate limit exceeded for this endpoint. "
+                               f"Maximum {self.calls} requests per {self.period} seconds. "
+                               f"Try again in {result.retry_after} seconds.",
+                        headers={
+                            "X-RateLimit-Limit": str(self.calls),
+                            "X-RateLimit-Remaining": "0",
+                            "X-RateLimit-Reset": str(result.reset),
+                            "Retry-After": str(result.retry_after),
+                        }
+                    )
 
                 # Execute the endpoint
                 logger.debug(
                     f"Endpoint rate limit check passed for {client_ip} "
-                    f"on {endpoint_path}: {remaining} remaining"
+                    f"on {endpoint_path}: {result.remaining} remaining"
                 )
                 return await func(request, *args, **kwargs)
 
@@ -0,0 +1,320 @@
+"""
+Rate Limit Backends
+
+Counter storage shared by RateLimiterMiddleware and EndpointRateLimiter.
+
+The Redis backend evaluates each algorithm as a Lua script run server-side
+through EVALSHA: check, update, expiry and the time to reset happen
+atomically in a single round trip, on the asyncio client so the event loop
+is never blocked. Scripts read the clock with TIME, so every worker agrees
+on window boundaries.
+
+Algorithms:
+    fixed_window    INCR per window; cheap, but allows up to 2x the limit
+                    across a window boundary.
+    sliding_window  Sliding-window counter: the previous window's count,
+                    weighted by how much of it still overlaps the sliding
+                    window, plus the current count. Rejected requests are
+                    not counted.
+    gcra            Generic cell rate algorithm (token bucket): one stored
+                    timestamp per client, requests spaced period/limit
+                    apart with bursts of up to limit.
+
+While Redis is unreachable or its circuit breaker is open,
+FailoverRateLimitBackend counts requests in per-worker token buckets
+(LocalRateLimitBackend) and switches back to Redis once it recovers.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional
+
+from config.constants import RateLimitConfig
+from config.redis_config import REDIS_FAILURES, redis_breaker
+from utils.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Every script takes KEYS[1]: client key, ARGV[1]: limit, ARGV[2]: period
+# (seconds) and returns {allowed (0/1), remaining, reset, retry_after}, with
+# reset = seconds until the full budget is available again and retry_after =
+# seconds until a rejected client may retry (0 when allowed).
+
+FIXED_WINDOW_LUA = """
+local current = redis.call('INCR', KEYS[1])
+local ttl = redis.call('TTL', KEYS[1])
+if ttl < 0 then
+    -- New window (or a counter left without expiry): start the clock once
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    ttl = tonumber(ARGV[2])
+end
+local limit = tonumber(ARGV[1])
+if current <= limit then
+    return {1, limit - current, ttl, 0}
+end
+return {0, 0, ttl, ttl}
+"""
+
+SLIDING_WINDOW_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local index = math.floor(now / window)
+local elapsed = now - index * window
+local current_key = KEYS[1] .. ':' .. index
+local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (index - 1))) or 0
+local current = tonumber(redis.call('GET', current_key)) or 0
+local estimate = previous * (window - elapsed) / window + current
+
+local allowed = 0
+local retry = 0
+if estimate + 1 <= limit then
+    allowed = 1
+    current = redis.call('INCR', current_key)
+    if current == 1 then
+        redis.call('PEXPIRE', current_key, window * 2)
+    end
+    estimate = estimate + 1
+elseif limit <= 0 then
+    retry = window
+else
+    local free = limit - 1 - current
+    if free >= 0 and previous > 0 then
+        -- Wait until the previous window's weight drops to free / previous
+        retry = window * (1 - free / previous) - elapsed
+    else
+        -- Wait for the next window, where today's count becomes the previous one
+        retry = window - elapsed + window * math.max(1 - (limit - 1) / current, 0)
+    end
+end
+
+local reset = 0
+if current > 0 then
+    reset = 2 * window - elapsed
+elseif previous > 0 then
+    reset = window - elapsed
+end
+return {allowed, math.max(math.floor(limit - estimate), 0), math.ceil(reset / 1000), math.ceil(retry / 1000)}
+"""
+
+GCRA_LUA = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000
+if limit <= 0 then
+    return {0, 0, ARGV[2], ARGV[2]}
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = period / limit
+-- Theoretical arrival time: when the bucket would be full again
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, math.ceil((tat - now) / 1000), math.ceil((allow_at - now) / 1000)}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval), math.ceil((new_tat - now) / 1000), 0}
+"""
+
+SCRIPTS = {
+    "fixed_window": FIXED_WINDOW_LUA,
+    "sliding_window": SLIDING_WINDOW_LUA,
+    "gcra": GCRA_LUA,
+}
+
+ALGORITHMS = tuple(SCRIPTS)
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of counting one request against a limit"""
+    allowed: bool
+    remaining: int
+    reset: int  # Seconds until the full budget is available again
+    retry_after: int = 0  # Seconds until a rejected client may retry
+
+
+def validate_algorithm(algorithm: str) -> str:
+    """
+    Check an algorithm name
+
+    Raises:
+        ValueError: If the algorithm is unknown
+    """
+    if algorithm not in SCRIPTS:
+        raise ValueError(f"Unknown rate limit algorithm '{algorithm}' (expected one of {', '.join(ALGORITHMS)})")
+    return algorithm
+
+
+class RedisRateLimitBackend:
+    """
+    Rate limit state in Redis, one EVALSHA per request
+
+    Scripts are loaded on first use (and reloaded after a Redis restart) by
+    redis-py's registered script wrapper.
+    """
+
+    def __init__(self, redis_client):
+        """
+        Args:
+            redis_client: redis.asyncio client (see config.redis_config)
+        """
+        self.redis_client = redis_client
+        self._scripts = {name: redis_client.register_script(source) for name, source in SCRIPTS.items()}
+
+    async def hit(self, key: str, calls: int, period: int, algorithm: str = "fixed_window") -> RateLimitResult:
+        """
+        Count a request and report whether it is within the limit
+
+        Args:
+            key: Client key (e.g. "rate_limit:{client_ip}")
+            calls: Max requests per period
+            period: Period in seconds
+            algorithm: One of ALGORITHMS
+
+        Returns:
+            RateLimitResult
+
+        Raises:
+            redis.RedisError: If Redis is unreachable (callers fail open)
+        """
+        allowed, remaining, reset, retry_after = await self._scripts[algorithm](
+            keys=[key], args=[calls, period]
+        )
+        return RateLimitResult(bool(int(allowed)), int(remaining), int(reset), int(retry_after))
+
+
+class LocalRateLimitBackend:
+    """
+    In-memory token buckets for one worker process
+
+    Every algorithm is served by a token bucket holding up to ``calls``
+    tokens, refilled at calls/period per second: the same budget gcra
+    enforces, and close to sliding_window. Buckets are kept in an LRU of at
+    most max_keys client keys, so memory stays bounded however many clients
+    show up; an evicted client starts again with a full bucket.
+
+    Limits apply per worker. Not thread-safe: hit() runs on the event loop
+    and never awaits.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = RateLimitConfig.LOCAL_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_keys: Max client keys tracked before the least recently
+                used is dropped
+            clock: Monotonic time source in seconds
+        """
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # key -> [tokens, updated_at]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def hit(self, key: str, calls: int, period: int, algorithm: str = "fixed_window") -> RateLimitResult:
+        """Count a request (same contract as RedisRateLimitBackend.hit, never raises)"""
+        if calls <= 0:
+            return RateLimitResult(False, 0, period, period)
+
+        now = self.clock()
+        rate = calls / period
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(calls)
+        else:
+            self._buckets.move_to_end(key)
+            tokens = min(float(calls), bucket[0] + (now - bucket[1]) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = [tokens, now]
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0 if allowed else math.ceil((1 - tokens) / rate)
+        return RateLimitResult(allowed, int(tokens), math.ceil((calls - tokens) / rate), retry_after)
+
+
+class FailoverRateLimitBackend:
+    """
+    Redis rate limiting that falls back to local buckets
+
+    Redis calls go through the circuit breaker shared with the cache. While
+    it lets calls through, requests are counted in Redis. A failed call, or
+    an open circuit (Redis failing or slow), sends requests to a
+    LocalRateLimitBackend; the breaker's half-open trial calls switch back
+    to Redis once it recovers. Without a Redis client every request is
+    counted locally.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        local: Optional[LocalRateLimitBackend] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            redis_client: redis.asyncio client, or None
+            local: Fallback backend (default: a new LocalRateLimitBackend)
+            breaker: Circuit breaker (default: config.redis_config.redis_breaker)
+            clock: Monotonic time source of the default local backend
+        """
+        self.redis = RedisRateLimitBackend(redis_client) if redis_client is not None else None
+        self.local = local if local is not None else LocalRateLimitBackend(clock=clock)
+        self.breaker = breaker if breaker is not None else redis_breaker
+        self.degraded = self.redis is None
+
+    @property
+    def mode(self) -> str:
+        """'redis' while counting in Redis, 'local' while falling back"""
+        return "local" if self.degraded else "redis"
+
+    async def hit(self, key: str, calls: int, period: int, algorithm: str = "fixed_window") -> RateLimitResult:
+        """
+        Count a request in Redis, or locally while Redis is unusable
+
+        Args:
+            key: Client key (e.g. "rate_limit:{client_ip}")
+            calls: Max requests per period
+            period: Period in seconds
+            algorithm: One of ALGORITHMS (Redis only; local uses a token bucket)
+
+        Returns:
+            RateLimitResult
+        """
+        if self.redis is not None:
+            if self.breaker.allow():
+                start = time.perf_counter()
+                try:
+                    result = await self.redis.hit(key, calls, period, algorithm)
+                except Exception as e:
+                    self.breaker.record(time.perf_counter() - start, failed=isinstance(e, REDIS_FAILURES))
+                    self._degrade(str(e))
+                else:
+                    self.breaker.record(time.perf_counter() - start)
+                    if self.degraded:
+                        self.degraded = False
+                        logger.info("✅ Redis rate limiting restored")
+                    return result
+            else:
+                self._degrade(f"circuit '{self.breaker.name}' is open")
+
+        return await self.local.hit(key, calls, period, algorithm)
+
+    def _degrade(self, reason: str) -> None:
+        if not self.degraded:
+            self.degraded = True
+            logger.warning(f"⚠️  Redis rate limiting unavailable, using per-worker limits: {reason}")
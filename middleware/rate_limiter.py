@@ -2,100 +2,175 @@
 Rate Limiting Middleware
 
 Protects the API from abuse by limiting the number of requests
-per client IP address using Redis.
+per client IP address using Redis. Each request costs one EVALSHA round
+trip on the asyncio client (middleware/rate_limit_backends.py). While Redis
+is unreachable, requests are counted in per-worker in-memory token buckets
+until it recovers.
+
+Route groups get their own per-IP budget and algorithm: catalog reads are
+generous, checkout writes (POST /api/boletas) strict. Requests outside every
+group share the default budget.
 """
 import os
 import logging
-from typing import Callable
+from typing import NamedTuple, Optional, Sequence, Tuple
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from config.redis_config import get_redis_client
+from config.constants import RateLimitConfig
+from config.redis_config import get_redis_async_client
+from middleware.rate_limit_backends import FailoverRateLimitBackend, RateLimitResult, validate_algorithm
 
 logger = logging.getLogger(__name__)
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
+class RouteGroup(NamedTuple):
+    """Routes sharing one per-IP budget"""
+    name: str
+    methods: Tuple[str, ...]
+    prefixes: Tuple[str, ...]  # Matches the path itself and anything below it
+    calls: int
+    period: int
+    algorithm: str
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and any(
+            path == prefix or path.startswith(prefix + "/") for prefix in self.prefixes
+        )
+
+
+DEFAULT_ROUTE_GROUPS = (
+    RouteGroup(
+        "checkout", ("POST",), ("/api/boletas",),
+        RateLimitConfig.CHECKOUT_CALLS, RateLimitConfig.CHECKOUT_PERIOD, RateLimitConfig.CHECKOUT_ALGORITHM,
+    ),
+    RouteGroup(
+        "catalog", ("GET", "HEAD"), ("/api/productos", "/api/categorias", "/products", "/categories"),
+        RateLimitConfig.CATALOG_CALLS, RateLimitConfig.CATALOG_PERIOD, RateLimitConfig.CATALOG_ALGORITHM,
+    ),
+)
+
+
+class RateLimiterMiddleware:
     """
     Rate limiting middleware using Redis
 
-    Limits requests per IP address within a time window.
+    Limits requests per IP address within a time window, per route group
+    (first matching group wins). Pure ASGI: the
+    rate-limit headers are added to the response start message as it is
+    sent, so response bodies stream through unbuffered.
     """
 
-    def __init__(self, app, calls: int = 100, period: int = 60):
+    EXCLUDED_PATHS = ("/health_check", "/metrics")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = 100,
+        period: int = 60,
+        algorithm: Optional[str] = None,
+        route_groups: Optional[Sequence[RouteGroup]] = None
+    ):
         """
         Initialize rate limiter
 
         Args:
             app: FastAPI application
-            calls: Maximum number of requests allowed
-            period: Time window in seconds
+            calls: Maximum number of requests allowed (default group)
+            period: Time window in seconds (default group)
+            algorithm: Default group algorithm (default: RATE_LIMIT_ALGORITHM)
+            route_groups: Groups with their own budget (default:
+                DEFAULT_ROUTE_GROUPS; pass () for a single budget)
+
+        Raises:
+            ValueError: If a group uses an unknown algorithm
         """
-        super().__init__(app)
+        self.app = app
         self.calls = int(os.getenv('RATE_LIMIT_CALLS', str(calls)))
         self.period = int(os.getenv('RATE_LIMIT_PERIOD', str(period)))
         self.enabled = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
-        self.redis_client = get_redis_client()
-
-        if self.enabled and self.redis_client:
+        self.default_group = RouteGroup(
+            "default", (), (), self.calls, self.period, algorithm or RateLimitConfig.ALGORITHM
+        )
+        self.route_groups = tuple(DEFAULT_ROUTE_GROUPS if route_groups is None else route_groups)
+        for group in (self.default_group, *self.route_groups):
+            validate_algorithm(group.algorithm)
+
+        self.redis_client = get_redis_async_client()
+        self.backend = FailoverRateLimitBackend(self.redis_client)
+
+        if self.enabled:
+            if not self.redis_client:
+                logger.warning("⚠️  Redis not available - rate limiting per worker (in memory)")
             logger.info(
                 f"✅ Rate limiting enabled: {self.calls} requests per "
-                f"{self.period} seconds per IP"
+                f"{self.period} seconds per IP ({self.default_group.algorithm})"
             )
+            for group in self.route_groups:
+                logger.info(
+                    f"✅ Rate limit group '{group.name}': {group.calls} requests per "
+                    f"{group.period} seconds per IP ({group.algorithm})"
+                )
         else:
-            logger.warning("⚠️  Rate limiting disabled (Redis not available)")
+            logger.warning("⚠️  Rate limiting disabled")
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with rate limiting
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/handler
-
-        Returns:
-            HTTP response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Skip if disabled or Redis unavailable
-        if not self.enabled or not self.redis_client:
-            return await call_next(request)
+        # Skip if disabled
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
 
-        # Skip rate limiting for health check endpoint
-        if request.url.path == "/health_check":
-            return await call_next(request)
+        # Skip rate limiting for health check and metrics scrapes
+        if scope["path"] in self.EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # Get client IP
-        client_ip = self._get_client_ip(request)
+        client_ip = self._get_client_ip(Request(scope))
+        group = self._route_group(scope["method"], scope["path"])
 
         # Check rate limit
-        if not self._is_allowed(client_ip):
-            logger.warning(f"⚠️  Rate limit exceeded for IP: {client_ip}")
-            return JSONResponse(
+        result = await self._check(group, client_ip)
+        if not result.allowed:
+            logger.warning(f"⚠️  Rate limit exceeded for IP: {client_ip} ({group.name})")
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
-                    "detail": f"Rate limit exceeded. Maximum {self.calls} requests "
-                              f"per {self.period} seconds.",
-                    "retry_after": self.period
+                    "detail": f"Rate limit exceeded. Maximum {group.calls} requests "
+                              f"per {group.period} seconds.",
+                    "retry_after": result.retry_after
                 },
                 headers={
-                    "Retry-After": str(self.period),
-                    "X-RateLimit-Limit": str(self.calls),
+                    "Retry-After": str(result.retry_after),
+                    "X-RateLimit-Limit": str(group.calls),
                     "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(self.period)
+                    "X-RateLimit-Reset": str(result.reset)
                 }
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add rate limit headers to response
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(group.calls)
+                headers["X-RateLimit-Remaining"] = str(result.remaining)
+                headers["X-RateLimit-Reset"] = str(result.reset)
+            await send(message)
 
         # Process request
-        response = await call_next(request)
-
-        # Add rate limit headers to response
-        remaining = self._get_remaining(client_ip)
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(self.period)
-
-        return response
+        await self.app(scope, receive, send_with_headers)
 
     def _get_client_ip(self, request: Request) -> str:
         """
@@ -120,83 +195,35 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
         # Fallback to direct client
         return request.client.host if request.client else "unknown"
 
-    def _is_allowed(self, client_ip: str) -> bool:
+    def _route_group(self, method: str, path: str) -> RouteGroup:
+        """First route group matching the request, or the default group"""
+        for group in self.route_groups:
+            if group.matches(method, path):
+                return group
+        return self.default_group
+
+    async def _check(self, group: RouteGroup, client_ip: str) -> RateLimitResult:
         """
-        Check if client is allowed to make request with atomic Redis operations
+        Count the request against the client's budget in one round trip
 
         Args:
+            group: Route group of the request
             client_ip: Client IP address
 
         Returns:
-            True if allowed, False if rate limit exceeded
+            RateLimitResult (allowed with a full budget if the check fails)
         """
-        try:
+        if group is self.default_group:
             key = f"rate_limit:{client_ip}"
+        else:
+            key = f"rate_limit:{group.name}:{client_ip}"
 
-            # Use pipeline to avoid race condition between incr and expire
-            pipe = self.redis_client.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, self.period)
-            results = pipe.execute()
-
-            # ✅ Verify both operations succeeded
-            if len(results) < 2:
-                logger.error(
-                    f"Pipeline returned incomplete results for {client_ip}: "
-                    f"expected 2, got {len(results)}"
-                )
-                return True  # Fail open on error
-
-            current = results[0]  # New counter value
-            expire_set = results[1]  # 1 if success, 0 if key doesn't exist
-
-            # ✅ If expire failed, force set expiration
-            if not expire_set:
-                logger.warning(
-                    f"Failed to set expiration for rate limit key: {key}, "
-                    f"forcing expiration"
-                )
-                try:
-                    self.redis_client.expire(key, self.period)
-                except Exception as exp_error:
-                    logger.error(f"Failed to force expiration for {key}: {exp_error}")
-                    # Delete key to prevent permanent block
-                    try:
-                        self.redis_client.delete(key)
-                    except Exception:
-                        pass
-
-            # Check if limit exceeded
-            return current <= self.calls
-
+        try:
+            return await self.backend.hit(key, group.calls, group.period, group.algorithm)
         except Exception as e:
             logger.error(f"Rate limiting error for {client_ip}: {e}")
             # On error, allow request (fail open)
-            return True
-
-    def _get_remaining(self, client_ip: str) -> int:
-        """
-        Get remaining requests for client
-
-        Args:
-            client_ip: Client IP address
-
-        Returns:
-            Number of remaining requests
-        """
-        try:
-            key = f"rate_limit:{client_ip}"
-            current = self.redis_client.get(key)
-
-            if current is None:
-                return self.calls
-
-            remaining = self.calls - int(current)
-            return max(0, remaining)
-
-        except Exception as e:
-            logger.error(f"Error getting remaining requests for {client_ip}: {e}")
-            return self.calls
+            return RateLimitResult(True, group.calls, group.period)
 
 
 # Alternative: Decorator-based rate limiter for specific endpoints
@@ -213,10 +240,12 @@ class EndpointRateLimiter:
             return {"message": "success"}
     """
 
-    def __init__(self, calls: int = 10, period: int = 60):
+    def __init__(self, calls: int = 10, period: int = 60, algorithm: str = RateLimitConfig.ALGORITHM):
         self.calls = calls
         self.period = period
-        self.redis_client = get_redis_client()
+        self.algorithm = validate_algorithm(algorithm)
+        self.redis_client = get_redis_async_client()
+        self.backend = FailoverRateLimitBackend(self.redis_client)
 
     def __call__(self, func):
         async def wrapper(*args, **kwargs):
@@ -225,20 +254,20 @@ class EndpointRateLimiter:
                 (arg for arg in args if isinstance(arg, Request)), None
             )
 
-            if not request or not self.redis_client:
+            if not request:
                 return await func(*args, **kwargs)
 
             client_ip = self._get_client_ip(request)
             key = f"endpoint_rate_limit:{func.__name__}:{client_ip}"
 
-            # Check rate limit using pipeline to avoid race condition
-            pipe = self.redis_client.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, self.period)
-            results = pipe.execute()
-            current = results[0]
+            # Check, increment and expire atomically in one round trip
+            try:
+                result = await self.backend.hit(key, self.calls, self.period, self.algorithm)
+            except Exception as e:
+                logger.error(f"Endpoint rate limiting error for {client_ip}: {e}")
+                return await func(*args, **kwargs)
 
-            if current > self.calls:
+            if not result.allowed:
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail=f"Endpoint rate limit exceeded. Maximum {self.calls} "
@@ -3,19 +3,27 @@ Request ID Middleware
 
 Adds unique request ID to every request for distributed tracing and logging.
 Each request gets a unique identifier that can be tracked across all logs.
+Request counts, latency and in-flight requests are also recorded here for
+/metrics (config/metrics_config.py).
 """
 import uuid
 import logging
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
-from starlette.responses import Response
-from typing import Callable
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.metrics_config import (
+    HTTP_IN_FLIGHT,
+    observe_request,
+    refresh_pool_gauges,
+    route_label,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+class RequestIDMiddleware:
     """
     Middleware that adds a unique request ID to every HTTP request.
 
@@ -29,6 +37,14 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
     - Returned in response header X-Request-ID
     - Used for tracing requests across services
 
+    Each request's duration is recorded in the per-route latency histogram,
+    labelled with the route's path template.
+
+    Pure ASGI: headers are added to the response start message as it is
+    sent, so the body (including streaming responses) passes through
+    untouched, without the extra task and memory stream that
+    BaseHTTPMiddleware adds per request.
+
     Example usage:
         app.add_middleware(RequestIDMiddleware)
 
@@ -38,64 +54,85 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         [abc123] Query executed: SELECT * FROM products LIMIT 10
     """
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable
-    ) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and inject request ID
 
         Args:
-            request: The incoming HTTP request
-            call_next: The next middleware or route handler
-
-        Returns:
-            HTTP response with X-Request-ID header
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel (response gets the X-Request-ID header)
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Get request ID from header or generate new one
-        request_id = request.headers.get('X-Request-ID') or str(uuid.uuid4())
+        request_id = Headers(scope=scope).get('X-Request-ID') or str(uuid.uuid4())
 
         # Store in request state for access in route handlers
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        method, path = scope["method"], scope["path"]
+        client = scope.get("client")
 
         # Log request start
         start_time = time.time()
+        started = time.perf_counter()
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
         logger.info(
-            f"[{request_id}] → {request.method} {request.url.path} "
-            f"(client: {request.client.host if request.client else 'unknown'})"
+            f"[{request_id}] → {method} {path} "
+            f"(client: {client[0] if client else 'unknown'})"
         )
 
-        try:
-            # Process request
-            response = await call_next(request)
+        response_started = False
 
-            # Calculate request duration
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
 
-            # Log request completion
-            logger.info(
-                f"[{request_id}] ← {request.method} {request.url.path} "
-                f"- {response.status_code} ({duration_ms}ms)"
-            )
+                # Calculate request duration (time to response headers)
+                duration_ms = round((time.time() - start_time) * 1000, 2)
+                observe_request(method, route_label(scope), message["status"], time.perf_counter() - started)
 
-            # Add request ID to response headers
-            response.headers['X-Request-ID'] = request_id
+                # Log request completion
+                logger.info(
+                    f"[{request_id}] ← {method} {path} "
+                    f"- {message['status']} ({duration_ms}ms)"
+                )
 
-            # Add timing header for performance monitoring
-            response.headers['X-Response-Time'] = f"{duration_ms}ms"
+                headers = MutableHeaders(scope=message)
+                # Add request ID to response headers
+                headers['X-Request-ID'] = request_id
+                # Add timing header for performance monitoring
+                headers['X-Response-Time'] = f"{duration_ms}ms"
 
-            return response
+            await send(message)
+
+        try:
+            # Process request
+            await self.app(scope, receive, send_with_request_id)
 
         except Exception as e:
             # Log errors with request ID
             duration_ms = round((time.time() - start_time) * 1000, 2)
+            if not response_started:
+                observe_request(method, route_label(scope), 500, time.perf_counter() - started)
             logger.error(
-                f"[{request_id}] ✗ {request.method} {request.url.path} "
+                f"[{request_id}] ✗ {method} {path} "
                 f"- ERROR: {str(e)} ({duration_ms}ms)"
             )
             raise
 
+        finally:
+            in_flight.dec()
+            refresh_pool_gauges()
+
 
 class RequestIDFilter(logging.Filter):
     """
@@ -4,7 +4,7 @@ SqlAlchemy model for products.
 This module defines the ProductModel class which represents a product in the database.
 """
 
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, CheckConstraint
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String, CheckConstraint, Index, false, text
 from sqlalchemy.orm import relationship
 
 from models.base_model import BaseModel
@@ -21,6 +21,13 @@ class ProductModel(BaseModel):
     Database constraints:
         - stock must be >= 0 (enforced at DB level)
         - price must be > 0 (enforced by Pydantic validation)
+
+    Composite (name, id_key) and (price, id_key) indexes serve keyset pagination
+    of the catalog sorted by name or price, so those columns are NOT NULL. The lower(name) index serves
+    case-insensitive name lookups (checkout product resolution).
+
+    ``placeholder`` marks products the checkout created for unknown basket
+    items: their stock isn't tracked, so orders never reserve it.
     """
 
     __tablename__ = 'products'
@@ -28,14 +35,18 @@ class ProductModel(BaseModel):
     # Table-level constraints
     __table_args__ = (
         CheckConstraint('stock >= 0', name='check_product_stock_non_negative'),
+        Index('ix_products_name_id_key', 'name', 'id_key'),
+        Index('ix_products_price_id_key', 'price', 'id_key'),
+        Index('ix_products_lower_name', text('lower(name)')),
     )
 
-    name = Column(String, index=True)
-    price = Column(Float, index=True)
+    name = Column(String, nullable=False, index=True)
+    price = Column(Float, nullable=False, index=True)
     stock = Column(Integer, default=0, nullable=False, index=True)
     image = Column(String, nullable=True)  # URL de imagen (Cloudinary)
     description = Column(String, nullable=True)  # Descripción del producto
     category_id = Column(Integer, ForeignKey('categories.id_key'), index=True)
+    placeholder = Column(Boolean, nullable=False, default=False, server_default=false())  # Created at checkout
 
     category = relationship(
         'CategoryModel',
@@ -0,0 +1,170 @@
+"""
+Async BaseRepository implementation on top of SQLAlchemy AsyncSession
+"""
+from typing import Type, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.base_model import BaseModel
+from repositories.base_repository_impl import InstanceNotFoundError, RepositoryQueryMixin
+from schemas.base_schema import BaseSchema
+
+
+class BaseAsyncRepositoryImpl(RepositoryQueryMixin):
+    """
+    Non-blocking counterpart of BaseRepositoryImpl
+
+    Shares validation and statement building with the sync repository
+    (RepositoryQueryMixin), so errors and return types match, but every
+    database operation is awaited. Schema conversion runs through
+    ``AsyncSession.run_sync`` so relationships the schemas touch can still be
+    lazy-loaded without blocking the event loop.
+    """
+
+    def __init__(self, model: Type[BaseModel], schema: Type[BaseSchema], db: AsyncSession):
+        super().__init__(model, schema, db)
+
+    @property
+    def session(self) -> AsyncSession:
+        """Get the async database session"""
+        return self._session
+
+    async def _to_schema(self, model: BaseModel) -> BaseSchema:
+        """Convert a model to its schema inside the session's greenlet"""
+        return await self.session.run_sync(lambda _: self.schema.model_validate(model))
+
+    async def _to_schemas(self, models: List[BaseModel]) -> List[BaseSchema]:
+        """Convert several models to schemas in a single greenlet switch"""
+        return await self.session.run_sync(
+            lambda _: [self.schema.model_validate(model) for model in models]
+        )
+
+    async def _get_instance(self, id_key: int) -> BaseModel:
+        """Load an instance by ID or raise InstanceNotFoundError"""
+        stmt = select(self.model).where(self.model.id_key == id_key)
+        instance = (await self.session.scalars(stmt)).first()
+
+        if instance is None:
+            raise InstanceNotFoundError(
+                f"{self.model.__name__} with id {id_key} not found"
+            )
+        return instance
+
+    async def find(self, id_key: int) -> BaseSchema:
+        """
+        Find a single record by ID
+
+        Raises:
+            InstanceNotFoundError: If the record is not found
+        """
+        try:
+            return await self._to_schema(await self._get_instance(id_key))
+        except InstanceNotFoundError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error finding {self.model.__name__} with id {id_key}: {e}")
+            raise
+
+    async def find_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[BaseSchema]:
+        """
+        Find all records with pagination and input validation
+
+        Raises:
+            ValueError: If pagination parameters are invalid
+        """
+        try:
+            limit = self._validate_pagination(skip, limit)
+
+            stmt = self._find_all_statement(skip, limit, after_id)
+            models = (await self.session.scalars(stmt)).all()
+            return await self._to_schemas(models)
+
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error finding all {self.model.__name__}: {e}")
+            raise
+
+    async def find_many(self, ids: List[int]) -> List[BaseSchema]:
+        """Find several records by ID in a single query, in the order of ``ids``"""
+        if not ids:
+            return []
+
+        try:
+            stmt = select(self.model).where(self.model.id_key.in_(ids))
+            models = {model.id_key: model for model in (await self.session.scalars(stmt)).all()}
+            return await self._to_schemas([models[id_key] for id_key in ids if id_key in models])
+        except Exception as e:
+            self.logger.error(f"Error finding {len(ids)} {self.model.__name__} records by id: {e}")
+            raise
+
+    async def save(self, model: BaseModel) -> BaseSchema:
+        """Save a new record to the database"""
+        try:
+            self.session.add(model)
+            await self.session.commit()
+            await self.session.refresh(model)
+            return await self._to_schema(model)
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error saving {self.model.__name__}: {e}")
+            raise
+
+    async def update(self, id_key: int, changes: dict) -> BaseSchema:
+        """
+        Update an existing record with security validation
+
+        Raises:
+            InstanceNotFoundError: If the record is not found
+            ValueError: If trying to update invalid or protected fields
+        """
+        try:
+            instance = await self._get_instance(id_key)
+            self._apply_changes(instance, changes)
+
+            await self.session.commit()
+            await self.session.refresh(instance)
+            return await self._to_schema(instance)
+
+        except InstanceNotFoundError:
+            raise
+        except ValueError:
+            await self.session.rollback()
+            raise
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error updating {self.model.__name__} with id {id_key}: {e}")
+            raise
+
+    async def remove(self, id_key: int) -> None:
+        """
+        Delete a record from the database
+
+        Raises:
+            InstanceNotFoundError: If the record is not found
+        """
+        try:
+            instance = await self._get_instance(id_key)
+            await self.session.delete(instance)
+            await self.session.commit()
+        except InstanceNotFoundError:
+            raise
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error deleting {self.model.__name__} with id {id_key}: {e}")
+            raise
+
+    async def save_all(self, models: List[BaseModel]) -> List[BaseSchema]:
+        """Save multiple records in a single transaction"""
+        try:
+            self.session.add_all(models)
+            await self.session.commit()
+
+            for model in models:
+                await self.session.refresh(model)
+
+            return await self._to_schemas(models)
+        except Exception as e:
+            await self.session.rollback()
+            self.logger.error(f"Error saving multiple {self.model.__name__}: {e}")
+            raise
@@ -46,7 +46,7 @@ class BaseRepository(ABC):
     @abstractmethod
     def find_all(self) -> List[BaseSchema]:
         """
-        Find all records
+        Find all records (offset or keyset pagination)
         :return: List[BaseSchema]
         """
 
@@ -4,13 +4,22 @@ BaseRepository implementation with best practices and sanitized logging
 import logging
 from typing import Type, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, text
 
 from models.base_model import BaseModel
 from repositories.base_repository import BaseRepository
 from schemas.base_schema import BaseSchema
+from config.constants import PaginationConfig
 from utils.logging_utils import log_repository_error, create_user_safe_error, get_sanitized_logger
 
+# Protected attributes that should never be updated
+PROTECTED_ATTRIBUTES = {
+    'id_key',  # Primary key
+    '_sa_instance_state',  # SQLAlchemy internal
+    '__class__',  # Python magic attribute
+    '__dict__',  # Python magic attribute
+}
+
 
 class InstanceNotFoundError(Exception):
     """
@@ -19,22 +28,20 @@ class InstanceNotFoundError(Exception):
     pass
 
 
-class BaseRepositoryImpl(BaseRepository):
+class RepositoryQueryMixin:
     """
-    Base Repository Implementation with proper error handling and SQLAlchemy 2.0 patterns
+    Session-independent parts shared by the sync and async repositories
+
+    Holds the model, schema and session, validates pagination and updates,
+    and builds statements; executing them is left to each repository.
     """
 
-    def __init__(self, model: Type[BaseModel], schema: Type[BaseSchema], db: Session):
+    def __init__(self, model: Type[BaseModel], schema: Type[BaseSchema], db):
         self._model = model
         self._schema = schema
         self._session = db
         self.logger = get_sanitized_logger(__name__)  # P11: Sanitized logging
 
-    @property
-    def session(self) -> Session:
-        """Get the database session"""
-        return self._session
-
     @property
     def model(self) -> Type[BaseModel]:
         """Get the SQLAlchemy model class"""
@@ -45,6 +52,119 @@ class BaseRepositoryImpl(BaseRepository):
         """Get the Pydantic schema class"""
         return self._schema
 
+    def _validate_pagination(self, skip: int, limit: int) -> int:
+        """
+        Validate pagination parameters and cap the limit
+
+        Returns:
+            The limit to use (capped at PaginationConfig.MAX_LIMIT)
+
+        Raises:
+            ValueError: If skip or limit is out of range
+        """
+        # Validate skip parameter
+        if skip < 0:
+            raise ValueError("skip parameter must be >= 0")
+
+        # Validate limit parameter
+        if limit < PaginationConfig.MIN_LIMIT:
+            raise ValueError(
+                f"limit parameter must be >= {PaginationConfig.MIN_LIMIT}"
+            )
+
+        # Cap limit at maximum to prevent excessive queries
+        if limit > PaginationConfig.MAX_LIMIT:
+            self.logger.warning(
+                f"Limit {limit} exceeds maximum {PaginationConfig.MAX_LIMIT}, "
+                f"capping to maximum"
+            )
+            limit = PaginationConfig.MAX_LIMIT
+
+        return limit
+
+    def _find_all_statement(self, skip: int, limit: int, after_id: Optional[int]):
+        """
+        Build the offset or keyset (after_id) page query
+
+        Both modes order by id_key, so offset pages are stable and the last
+        id of any full page is a valid keyset position.
+        """
+        if after_id is None:
+            return select(self.model).order_by(self.model.id_key.asc()).offset(skip).limit(limit)
+
+        return (
+            select(self.model)
+            .where(self.model.id_key > after_id)
+            .order_by(self.model.id_key.asc())
+            .limit(limit)
+        )
+
+    def _apply_changes(self, instance: BaseModel, changes: dict) -> None:
+        """
+        Apply validated field changes to a loaded instance
+
+        Raises:
+            ValueError: If trying to update invalid or protected fields
+        """
+        # Get allowed columns from model
+        allowed_columns = {col.name for col in self.model.__table__.columns}
+
+        # Validate and update only allowed fields
+        for key, value in changes.items():
+            # Skip None values
+            if value is None:
+                continue
+
+            # Check if key starts with underscore (internal attribute)
+            if key.startswith('_'):
+                self.logger.warning(
+                    f"Attempt to update protected attribute '{key}' blocked"
+                )
+                raise ValueError(
+                    f"Cannot update protected attribute: {key}"
+                )
+
+            # Check against protected list
+            if key in PROTECTED_ATTRIBUTES:
+                self.logger.warning(
+                    f"Attempt to update protected attribute '{key}' blocked"
+                )
+                raise ValueError(
+                    f"Cannot update protected attribute: {key}"
+                )
+
+            # Validate field exists in model
+            if key not in allowed_columns:
+                self.logger.warning(
+                    f"Attempt to update non-existent field '{key}' blocked"
+                )
+                raise ValueError(
+                    f"Invalid field for {self.model.__name__}: {key}"
+                )
+
+            # Validate attribute exists on instance
+            if not hasattr(instance, key):
+                raise ValueError(
+                    f"Field {key} not found in {self.model.__name__}"
+                )
+
+            # All validations passed - safe to update
+            setattr(instance, key, value)
+
+
+class BaseRepositoryImpl(RepositoryQueryMixin, BaseRepository):
+    """
+    Base Repository Implementation with proper error handling and SQLAlchemy 2.0 patterns
+    """
+
+    def __init__(self, model: Type[BaseModel], schema: Type[BaseSchema], db: Session):
+        super().__init__(model, schema, db)
+
+    @property
+    def session(self) -> Session:
+        """Get the database session"""
+        return self._session
+
     def find(self, id_key: int) -> BaseSchema:
         """
         Find a single record by ID
@@ -75,7 +195,7 @@ class BaseRepositoryImpl(BaseRepository):
             self.logger.error(f"Error finding {self.model.__name__} with id {id_key}: {e}")
             raise
 
-    def find_all(self, skip: int = 0, limit: int = 100) -> List[BaseSchema]:
+    def find_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[BaseSchema]:
         """
         Find all records with pagination and input validation
 
@@ -85,6 +205,8 @@ class BaseRepositoryImpl(BaseRepository):
         Args:
             skip: Number of records to skip (must be >= 0)
             limit: Maximum number of records to return (must be 1-1000)
+            after_id: Keyset mode - return records with id_key greater than this,
+                ordered by id_key (skip is ignored; no rows are scanned and discarded)
 
         Returns:
             List of schema instances
@@ -92,28 +214,10 @@ class BaseRepositoryImpl(BaseRepository):
         Raises:
             ValueError: If pagination parameters are invalid
         """
-        from config.constants import PaginationConfig, ErrorMessages
-
         try:
-            # Validate skip parameter
-            if skip < 0:
-                raise ValueError("skip parameter must be >= 0")
-
-            # Validate limit parameter
-            if limit < PaginationConfig.MIN_LIMIT:
-                raise ValueError(
-                    f"limit parameter must be >= {PaginationConfig.MIN_LIMIT}"
-                )
-
-            # Cap limit at maximum to prevent excessive queries
-            if limit > PaginationConfig.MAX_LIMIT:
-                self.logger.warning(
-                    f"Limit {limit} exceeds maximum {PaginationConfig.MAX_LIMIT}, "
-                    f"capping to maximum"
-                )
-                limit = PaginationConfig.MAX_LIMIT
+            limit = self._validate_pagination(skip, limit)
 
-            stmt = select(self.model).offset(skip).limit(limit)
+            stmt = self._find_all_statement(skip, limit, after_id)
             models = self.session.scalars(stmt).all()
             return [self.schema.model_validate(model) for model in models]
 
@@ -123,6 +227,49 @@ class BaseRepositoryImpl(BaseRepository):
             self.logger.error(f"Error finding all {self.model.__name__}: {e}")
             raise
 
+    def find_many(self, ids: List[int]) -> List[BaseSchema]:
+        """
+        Find several records by ID in a single query
+
+        Args:
+            ids: Primary key values
+
+        Returns:
+            Schema instances in the order of ``ids`` (missing IDs are skipped)
+        """
+        if not ids:
+            return []
+
+        try:
+            stmt = select(self.model).where(self.model.id_key.in_(ids))
+            models = {model.id_key: model for model in self.session.scalars(stmt).all()}
+            return [self.schema.model_validate(models[id_key]) for id_key in ids if id_key in models]
+        except Exception as e:
+            self.logger.error(f"Error finding {len(ids)} {self.model.__name__} records by id: {e}")
+            raise
+
+    def estimated_count(self) -> Optional[int]:
+        """
+        Approximate row count from planner statistics (no table scan)
+
+        Only PostgreSQL keeps these statistics (pg_class.reltuples, refreshed
+        by VACUUM/ANALYZE). Returns None on other databases or when the table
+        has never been analyzed, so callers can fall back to an exact count.
+        """
+        if self.session.get_bind().dialect.name != "postgresql":
+            return None
+
+        try:
+            estimate = self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+                {"table": self.model.__tablename__},
+            ).scalar()
+        except Exception as e:
+            self.logger.error(f"Error estimating count for {self.model.__name__}: {e}")
+            return None
+
+        return int(estimate) if estimate is not None and estimate >= 0 else None
+
     def save(self, model: BaseModel) -> BaseSchema:
         """
         Save a new record to the database
@@ -161,14 +308,6 @@ class BaseRepositoryImpl(BaseRepository):
             InstanceNotFoundError: If the record is not found
             ValueError: If trying to update invalid or protected fields
         """
-        # Protected attributes that should never be updated
-        PROTECTED_ATTRIBUTES = {
-            'id_key',  # Primary key
-            '_sa_instance_state',  # SQLAlchemy internal
-            '__class__',  # Python magic attribute
-            '__dict__',  # Python magic attribute
-        }
-
         try:
             stmt = select(self.model).where(self.model.id_key == id_key)
             instance = self.session.scalars(stmt).first()
@@ -178,50 +317,7 @@ class BaseRepositoryImpl(BaseRepository):
                     f"{self.model.__name__} with id {id_key} not found"
                 )
 
-            # Get allowed columns from model
-            allowed_columns = {col.name for col in self.model.__table__.columns}
-
-            # Validate and update only allowed fields
-            for key, value in changes.items():
-                # Skip None values
-                if value is None:
-                    continue
-
-                # Check if key starts with underscore (internal attribute)
-                if key.startswith('_'):
-                    self.logger.warning(
-                        f"Attempt to update protected attribute '{key}' blocked"
-                    )
-                    raise ValueError(
-                        f"Cannot update protected attribute: {key}"
-                    )
-
-                # Check against protected list
-                if key in PROTECTED_ATTRIBUTES:
-                    self.logger.warning(
-                        f"Attempt to update protected attribute '{key}' blocked"
-                    )
-                    raise ValueError(
-                        f"Cannot update protected attribute: {key}"
-                    )
-
-                # Validate field exists in model
-                if key not in allowed_columns:
-                    self.logger.warning(
-                        f"Attempt to update non-existent field '{key}' blocked"
-                    )
-                    raise ValueError(
-                        f"Invalid field for {self.model.__name__}: {key}"
-                    )
-
-                # Validate attribute exists on instance
-                if not hasattr(instance, key):
-                    raise ValueError(
-                        f"Field {key} not found in {self.model.__name__}"
-                    )
-
-                # All validations passed - safe to update
-                setattr(instance, key, value)
+            self._apply_changes(instance, changes)
 
             self.session.commit()
             self.session.refresh(instance)
@@ -1,7 +1,9 @@
 """Category repository for database operations."""
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.category import CategoryModel
+from repositories.base_async_repository_impl import BaseAsyncRepositoryImpl
 from repositories.base_repository_impl import BaseRepositoryImpl
 from schemas.category_schema import CategorySchema
 
@@ -10,4 +12,11 @@ class CategoryRepository(BaseRepositoryImpl):
     """Repository for Category entity database operations."""
 
     def __init__(self, db: Session):
-        super().__init__(CategoryModel, CategorySchema, db)
\ No newline at end of file
+        super().__init__(CategoryModel, CategorySchema, db)
+
+
+class AsyncCategoryRepository(BaseAsyncRepositoryImpl):
+    """Non-blocking repository for Category reads and writes on an AsyncSession."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(CategoryModel, CategorySchema, db)
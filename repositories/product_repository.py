@@ -1,7 +1,9 @@
 """Product repository for database operations."""
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.product import ProductModel
+from repositories.base_async_repository_impl import BaseAsyncRepositoryImpl
 from repositories.base_repository_impl import BaseRepositoryImpl
 from schemas.product_schema import ProductSchema
 
@@ -10,4 +12,11 @@ class ProductRepository(BaseRepositoryImpl):
     """Repository for Product entity database operations."""
 
     def __init__(self, db: Session):
-        super().__init__(ProductModel, ProductSchema, db)
\ No newline at end of file
+        super().__init__(ProductModel, ProductSchema, db)
+
+
+class AsyncProductRepository(BaseAsyncRepositoryImpl):
+    """Non-blocking repository for Product reads and writes on an AsyncSession."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(ProductModel, ProductSchema, db)
@@ -5,6 +5,7 @@ This script runs Uvicorn with multiple workers to handle 400+ concurrent request
 """
 import multiprocessing
 import os
+import tempfile
 
 import uvicorn
 from config.database import create_tables
@@ -27,6 +28,11 @@ TIMEOUT_KEEP_ALIVE = int(os.getenv('TIMEOUT_KEEP_ALIVE', '5'))
 LIMIT_CONCURRENCY = int(os.getenv('LIMIT_CONCURRENCY', '1000'))
 LIMIT_MAX_REQUESTS = int(os.getenv('LIMIT_MAX_REQUESTS', '10000'))
 
+# Workers share /metrics samples through this directory (see config/metrics_config.py)
+METRICS_DIR = os.getenv(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'ecommerce-prometheus')
+)
+
 if __name__ == "__main__":
     # Create database tables before starting server
     print("📦 Creating database tables...")
@@ -36,6 +42,12 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"⚠️  Database tables may already exist or error occurred: {e}\n")
 
+    # Workers are separate processes: share metrics samples through files.
+    # Must be set before the workers import prometheus_client
+    if WORKERS > 1:
+        from config.metrics_config import prepare_multiprocess_dir
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = prepare_multiprocess_dir(METRICS_DIR)
+
     print(f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║  🚀 FastAPI E-commerce - High Performance Production Mode  ║
@@ -48,6 +60,7 @@ if __name__ == "__main__":
   • Backlog: {BACKLOG} pending connections
   • Max concurrency: {LIMIT_CONCURRENCY} requests
   • Keep-alive timeout: {TIMEOUT_KEEP_ALIVE}s
+  • Metrics: /metrics (aggregated across workers)
 
 🔥 Optimized for ~400 concurrent requests
 💾 Database pool: 50 connections + 100 overflow per worker
@@ -0,0 +1,195 @@
+"""
+Module for Async Base Service Implementation
+"""
+from typing import Dict, List, Optional, Tuple, Type
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.constants import CacheConfig
+from models.base_model import BaseModel
+from services.base_service_impl import json_array, to_json
+from services.cache_service import TOMBSTONE, cache_service
+from repositories.base_async_repository_impl import BaseAsyncRepositoryImpl
+from repositories.base_repository_impl import InstanceNotFoundError
+from schemas.base_schema import BaseSchema
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+
+class BaseAsyncServiceImpl:
+    """
+    Async Base Service Implementation (awaits a BaseAsyncRepositoryImpl)
+
+    Same operations as BaseServiceImpl, as coroutines. It is a separate class
+    rather than a subclass, so a sync service can never be handed one.
+    """
+
+    def __init__(self, repository_class: Type[BaseAsyncRepositoryImpl],
+                 model: Type[BaseModel],
+                 schema: Type[BaseSchema],
+                 db: AsyncSession):
+        self._repository_class = repository_class
+        self._repository = repository_class(db)
+        self._model = model
+        self._schema = schema
+
+    @property
+    def repository(self) -> BaseAsyncRepositoryImpl:
+        """Repository to access database"""
+        return self._repository
+
+    @property
+    def schema(self) -> Type[BaseSchema]:
+        """Pydantic Schema to validate data"""
+        return self._schema
+
+    @property
+    def model(self) -> Type[BaseModel]:
+        """SQLAlchemy Model"""
+        return self._model
+
+    async def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[BaseSchema]:
+        """Get all data with pagination (keyset mode when after_id is given)"""
+        return await self.repository.find_all(skip=skip, limit=limit, after_id=after_id)
+
+    async def get_one(self, id_key: int) -> BaseSchema:
+        """Get one data"""
+        return await self.repository.find(id_key)
+
+    async def get_all_json(self, skip: int = 0, limit: int = 100,
+                           after_id: Optional[int] = None) -> Tuple[str, List[int]]:
+        """
+        Get all data as a serialized JSON array body
+
+        Returns:
+            (JSON array, id_key of each item in order)
+        """
+        items = await self.get_all(skip=skip, limit=limit, after_id=after_id)
+        return json_array(to_json(item) for item in items), [item.id_key for item in items]
+
+    async def get_one_json(self, id_key: int) -> str:
+        """Get one data as a serialized JSON body"""
+        return to_json(await self.get_one(id_key))
+
+    async def save(self, schema: BaseSchema) -> BaseSchema:
+        """Save data"""
+        return await self.repository.save(self.to_model(schema))
+
+    async def update(self, id_key: int, schema: BaseSchema) -> BaseSchema:
+        """Update data"""
+        return await self.repository.update(id_key, schema.model_dump(exclude_unset=True))
+
+    async def delete(self, id_key: int) -> None:
+        """Delete data"""
+        await self.repository.remove(id_key)
+
+    def to_model(self, schema: BaseSchema) -> BaseModel:
+        """Convert schema to model"""
+        return self.model(**schema.model_dump(exclude_unset=True))
+
+
+class CachedAsyncServiceImpl(BaseAsyncServiceImpl):
+    """
+    Async reads through the same cache entries as the sync services
+
+    Pages are cached as id lists under {cache_prefix}:ids:... and every item
+    as its response JSON under {cache_prefix}:id:..., exactly like
+    ProductService / CategoryService, so both paths share hits and the sync
+    write paths' invalidation covers both. Redis is reached through the
+    asyncio client (cache_service.aget & co.).
+    """
+
+    cache_prefix: str = ""
+    cache_ttl: Optional[int] = None  # None: REDIS_CACHE_TTL
+
+    def __init__(self, repository_class: Type[BaseAsyncRepositoryImpl],
+                 model: Type[BaseModel],
+                 schema: Type[BaseSchema],
+                 db: AsyncSession):
+        super().__init__(repository_class, model, schema, db)
+        self.cache = cache_service
+
+    def _page_key(self, skip: int, limit: int, after_id: Optional[int]) -> str:
+        """Cache key of a page of ids (same as the sync service)"""
+        page = {"after": after_id} if after_id is not None else {"skip": skip}
+        return self.cache.build_key(self.cache_prefix, "ids", limit=limit, **page)
+
+    def _item_key(self, id_key: int) -> str:
+        """Cache key of a single item's JSON (same as the sync service)"""
+        return self.cache.build_key(self.cache_prefix, "id", id=id_key)
+
+    async def get_all_json(self, skip: int = 0, limit: int = 100,
+                           after_id: Optional[int] = None) -> Tuple[str, List[int]]:
+        """
+        Get a page as a serialized JSON array, from the cache when possible
+
+        Returns:
+            (JSON array, id_key of each item in order)
+        """
+        if not self.cache.is_async_available():
+            return await super().get_all_json(skip, limit, after_id)
+
+        cache_key = self._page_key(skip, limit, after_id)
+        cached_ids = await self.cache.aget(cache_key)
+        if cached_ids is not None:
+            logger.debug(f"Cache HIT: {cache_key}")
+            bodies = await self._get_many_json(cached_ids)
+        else:
+            logger.debug(f"Cache MISS: {cache_key}")
+            items = await self.get_all(skip=skip, limit=limit, after_id=after_id)
+            bodies = {item.id_key: to_json(item) for item in items}
+            await self.cache.aset(cache_key, list(bodies), ttl=self.cache_ttl)
+            await self.cache.aset_many(
+                {self._item_key(id_key): body for id_key, body in bodies.items()},
+                ttl=self.cache_ttl,
+            )
+
+        return json_array(bodies.values()), list(bodies)
+
+    async def _get_many_json(self, ids: List[int]) -> Dict[int, str]:
+        """Serialized items by id from per-id keys, loading misses in one query"""
+        keys = [self._item_key(id_key) for id_key in ids]
+        cached = await self.cache.aget_many(keys)
+
+        missing = [
+            id_key for id_key, key in zip(ids, keys)
+            if not isinstance(cached.get(key), str) and not self.cache.is_tombstone(cached.get(key))
+        ]
+        loaded = {item.id_key: to_json(item) for item in await self.repository.find_many(missing)} if missing else {}
+        if loaded:
+            await self.cache.aset_many(
+                {self._item_key(id_key): body for id_key, body in loaded.items()},
+                ttl=self.cache_ttl,
+            )
+
+        bodies = {}
+        for id_key, key in zip(ids, keys):
+            body = loaded.get(id_key) or cached.get(key)
+            if isinstance(body, str):
+                bodies[id_key] = body
+        return bodies
+
+    async def get_one_json(self, id_key: int) -> str:
+        """
+        Get one item as serialized JSON, from the cache when possible
+
+        Raises:
+            InstanceNotFoundError: If the item doesn't exist (tombstoned)
+        """
+        cache_key = self._item_key(id_key)
+
+        cached = await self.cache.aget(cache_key)
+        if isinstance(cached, str):
+            logger.debug(f"Cache HIT: {cache_key}")
+            return cached
+        if self.cache.is_tombstone(cached):
+            logger.debug(f"Cache HIT (not found): {cache_key}")
+            raise InstanceNotFoundError(f"{self.model.__name__} with id {id_key} not found")
+
+        logger.debug(f"Cache MISS: {cache_key}")
+        try:
+            body = to_json(await self.get_one(id_key))
+        except InstanceNotFoundError:
+            await self.cache.aset(cache_key, TOMBSTONE, ttl=CacheConfig.NEGATIVE_TTL)
+            raise
+        await self.cache.aset(cache_key, body, ttl=self.cache_ttl)
+        return body
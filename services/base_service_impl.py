@@ -1,7 +1,7 @@
 """
 Module for Base Service Implementation
 """
-from typing import List, Type
+from typing import Iterable, List, Optional, Tuple, Type
 from sqlalchemy.orm import Session
 from models.base_model import BaseModel
 from services.base_service import BaseService
@@ -9,6 +9,16 @@ from repositories.base_repository import BaseRepository
 from schemas.base_schema import BaseSchema
 
 
+def to_json(schema: BaseSchema) -> str:
+    """Serialize a schema exactly as a FastAPI response_model would"""
+    return schema.model_dump_json(by_alias=True)
+
+
+def json_array(bodies: Iterable[str]) -> str:
+    """Join already-serialized JSON values into a JSON array"""
+    return "[" + ",".join(bodies) + "]"
+
+
 class BaseServiceImpl(BaseService):
     """Base Service Implementation"""
 
@@ -36,14 +46,29 @@ class BaseServiceImpl(BaseService):
         """SQLAlchemy Model"""
         return self._model
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[BaseSchema]:
-        """Get all data with pagination"""
-        return self.repository.find_all(skip=skip, limit=limit)
+    def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[BaseSchema]:
+        """Get all data with pagination (keyset mode when after_id is given)"""
+        return self.repository.find_all(skip=skip, limit=limit, after_id=after_id)
 
     def get_one(self, id_key: int) -> BaseSchema:
         """Get one data"""
         return self.repository.find(id_key)
 
+    def get_all_json(self, skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None) -> Tuple[str, List[int]]:
+        """
+        Get all data as a serialized JSON array body
+
+        Returns:
+            (JSON array, id_key of each item in order)
+        """
+        items = self.get_all(skip=skip, limit=limit, after_id=after_id)
+        return json_array(to_json(item) for item in items), [item.id_key for item in items]
+
+    def get_one_json(self, id_key: int) -> str:
+        """Get one data as a serialized JSON body"""
+        return to_json(self.get_one(id_key))
+
     def save(self, schema: BaseSchema) -> BaseSchema:
         """Save data"""
         return self.repository.save(self.to_model(schema))
@@ -0,0 +1,168 @@
+"""
+Cache Codec Module
+
+Serialization of values stored by CacheService. Payloads are binary and
+start with a two-byte header:
+
+    byte 0: 0xF8 + format version. Bytes 0xF8-0xFF never start UTF-8 text,
+            so entries written before the header existed (plain JSON
+            strings) are recognized and decoded as legacy JSON.
+    byte 1: codec id in the low nibble, FLAG_ZLIB when the body is
+            compressed.
+
+Decoding looks only at the header, so workers configured with different
+codecs (e.g. during a rollout) read each other's entries. Payloads with an
+unknown version or codec raise CacheDecodeError and are treated as misses.
+Nothing is ever unpickled.
+"""
+import json
+import logging
+import zlib
+from typing import Any, Dict, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # Optional: falls back to JSON
+    msgpack = None
+
+from config.constants import CacheConfig
+
+logger = logging.getLogger(__name__)
+
+HEADER_BASE = 0xF8
+FORMAT_VERSION = 1
+CODEC_MASK = 0x0F
+FLAG_ZLIB = 0x10
+
+CODEC_TEXT = 0
+CODEC_JSON = 1
+CODEC_MSGPACK = 2
+
+
+class CacheDecodeError(ValueError):
+    """Raised when a cached payload can't be decoded (unknown format or corrupt)"""
+    pass
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(body: bytes) -> Any:
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+class CacheCodec:
+    """
+    Encodes values to versioned, optionally compressed payloads
+
+    Strings are stored as UTF-8 text (no serialization), so pre-serialized
+    response bodies cost nothing to decode. Other values use the configured
+    codec: msgpack when installed, JSON otherwise. Bodies of at least
+    ``compress_min_bytes`` are zlib-compressed when that makes them smaller.
+    """
+
+    def __init__(
+        self,
+        codec: str = CacheConfig.CODEC,
+        compress_min_bytes: int = CacheConfig.COMPRESS_MIN_BYTES,
+        compress_level: int = CacheConfig.COMPRESS_LEVEL
+    ):
+        if codec == "msgpack" and msgpack is None:
+            logger.warning("⚠️  msgpack not installed, cache values will be JSON encoded")
+            codec = "json"
+        if codec not in ("json", "msgpack"):
+            raise ValueError(f"Unknown cache codec: {codec}")
+
+        self.name = codec
+        self.codec_id = CODEC_MSGPACK if codec == "msgpack" else CODEC_JSON
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Serialize value to a payload
+
+        Raises:
+            TypeError: If the value can't be serialized
+        """
+        if isinstance(value, str):
+            codec_id, body = CODEC_TEXT, value.encode("utf-8")
+        elif self.codec_id == CODEC_MSGPACK:
+            codec_id, body = CODEC_MSGPACK, _msgpack_dumps(value)
+        else:
+            codec_id, body = CODEC_JSON, _json_dumps(value)
+
+        flags = codec_id
+        if self.compress_min_bytes and len(body) >= self.compress_min_bytes:
+            compressed = zlib.compress(body, self.compress_level)
+            if len(compressed) < len(body):
+                flags |= FLAG_ZLIB
+                body = compressed
+
+        return bytes((HEADER_BASE + FORMAT_VERSION, flags)) + body
+
+    def decode(self, payload: Union[bytes, str]) -> Any:
+        """
+        Deserialize a payload produced by encode() or a legacy JSON string
+
+        Raises:
+            CacheDecodeError: If the format is unknown or the payload corrupt
+        """
+        if isinstance(payload, str):
+            return self._decode_legacy(payload)
+        if not payload or payload[0] < HEADER_BASE:
+            return self._decode_legacy(payload)
+
+        if payload[0] - HEADER_BASE != FORMAT_VERSION or len(payload) < 2:
+            raise CacheDecodeError(f"Unsupported cache format version {payload[0] - HEADER_BASE}")
+
+        flags = payload[1]
+        body = payload[2:]
+        try:
+            if flags & FLAG_ZLIB:
+                body = zlib.decompress(body)
+
+            codec_id = flags & CODEC_MASK
+            if codec_id == CODEC_TEXT:
+                return body.decode("utf-8")
+            if codec_id == CODEC_JSON:
+                return json.loads(body)
+            if codec_id == CODEC_MSGPACK and msgpack is not None:
+                return _msgpack_loads(body)
+        except CacheDecodeError:
+            raise
+        except Exception as e:
+            raise CacheDecodeError(f"Corrupt cache payload: {e}")
+
+        raise CacheDecodeError(f"Unsupported cache codec {flags & CODEC_MASK}")
+
+    @staticmethod
+    def _decode_legacy(payload: Union[bytes, str]) -> Any:
+        """Entries written before the header: JSON, or a raw string"""
+        try:
+            return json.loads(payload)
+        except (json.JSONDecodeError, TypeError, UnicodeDecodeError):
+            pass
+        if isinstance(payload, bytes):
+            try:
+                return payload.decode("utf-8")
+            except UnicodeDecodeError:
+                raise CacheDecodeError("Corrupt legacy cache payload")
+        return payload
+
+    def describe(self) -> Dict[str, Optional[Any]]:
+        """Codec settings, for stats and health output"""
+        return {
+            "codec": self.name,
+            "version": FORMAT_VERSION,
+            "compress_min_bytes": self.compress_min_bytes or None,
+        }
+
+
+# Global codec instance
+cache_codec = CacheCodec()
@@ -0,0 +1,158 @@
+"""
+Cache Metrics Module
+
+Per-namespace cache instrumentation for CacheService. A namespace is the
+first two key segments ("products:list:compat:..." -> "products:list"),
+the same grouping used by the key index.
+
+Counters: hits, misses, sets, evictions (L1 capacity evictions), errors,
+lock_waits (callers that waited on, or deferred to, another caller's
+computation) and fallback_computes (values computed without the cache
+because it was unavailable). Redis round trips are recorded in latency
+histograms per namespace and operation.
+
+Metrics are kept per worker process.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+COUNTERS = ("hits", "misses", "sets", "evictions", "errors", "lock_waits", "fallback_computes")
+
+# Upper bounds in milliseconds; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0)
+
+
+def key_namespace(key: str) -> str:
+    """Namespace of a key or pattern: its first two segments"""
+    return ":".join(key.split(":", 2)[:2])
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; guarded by CacheMetrics)"""
+
+    __slots__ = ("bounds", "counts", "count", "total_ms")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th observation (None for +Inf)"""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class CacheMetrics:
+    """Thread-safe per-namespace counters and latency histograms"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.started_at = time.time()
+
+    def incr(self, key: str, counter: str, amount: int = 1) -> None:
+        """
+        Increment a counter for the namespace of key
+
+        Args:
+            key: Cache key (or pattern) the event concerns
+            counter: One of COUNTERS
+            amount: Increment
+        """
+        namespace = key_namespace(key)
+        with self._lock:
+            counters = self._counters.get(namespace)
+            if counters is None:
+                counters = self._counters[namespace] = dict.fromkeys(COUNTERS, 0)
+            counters[counter] += amount
+
+    def observe(self, key: str, op: str, seconds: float) -> None:
+        """Record the latency of a Redis operation on key"""
+        slot = (key_namespace(key), op)
+        with self._lock:
+            histogram = self._latency.get(slot)
+            if histogram is None:
+                histogram = self._latency[slot] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds * 1000)
+
+    @staticmethod
+    def _hit_ratio(counters: Dict[str, int]) -> float:
+        lookups = counters["hits"] + counters["misses"]
+        return round(counters["hits"] / lookups, 4) if lookups else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Every counter and histogram, grouped by namespace
+
+        Returns:
+            {"since": epoch, "namespaces": {ns: {counters..., "hit_ratio",
+             "latency": {op: histogram}}}, "totals": {counters..., "hit_ratio"}}
+        """
+        with self._lock:
+            namespaces = {
+                namespace: {**counters, "hit_ratio": self._hit_ratio(counters), "latency": {}}
+                for namespace, counters in self._counters.items()
+            }
+            for (namespace, op), histogram in self._latency.items():
+                namespaces.setdefault(
+                    namespace, {**dict.fromkeys(COUNTERS, 0), "hit_ratio": 0.0, "latency": {}}
+                )["latency"][op] = histogram.snapshot()
+
+        totals = dict.fromkeys(COUNTERS, 0)
+        for counters in namespaces.values():
+            for counter in COUNTERS:
+                totals[counter] += counters[counter]
+        totals["hit_ratio"] = self._hit_ratio(totals)
+
+        return {"since": self.started_at, "namespaces": dict(sorted(namespaces.items())), "totals": totals}
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals plus the hit ratio of each namespace (for /health_check)"""
+        snapshot = self.snapshot()
+        return {
+            **snapshot["totals"],
+            "namespaces": {
+                namespace: metrics["hit_ratio"]
+                for namespace, metrics in snapshot["namespaces"].items()
+                if metrics["hits"] or metrics["misses"]
+            },
+        }
+
+    def reset(self) -> None:
+        """Drop every counter and histogram"""
+        with self._lock:
+            self._counters.clear()
+            self._latency.clear()
+            self.started_at = time.time()
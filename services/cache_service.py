@@ -2,41 +2,203 @@
 Cache Service Module
 
 Provides high-level caching operations using Redis with automatic
-serialization, TTL management, error handling, and distributed cache stampede protection.
+serialization, TTL management, error handling, and distributed cache stampede protection
+(stale-while-revalidate and probabilistic early expiration in get_or_set).
+
+Values are encoded by services/cache_codec.py (msgpack or JSON, zlib above
+a size threshold, versioned header); entries written as plain JSON by
+earlier versions are still readable.
+
+aget, aset, aget_many, aset_many and adelete are the asyncio counterparts
+of the basic operations, for code running on the event loop; they share
+the L1 tier, codec, key index and metrics with the sync methods.
+
+An optional per-worker L1 cache (CACHE_L1_ENABLED) sits in front of Redis.
+Invalidations are broadcast over Redis pub/sub so every worker evicts its
+own L1 copy.
+
+Hits, misses, sets, errors, evictions, lock waits, fallback computes and
+Redis latency are recorded per key namespace (services/cache_metrics.py).
+
+Redis calls go through the shared circuit breaker (config.redis_config):
+while it is open the cache reports itself unavailable, so reads miss and
+get_or_set computes directly instead of waiting on a slow or dead Redis.
+
+delete_pattern never uses KEYS: keys written through set() are indexed
+per namespace (first two key segments), so invalidating "products:list:*"
+only touches the keys in that namespace.
 """
 import json
+import math
+import random
+import re
 import logging
+import threading
 import time
-from typing import Optional, Any, List, Callable
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Any, Dict, List, Callable, Tuple
 from datetime import timedelta
 import os
 
-from config.redis_config import get_redis_client
+from config.constants import CacheConfig
+from config.redis_config import get_redis_async_binary_client, get_redis_binary_client, guarded, redis_breaker
+from services.cache_codec import CacheCodec, CacheDecodeError, cache_codec
+from services.cache_metrics import CacheMetrics
+from services.local_cache import LocalCache
 from utils.logging_utils import get_sanitized_logger
 
 logger = get_sanitized_logger(__name__)
 
+_MISSING = object()
+
+# Stored under an entity's key when it doesn't exist (negative caching)
+TOMBSTONE = {"_tombstone": 1}
+
+# Index keys: cache:keys:<namespace> is a sorted set of the keys of a
+# namespace scored by their expiry time, and cache:ns:<prefix> holds the
+# namespaces under a first segment.
+KEY_SET_PREFIX = "cache:keys:"
+NAMESPACE_SET_PREFIX = "cache:ns:"
+NAMESPACE_PATTERN = re.compile(r"^([^:*?\[\]]+)(?::([^:*?\[\]]+))?:\*$")
+
+# Deletes KEYS[1] only while it still holds this caller's token (ARGV[1]), so
+# a refresh that outlived its lock never releases the next holder's lock.
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class CacheService:
     """
     Cache service for storing and retrieving data from Redis
 
-    Handles JSON serialization/deserialization and provides
+    Handles serialization/deserialization (see CacheCodec) and provides
     convenient methods for common caching patterns.
 
-    Uses distributed Redis locks for cache stampede protection,
-    making it safe for multi-worker/multi-process deployments.
+    Uses distributed Redis locks and stale-while-revalidate for cache
+    stampede protection, making it safe for multi-worker/multi-process
+    deployments.
+
+    With the L1 tier enabled, reads check the local LRU first and
+    writes populate both tiers. L1 entries live at most L1_MAX_TTL seconds.
     """
 
-    def __init__(self):
-        self.redis_client = get_redis_client()
+    def __init__(self, local: Optional[LocalCache] = None, codec: Optional[CacheCodec] = None):
+        self.breaker = redis_breaker
+        self.redis_client = guarded(get_redis_binary_client(), self.breaker)
+        self.async_redis_client = guarded(get_redis_async_binary_client(), self.breaker)
+        self.codec = codec or cache_codec
         self.enabled = os.getenv('REDIS_ENABLED', 'true').lower() == 'true'
         self.default_ttl = int(os.getenv('REDIS_CACHE_TTL', '300'))  # 5 minutes
         self.lock_timeout = 10  # Lock auto-expire after 10 seconds
 
+        # L1 tier and cross-worker invalidation
+        if local is None and CacheConfig.L1_ENABLED:
+            local = LocalCache(CacheConfig.L1_MAX_ENTRIES, CacheConfig.L1_MAX_BYTES, codec=self.codec)
+        self.local = local
+        self.local_ttl = CacheConfig.L1_MAX_TTL
+        self.worker_id = uuid.uuid4().hex
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.metrics = CacheMetrics()
+        if self.local is not None:
+            self.local.on_evict = lambda evicted: self.metrics.incr(evicted, "evictions")
+        self._listener: Optional[threading.Thread] = None
+        self._listener_stop = threading.Event()
+
+        # get_or_set: in-flight computations and background refreshes
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
     def is_available(self) -> bool:
-        """Check if cache is available"""
-        return self.enabled and self.redis_client is not None
+        """Check if cache is available (Redis connected and its circuit not open)"""
+        return self.enabled and self.redis_client is not None and not self.breaker.is_open()
+
+    def is_async_available(self) -> bool:
+        """Check if the async cache methods can reach Redis"""
+        return self.enabled and self.async_redis_client is not None and not self.breaker.is_open()
+
+    def _remember(self, key: str, raw: bytes, ttl: float, value: Any = None, decoded: bool = False) -> None:
+        """Store a payload in L1 for at most ttl seconds (no-op when L1 is disabled)"""
+        if self.local is not None and isinstance(raw, (bytes, str)):
+            self.local.set(key, raw, min(ttl, self.local_ttl), value=value, decoded=decoded)
+
+    def _remaining_ttl(self, pttl: Any) -> float:
+        """Seconds a key read from Redis has left, from its PTTL reply"""
+        if isinstance(pttl, int) and pttl >= 0:
+            return pttl / 1000
+        return self.default_ttl  # No expiry (-1), or no PTTL was read
+
+    def _read_redis(self, key: str, with_ttl: bool = False) -> Tuple[Optional[bytes], Optional[int]]:
+        """
+        Read a raw payload from Redis, counting hits and misses
+
+        With with_ttl the key's PTTL is read in the same round trip, so L1
+        never keeps a copy longer than Redis does.
+        """
+        start = time.perf_counter()
+        pttl = None
+        if with_ttl:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.pttl(key)
+            value, pttl = pipe.execute()
+        else:
+            value = self.redis_client.get(key)
+        self.metrics.observe(key, "get", time.perf_counter() - start)
+        if value is None:
+            self.redis_misses += 1
+        else:
+            self.redis_hits += 1
+        return value, pttl
+
+    def _mget_redis(self, client: Any, keys: List[str]) -> Any:
+        """Queue an MGET plus, when L1 will keep the values, a PTTL per key"""
+        pipe = client.pipeline(transaction=False)
+        pipe.mget(keys)
+        if self.local is not None:
+            for key in keys:
+                pipe.pttl(key)
+        return pipe
+
+    def _decode_hit(self, key: str, raw: Optional[bytes], op: str, pttl: Any = None) -> Any:
+        """Decode a Redis reply for key and count it (_MISSING on a miss)"""
+        if raw is None:
+            self.redis_misses += 1
+            self.metrics.incr(key, "misses")
+            return _MISSING
+        try:
+            value = self.codec.decode(raw)
+        except CacheDecodeError as e:
+            # Unknown format (e.g. written by a newer version): treat as a miss
+            logger.warning(f"Cache {op} undecodable value for key '{key}': {e}")
+            self.redis_misses += 1
+            self.metrics.incr(key, "misses")
+            self.metrics.incr(key, "errors")
+            return _MISSING
+        self.redis_hits += 1
+        self.metrics.incr(key, "hits")
+        self._remember(key, raw, self._remaining_ttl(pttl), value=value, decoded=True)
+        return value
+
+    def _get_local_many(self, keys: List[str], found: Dict[str, Any]) -> List[str]:
+        """Fill found from L1 and return the keys still to read from Redis"""
+        if self.local is None:
+            return list(keys)
+        pending = []
+        for key in keys:
+            value = self.local.get(key, _MISSING)
+            if value is _MISSING:
+                pending.append(key)
+            else:
+                self.metrics.incr(key, "hits")
+                found[key] = value
+        return pending
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -51,20 +213,33 @@ class CacheService:
         if not self.is_available():
             return None
 
+        if self.local is not None:
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                self.metrics.incr(key, "hits")
+                return value
+
         try:
-            value = self.redis_client.get(key)
-            if value is None:
+            raw, pttl = self._read_redis(key, with_ttl=self.local is not None)
+            if raw is None:
+                self.metrics.incr(key, "misses")
                 return None
 
-            # Try to deserialize JSON
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                # Return raw value if not JSON
-                return value
+            value = self.codec.decode(raw)
+            self._remember(key, raw, self._remaining_ttl(pttl), value=value, decoded=True)
+            self.metrics.incr(key, "hits")
+            return value
 
+        except CacheDecodeError as e:
+            # Unknown format (e.g. written by a newer version): treat as a miss
+            logger.warning(f"Cache GET undecodable value for key '{key}': {e}")
+            self.metrics.incr(key, "misses")
+            self.metrics.incr(key, "errors")
+            return None
         except Exception as e:
             logger.error(f"Cache GET error for key '{key}': {e}")
+            self.metrics.incr(key, "misses")
+            self.metrics.incr(key, "errors")
             return None
 
     def set(
@@ -78,7 +253,8 @@ class CacheService:
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized if possible)
+            value: Value to cache (strings are stored as text, other values
+                are serialized by the codec)
             ttl: Time to live in seconds (default: REDIS_CACHE_TTL)
 
         Returns:
@@ -88,18 +264,142 @@ class CacheService:
             return False
 
         try:
-            # Serialize to JSON if not a string
-            if not isinstance(value, str):
-                value = json.dumps(value)
+            raw = self.codec.encode(value)
 
             ttl = ttl or self.default_ttl
-            self.redis_client.setex(key, ttl, value)
+            start = time.perf_counter()
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(key, ttl, raw)
+            self._index_key(pipe, key, ttl)
+            pipe.execute()
+            self.metrics.observe(key, "set", time.perf_counter() - start)
+            self.metrics.incr(key, "sets")
+            # L1 decodes its own copy, so the caller's value isn't shared
+            self._remember(key, raw, ttl)
             return True
 
         except Exception as e:
             logger.error(f"Cache SET error for key '{key}': {e}")
+            self.metrics.incr(key, "errors")
+            return False
+
+    def set_tombstone(self, key: str, ttl: Optional[int] = None) -> bool:
+        """
+        Remember that the entity cached under key doesn't exist
+
+        Lookups of missing ids (e.g. bots scanning ids) are then answered
+        from the cache for a short while. Writers creating the entity must
+        delete the key.
+
+        Args:
+            key: Cache key of the entity
+            ttl: Time to live in seconds (default: CacheConfig.NEGATIVE_TTL)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.set(key, TOMBSTONE, ttl or CacheConfig.NEGATIVE_TTL)
+
+    @staticmethod
+    def is_tombstone(value: Any) -> bool:
+        """Whether a cached value is a tombstone written by set_tombstone()"""
+        return isinstance(value, dict) and value.get("_tombstone") == 1
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values in one round trip (MGET)
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of the keys that were found to their values
+        """
+        if not self.is_available() or not keys:
+            return {}
+
+        found: Dict[str, Any] = {}
+        pending = self._get_local_many(keys, found)
+        if not pending:
+            return found
+
+        try:
+            start = time.perf_counter()
+            raws, *pttls = self._mget_redis(self.redis_client, pending).execute()
+            self.metrics.observe(pending[0], "mget", time.perf_counter() - start)
+
+            for key, raw, pttl in zip(pending, raws, pttls or [None] * len(pending)):
+                value = self._decode_hit(key, raw, "MGET", pttl)
+                if value is not _MISSING:
+                    found[key] = value
+        except Exception as e:
+            logger.error(f"Cache MGET error for {len(pending)} keys: {e}")
+            self.metrics.incr(pending[0], "errors")
+
+        return found
+
+    def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Set several values in one pipelined round trip
+
+        Args:
+            mapping: Keys and values (values are encoded like set())
+            ttl: Time to live in seconds for every key (default: REDIS_CACHE_TTL)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.is_available() or not mapping:
+            return False
+
+        try:
+            ttl = ttl or self.default_ttl
+            raws = {key: self.codec.encode(value) for key, value in mapping.items()}
+
+            start = time.perf_counter()
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, raw in raws.items():
+                pipe.setex(key, ttl, raw)
+                self._index_key(pipe, key, ttl)
+            pipe.execute()
+            self.metrics.observe(next(iter(raws)), "mset", time.perf_counter() - start)
+
+            for key, raw in raws.items():
+                self.metrics.incr(key, "sets")
+                self._remember(key, raw, ttl)
+            return True
+
+        except Exception as e:
+            logger.error(f"Cache SET MANY error for {len(mapping)} keys: {e}")
+            self.metrics.incr(next(iter(mapping)), "errors")
             return False
 
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete several keys in pipelined batches
+
+        Args:
+            keys: Cache keys to delete
+
+        Returns:
+            Number of keys deleted
+        """
+        if not self.is_available() or not keys:
+            return 0
+
+        if self.local is not None:
+            for key in keys:
+                self.local.delete(key)
+
+        try:
+            deleted = self._unlink(list(keys))
+            self._publish_invalidation("keys", list(keys))
+            return deleted
+        except Exception as e:
+            logger.error(f"Cache DELETE MANY error for {len(keys)} keys: {e}")
+            self.metrics.incr(keys[0], "errors")
+            return 0
+
     def delete(self, key: str) -> bool:
         """
         Delete key from cache
@@ -113,17 +413,234 @@ class CacheService:
         if not self.is_available():
             return False
 
+        if self.local is not None:
+            self.local.delete(key)
+
         try:
             self.redis_client.delete(key)
+            self._publish_invalidation("key", key)
             return True
         except Exception as e:
             logger.error(f"Cache DELETE error for key '{key}': {e}")
+            self.metrics.incr(key, "errors")
             return False
 
+    # -- asyncio counterparts ------------------------------------------------
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Get value from cache without blocking the event loop (see get)
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found or cache unavailable
+        """
+        if not self.is_async_available():
+            return None
+
+        if self.local is not None:
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                self.metrics.incr(key, "hits")
+                return value
+
+        try:
+            start = time.perf_counter()
+            pttl = None
+            if self.local is not None:
+                pipe = self.async_redis_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = await pipe.execute()
+            else:
+                raw = await self.async_redis_client.get(key)
+            self.metrics.observe(key, "get", time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"Cache AGET error for key '{key}': {e}")
+            self.metrics.incr(key, "misses")
+            self.metrics.incr(key, "errors")
+            return None
+
+        value = self._decode_hit(key, raw, "AGET", pttl)
+        return None if value is _MISSING else value
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values in one round trip (see get_many)
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of the keys that were found to their values
+        """
+        if not self.is_async_available() or not keys:
+            return {}
+
+        found: Dict[str, Any] = {}
+        pending = self._get_local_many(keys, found)
+        if not pending:
+            return found
+
+        try:
+            start = time.perf_counter()
+            raws, *pttls = await self._mget_redis(self.async_redis_client, pending).execute()
+            self.metrics.observe(pending[0], "mget", time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"Cache AMGET error for {len(pending)} keys: {e}")
+            self.metrics.incr(pending[0], "errors")
+            return found
+
+        for key, raw, pttl in zip(pending, raws, pttls or [None] * len(pending)):
+            value = self._decode_hit(key, raw, "AMGET", pttl)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        Set value in cache without blocking the event loop (see set)
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (default: REDIS_CACHE_TTL)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._astore({key: value}, ttl, "set")
+
+    async def aset_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Set several values in one pipelined round trip (see set_many)
+
+        Args:
+            mapping: Keys and values (values are encoded like set())
+            ttl: Time to live in seconds for every key (default: REDIS_CACHE_TTL)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._astore(mapping, ttl, "mset")
+
+    async def _astore(self, mapping: Dict[str, Any], ttl: Optional[int], op: str) -> bool:
+        """Write and index values in one pipelined round trip, timed as op"""
+        if not self.is_async_available() or not mapping:
+            return False
+
+        try:
+            ttl = ttl or self.default_ttl
+            raws = {key: self.codec.encode(value) for key, value in mapping.items()}
+
+            start = time.perf_counter()
+            pipe = self.async_redis_client.pipeline(transaction=False)
+            for key, raw in raws.items():
+                pipe.setex(key, ttl, raw)
+                self._index_key(pipe, key, ttl)
+            await pipe.execute()
+            self.metrics.observe(next(iter(raws)), op, time.perf_counter() - start)
+
+            for key, raw in raws.items():
+                self.metrics.incr(key, "sets")
+                self._remember(key, raw, ttl)
+            return True
+
+        except Exception as e:
+            logger.error(f"Cache ASET error for {len(mapping)} keys: {e}")
+            self.metrics.incr(next(iter(mapping)), "errors")
+            return False
+
+    async def adelete(self, key: str) -> bool:
+        """
+        Delete key from cache without blocking the event loop (see delete)
+
+        Args:
+            key: Cache key to delete
+
+        Returns:
+            True if deleted, False otherwise
+        """
+        if not self.is_async_available():
+            return False
+
+        if self.local is not None:
+            self.local.delete(key)
+
+        try:
+            await self.async_redis_client.delete(key)
+            if self.local is not None:
+                await self.async_redis_client.publish(
+                    CacheConfig.INVALIDATION_CHANNEL, self._invalidation_message("key", key)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Cache ADELETE error for key '{key}': {e}")
+            self.metrics.incr(key, "errors")
+            return False
+
+    def _index_key(self, pipe, key: str, ttl: int) -> None:
+        """
+        Queue the commands that record key in its namespace index
+
+        "products:list:limit:10" is indexed in cache:keys:products:list, and
+        "products:list" is registered in cache:ns:products. Members are
+        scored by when the key expires and each write prunes the expired
+        ones, so an index only holds live keys however many distinct keys
+        (e.g. query digests) a namespace sees. Index sets outlive every
+        member key (KEY_INDEX_TTL), so members never go untracked.
+        """
+        parts = key.split(":")
+        if len(parts) < 2:
+            return
+        namespace = ":".join(parts[:2])
+        key_set = f"{KEY_SET_PREFIX}{namespace}"
+        namespace_set = f"{NAMESPACE_SET_PREFIX}{parts[0]}"
+        now = time.time()
+
+        pipe.zadd(key_set, {key: now + ttl})
+        pipe.zremrangebyscore(key_set, "-inf", now)
+        pipe.expire(key_set, CacheConfig.KEY_INDEX_TTL)
+        pipe.sadd(namespace_set, namespace)
+        pipe.expire(namespace_set, CacheConfig.KEY_INDEX_TTL)
+
+    def _indexed_namespaces(self, pattern: str) -> Optional[List[str]]:
+        """
+        Namespaces whose index covers pattern, or None if it isn't indexable
+
+        Indexable patterns are "<prefix>:*" and "<prefix>:<segment>:*".
+        """
+        match = NAMESPACE_PATTERN.match(pattern)
+        if not match:
+            return None
+        prefix, segment = match.groups()
+        if segment is not None:
+            return [f"{prefix}:{segment}"]
+        members = self.redis_client.smembers(f"{NAMESPACE_SET_PREFIX}{prefix}")
+        return sorted(m.decode("utf-8") if isinstance(m, bytes) else m for m in members)
+
+    def _unlink(self, keys: List[str]) -> int:
+        """Remove keys in pipelined batches (UNLINK frees memory off the main thread)"""
+        deleted = 0
+        batch_size = CacheConfig.DELETE_BATCH_SIZE
+        pipe = self.redis_client.pipeline(transaction=False)
+        for start in range(0, len(keys), batch_size):
+            pipe.unlink(*keys[start:start + batch_size])
+        for result in pipe.execute():
+            deleted += result or 0
+        return deleted
+
     def delete_pattern(self, pattern: str) -> int:
         """
         Delete all keys matching pattern
 
+        Namespace patterns ("products:*", "products:list:*") read the key
+        index instead of scanning Redis: O(keys in namespace). Keys written
+        without set() (locks, counters) aren't indexed. Any other pattern
+        falls back to an incremental SCAN, which doesn't block Redis.
+
         Args:
             pattern: Redis pattern (e.g., "products:*")
 
@@ -133,13 +650,32 @@ class CacheService:
         if not self.is_available():
             return 0
 
+        if self.local is not None:
+            self.local.delete_pattern(pattern)
+
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+            namespaces = self._indexed_namespaces(pattern)
+            if namespaces is None:
+                keys = list(self.redis_client.scan_iter(match=pattern, count=1000))
+            else:
+                # Read the live members and drop each index atomically; keys
+                # cached afterwards start a fresh index
+                now = time.time()
+                pipe = self.redis_client.pipeline(transaction=True)
+                for namespace in namespaces:
+                    pipe.zrangebyscore(f"{KEY_SET_PREFIX}{namespace}", now, "+inf")
+                    pipe.delete(f"{KEY_SET_PREFIX}{namespace}")
+                results = pipe.execute()
+                keys = list(set().union(*results[::2])) if results else []
+
+            deleted = self._unlink(keys) if keys else 0
+            # Only after the unlink: workers refilling L1 on the next read
+            # must not find the old values still in Redis
+            self._publish_invalidation("pattern", pattern)
+            return deleted
         except Exception as e:
             logger.error(f"Cache DELETE PATTERN error for '{pattern}': {e}")
+            self.metrics.incr(pattern, "errors")
             return 0
 
     def clear_all(self) -> bool:
@@ -152,8 +688,12 @@ class CacheService:
         if not self.is_available():
             return False
 
+        if self.local is not None:
+            self.local.clear()
+
         try:
             self.redis_client.flushdb()
+            self._publish_invalidation("all")
             logger.warning("⚠️  All cache cleared!")
             return True
         except Exception as e:
@@ -165,124 +705,178 @@ class CacheService:
         key: str,
         callback: Callable[[], Any],
         ttl: Optional[int] = None,
-        max_retries: int = 3,
-        retry_delay: float = 0.1
+        soft_ttl: Optional[int] = None,
+        beta: float = 0.0,
+        background: bool = True
     ) -> Any:
         """
-        Get value from cache or compute and cache it with distributed stampede protection
+        Get value from cache or compute and cache it with stampede protection
+
+        Values are stored with their creation time and compute duration. A
+        value older than ``soft_ttl`` (but younger than the hard ``ttl``) is
+        stale: it is returned immediately while exactly one caller, across
+        all workers (Redis lock), refreshes it. With ``beta > 0`` a refresh
+        may also start before the soft TTL using probabilistic early
+        expiration (XFetch): the closer to expiry and the slower the
+        callback, the likelier an early refresh, so expirations are spread
+        out instead of synchronized.
 
-        This method uses DISTRIBUTED Redis locks to ensure that when cache expires,
-        only ONE worker/process/thread recomputes the value while others wait.
-        This is safe for multi-worker deployments (unlike threading.Lock).
+        On a cold miss concurrent callers in the same worker share a single
+        computation (no sleeping or polling); other workers compute at most
+        once each.
 
         Args:
             key: Cache key
-            callback: Function to call if cache miss
-            ttl: Time to live in seconds
-            max_retries: Maximum retries to acquire lock
-            retry_delay: Delay between retries in seconds
+            callback: Function to call to (re)compute the value
+            ttl: Hard time to live in seconds (value is gone after this)
+            soft_ttl: Seconds after which the value is served stale and
+                refreshed (default: same as ttl, i.e. no stale serving)
+            beta: XFetch aggressiveness (0 disables, 1.0 is the usual value)
+            background: Refresh stale values in a background thread. The
+                callback must then not depend on request-scoped resources
+                (e.g. the request's DB session); pass False to refresh
+                inline in the caller that wins the lock.
 
         Returns:
-            Cached or computed value
+            Cached (possibly stale) or computed value
 
         Example:
-            # Without stampede protection (BAD):
-            # Cache expires at 12:00:00
-            # 100 requests across 8 workers at 12:00:01 -> 100 DB queries!
-
-            # With distributed lock stampede protection (GOOD):
-            # Cache expires at 12:00:00
-            # Worker 1 / Request 1 acquires Redis lock, calls callback()
-            # Workers 2-8 / Requests 2-100 wait and retry
-            # All requests get the cached result
+            # Serve for 60s, then up to 240s more while one worker refreshes
+            cache_service.get_or_set(key, load_categories, ttl=300, soft_ttl=60)
         """
         if not self.is_available():
             # Redis not available - compute directly without caching
             logger.warning(f"Redis unavailable, computing without cache: {key}")
+            self.metrics.incr(key, "fallback_computes")
             return callback()
 
-        # Try to get from cache (fast path)
-        cached_value = self.get(key)
-        if cached_value is not None:
-            logger.debug(f"Cache HIT: {key}")
-            return cached_value
+        ttl = ttl or self.default_ttl
+        soft_ttl = min(soft_ttl or ttl, ttl)
 
-        # Cache miss - need to recompute with distributed stampede protection
-        logger.debug(f"Cache MISS: {key}")
+        entry = self._get_entry(self.get(key))
+        if entry is not None and self._needs_refresh(entry, beta):
+            # Another worker may already have refreshed it (L1 can lag)
+            entry = self._get_entry(self._read_fresh(key)) or entry
 
-        # Build lock key
-        lock_key = f"lock:{key}"
+        if entry is None:
+            logger.debug(f"Cache MISS: {key}")
+            return self._compute_once(key, callback, ttl, soft_ttl)
 
-        # Try to acquire distributed lock
-        for attempt in range(max_retries):
-            # Try to set lock with NX (only if not exists) and EX (expiration)
-            lock_acquired = self.redis_client.set(
-                lock_key,
-                "1",
-                nx=True,  # Only set if key doesn't exist
-                ex=self.lock_timeout  # Auto-expire after timeout
-            )
-
-            if lock_acquired:
-                # We got the lock! Compute and cache the value
-                logger.debug(f"Lock acquired for: {key}")
-                try:
-                    # Double-check cache (another process may have filled it)
-                    cached_value = self.get(key)
-                    if cached_value is not None:
-                        logger.debug(f"Cache HIT after lock: {key}")
-                        return cached_value
-
-                    # Compute value
-                    logger.info(f"Computing value for cache key: {key}")
-                    value = callback()
+        if self._needs_refresh(entry, beta):
+            self._refresh(key, callback, ttl, soft_ttl, background)
 
-                    # Store in cache
-                    self.set(key, value, ttl)
+        logger.debug(f"Cache HIT: {key}")
+        return entry["_v"]
 
-                    return value
-
-                except Exception as e:
-                    logger.error(f"Error computing value for cache key '{key}': {e}")
-                    raise
+    @staticmethod
+    def _get_entry(value: Any) -> Optional[Dict[str, Any]]:
+        """Return value if it is a get_or_set entry, else None"""
+        if isinstance(value, dict) and {"_v", "_t", "_d", "_s"} <= value.keys():
+            return value
+        return None
+
+    @staticmethod
+    def _needs_refresh(entry: Dict[str, Any], beta: float) -> bool:
+        """Soft TTL reached, or an XFetch early refresh was drawn"""
+        now = time.time()
+        if beta > 0:
+            # -log(u) for u in (0, 1] is an Exp(1) draw
+            now -= entry["_d"] * beta * math.log(1.0 - random.random())
+        return now >= entry["_s"]
+
+    def _read_fresh(self, key: str) -> Any:
+        """Read and decode a key straight from Redis, bypassing L1"""
+        try:
+            raw, _ = self._read_redis(key)
+            return self.codec.decode(raw) if raw is not None else None
+        except Exception as e:
+            logger.error(f"Cache GET error for key '{key}': {e}")
+            return None
 
-                finally:
-                    # Always release the lock
-                    try:
-                        self.redis_client.delete(lock_key)
-                        logger.debug(f"Lock released for: {key}")
-                    except Exception as e:
-                        logger.error(f"Error releasing lock for '{key}': {e}")
+    def _store(self, key: str, callback: Callable[[], Any], ttl: int, soft_ttl: int) -> Any:
+        """Compute value and store it with its timing metadata"""
+        logger.info(f"Computing value for cache key: {key}")
+        start = time.time()
+        value = callback()
+        computed_at = time.time()
+
+        entry = {"_v": value, "_t": computed_at, "_d": computed_at - start, "_s": computed_at + soft_ttl}
+        self.set(key, entry, ttl)
+        return value
+
+    def _compute_once(self, key: str, callback: Callable[[], Any], ttl: int, soft_ttl: int) -> Any:
+        """Compute a missing value, sharing one computation per key in this worker"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self.metrics.incr(key, "lock_waits")
+            return future.result()
 
-            else:
-                # Lock already held by another process/worker
-                # Wait a bit and retry to get cached result
-                logger.debug(
-                    f"Lock held by another process for '{key}', "
-                    f"retry {attempt + 1}/{max_retries}"
-                )
-                time.sleep(retry_delay)
-
-                # Check if cache was filled while waiting
-                cached_value = self.get(key)
-                if cached_value is not None:
-                    logger.debug(f"Cache HIT after waiting: {key}")
-                    return cached_value
-
-        # Failed to acquire lock after all retries
-        # Fallback: compute without lock (better than failing)
-        logger.warning(
-            f"Failed to acquire lock for '{key}' after {max_retries} retries, "
-            f"computing without lock"
-        )
         try:
-            value = callback()
-            # Try to cache anyway (best effort)
-            self.set(key, value, ttl)
+            value = self._store(key, callback, ttl, soft_ttl)
+            future.set_result(value)
             return value
         except Exception as e:
-            logger.error(f"Error in fallback computation for '{key}': {e}")
+            logger.error(f"Error computing value for cache key '{key}': {e}")
+            future.set_exception(e)
             raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(
+        self,
+        key: str,
+        callback: Callable[[], Any],
+        ttl: int,
+        soft_ttl: int,
+        background: bool
+    ) -> None:
+        """Refresh a stale value if this caller wins the distributed lock"""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis_client.set(lock_key, token, nx=True, ex=self.lock_timeout)
+        except Exception as e:
+            logger.error(f"Error acquiring refresh lock for '{key}': {e}")
+            self.metrics.incr(key, "errors")
+            return
+        if not acquired:
+            self.metrics.incr(key, "lock_waits")
+            return  # Someone else is refreshing; keep serving stale
+
+        def run():
+            try:
+                self._store(key, callback, ttl, soft_ttl)
+            except Exception as e:
+                # Stale value stays until its hard TTL; next caller retries
+                logger.error(f"Error refreshing cache key '{key}': {e}")
+                self.metrics.incr(key, "errors")
+            finally:
+                try:
+                    self.redis_client.eval(RELEASE_LOCK_LUA, 1, lock_key, token)
+                except Exception as e:
+                    logger.error(f"Error releasing lock for '{key}': {e}")
+
+        if background:
+            self._refresh_executor().submit(run)
+        else:
+            run()
+
+    def _refresh_executor(self) -> ThreadPoolExecutor:
+        """Lazily created pool running background refreshes"""
+        with self._inflight_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=CacheConfig.REFRESH_WORKERS,
+                    thread_name_prefix="cache-refresh",
+                )
+            return self._executor
 
     def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """
@@ -344,6 +938,128 @@ class CacheService:
             logger.error(f"Cache GET TTL error for key '{key}': {e}")
             return None
 
+    def _publish_invalidation(self, op: str, target: Optional[Any] = None) -> None:
+        """Tell other workers to evict L1 entries (no-op when L1 is disabled)"""
+        if self.local is None:
+            return
+        try:
+            self.redis_client.publish(CacheConfig.INVALIDATION_CHANNEL, self._invalidation_message(op, target))
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error for '{target}': {e}")
+
+    def _invalidation_message(self, op: str, target: Optional[Any] = None) -> str:
+        """Pub/sub payload read by apply_invalidation in other workers"""
+        return json.dumps({"op": op, "target": target, "origin": self.worker_id})
+
+    def apply_invalidation(self, message: str) -> None:
+        """
+        Apply an invalidation broadcast by another worker to the local L1
+
+        Args:
+            message: JSON payload published by _publish_invalidation
+        """
+        if self.local is None:
+            return
+        try:
+            data = json.loads(message)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {message!r}")
+            return
+
+        if data.get("origin") == self.worker_id:
+            return  # Already applied locally
+
+        op, target = data.get("op"), data.get("target")
+        if op == "key" and target:
+            self.local.delete(target)
+        elif op == "keys" and target:
+            for key in target:
+                self.local.delete(key)
+        elif op == "pattern" and target:
+            self.local.delete_pattern(target)
+        elif op == "all":
+            self.local.clear()
+
+    def _listen_for_invalidations(self) -> None:
+        """Subscriber loop run in a daemon thread; reconnects on failure"""
+        while not self._listener_stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CacheConfig.INVALIDATION_CHANNEL)
+                # Messages may have been missed while disconnected
+                self.local.clear()
+
+                while not self._listener_stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.apply_invalidation(message["data"])
+
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, reconnecting: {e}")
+                self._listener_stop.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def start_invalidation_listener(self) -> bool:
+        """
+        Subscribe to cross-worker invalidations in a background thread
+
+        Returns:
+            True if the listener is running
+        """
+        if self.local is None or not self.is_available():
+            return False
+        if self._listener is not None and self._listener.is_alive():
+            return True
+
+        self._listener_stop.clear()
+        self._listener = threading.Thread(
+            target=self._listen_for_invalidations,
+            name="cache-invalidation-listener",
+            daemon=True,
+        )
+        self._listener.start()
+        return True
+
+    def stop_invalidation_listener(self) -> None:
+        """Stop the invalidation listener thread"""
+        self._listener_stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2.0)
+            self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters for both tiers
+
+        Returns:
+            {"l1": {...} or None, "redis": {"hits", "misses"}, "codec": {...}}
+        """
+        return {
+            "l1": self.local.stats() if self.local is not None else None,
+            "redis": {"hits": self.redis_hits, "misses": self.redis_misses},
+            "codec": self.codec.describe(),
+        }
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Tier stats plus per-namespace counters and latency histograms
+
+        Returns:
+            stats() merged with CacheMetrics.snapshot()
+        """
+        return {
+            "available": self.is_available(),
+            "circuit_breaker": self.breaker.state,
+            **self.stats(),
+            **self.metrics.snapshot(),
+        }
+
     def build_key(self, prefix: str, *args, **kwargs) -> str:
         """
         Build cache key from components
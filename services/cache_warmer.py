@@ -0,0 +1,390 @@
+"""
+Cache Warm-up Module
+
+Pre-populates the hottest cache entries so the first storefront requests
+after a deploy, or after an invalidation, don't all miss and pile onto the
+database:
+
+- categories (service list and compat /api/categorias)
+- the first WARMUP_CATALOG_PAGES pages of /api/productos for every sort order
+- the first product service page and the WARMUP_TOP_PRODUCTS best sellers
+
+Warm-ups run in a background thread. Their tasks run on a pool of
+WARMUP_CONCURRENCY threads, each with its own DB session, so a warm-up
+never holds more connections than that. Warm-ups requested by
+invalidations are debounced, and scopes requested while one is running are
+coalesced into a single follow-up run.
+
+Every worker process has its own warmer, but a run first takes the Redis
+lock WARMUP_LOCK_KEY (SET NX EX): while one worker warms, the others skip
+their run instead of repeating the same queries. A skipped startup warm-up
+is dropped; a skipped warm-up requested by an invalidation is retried once
+the lock is free, clearing its scopes first, because the holder's run may
+have written entries read before the invalidation.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from config.constants import CacheConfig
+from config.database import SessionLocal
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+SCOPES = ("categories", "products")
+
+# Cache namespace of each scope, cleared by retried warm-ups
+SCOPE_PATTERNS = {"categories": "categories:*", "products": "products:*"}
+
+WARMUP_LOCK_KEY = "lock:cache-warmup"
+
+Task = Tuple[str, Callable[[Session], Any]]
+
+
+class CacheWarmer:
+    """
+    Background cache warm-up with progress reporting
+
+    ``start()`` warms immediately (startup); ``schedule()`` warms after a
+    short delay so a burst of writes triggers one warm-up. ``status()``
+    reports progress for /health_check.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        enabled: bool = CacheConfig.WARMUP_ENABLED,
+        concurrency: int = CacheConfig.WARMUP_CONCURRENCY,
+        catalog_pages: int = CacheConfig.WARMUP_CATALOG_PAGES,
+        top_products: int = CacheConfig.WARMUP_TOP_PRODUCTS,
+        debounce_seconds: float = CacheConfig.WARMUP_DEBOUNCE_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.concurrency = max(concurrency, 1)
+        self.catalog_pages = catalog_pages
+        self.top_products = top_products
+        self.debounce_seconds = debounce_seconds
+
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Set[str] = set()
+        self._pending_reason = ""
+        self._pending_wait = False  # Retry instead of skipping while another worker warms
+        self._pending_clear = False  # Clear the scopes' namespaces before warming
+        self._retry_timer: Optional[threading.Timer] = None
+        self._retry: Set[str] = set()
+        self._retry_reason = ""
+        self._status: Dict[str, Any] = {"state": "idle" if enabled else "disabled", "runs": 0}
+
+    def start(
+        self,
+        reason: str = "startup",
+        scopes: Iterable[str] = SCOPES,
+        wait_for_lock: bool = False,
+        clear: bool = False
+    ) -> bool:
+        """
+        Warm the given scopes in a background thread now
+
+        If a warm-up is already running, the scopes are warmed again right
+        after it finishes.
+
+        Args:
+            reason: Shown in status()
+            scopes: Scopes to warm
+            wait_for_lock: Retry after the debounce delay, instead of
+                skipping, while another worker holds the warm-up lock
+            clear: Clear the scopes' cache namespaces before warming
+
+        Returns:
+            False if warm-up is disabled or the cache is unavailable
+        """
+        from services.cache_service import cache_service
+
+        if not self.enabled or not cache_service.is_available():
+            return False
+
+        with self._lock:
+            self._pending.update(scopes)
+            self._pending_reason = reason
+            self._pending_wait = self._pending_wait or wait_for_lock
+            self._pending_clear = self._pending_clear or clear
+            if self._thread is not None and self._thread.is_alive():
+                return True
+            self._thread = threading.Thread(target=self._run_pending, name="cache-warmup", daemon=True)
+            self._thread.start()
+        return True
+
+    def schedule(self, scope: str, reason: str) -> None:
+        """
+        Warm a scope after the debounce delay (called from invalidation paths)
+
+        Args:
+            scope: "categories" or "products"
+            reason: Shown in status() (e.g. "product write")
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._pending.add(scope)
+            self._pending_reason = reason
+            if self._timer is not None:
+                return  # Already scheduled; this scope joins it
+            self._timer = threading.Timer(self.debounce_seconds, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self) -> None:
+        with self._lock:
+            self._timer = None
+            scopes, reason = set(self._pending), self._pending_reason
+        self.start(reason=reason, scopes=scopes, wait_for_lock=True)
+
+    def _retry_later(self, scopes: Iterable[str], reason: str) -> None:
+        """Warm scopes skipped because another worker held the lock, after the debounce delay"""
+        with self._lock:
+            self._retry.update(scopes)
+            self._retry_reason = reason
+            if self._retry_timer is not None:
+                return
+            self._retry_timer = threading.Timer(self.debounce_seconds, self._fire_retry)
+            self._retry_timer.daemon = True
+            self._retry_timer.start()
+
+    def _fire_retry(self) -> None:
+        with self._lock:
+            self._retry_timer = None
+            scopes, reason = set(self._retry), self._retry_reason
+            self._retry.clear()
+        # The lock holder may have cached rows read before the invalidation
+        self.start(reason=reason, scopes=scopes, wait_for_lock=True, clear=True)
+
+    def stop(self) -> None:
+        """Cancel scheduled warm-ups and retries (shutdown); a running one finishes its tasks"""
+        with self._lock:
+            for timer in (self._timer, self._retry_timer):
+                if timer is not None:
+                    timer.cancel()
+            self._timer = self._retry_timer = None
+            self._pending.clear()
+            self._retry.clear()
+
+    def _run_pending(self) -> None:
+        """Thread body: run until no scopes are pending"""
+        while True:
+            with self._lock:
+                scopes, reason = set(self._pending), self._pending_reason
+                wait, clear = self._pending_wait, self._pending_clear
+                self._pending.clear()
+                self._pending_wait = self._pending_clear = False
+                if not scopes:
+                    return
+            status = self.run(scopes, reason, clear=clear)
+            if status["state"] == "skipped" and wait:
+                self._retry_later(scopes, reason)
+
+    def run(self, scopes: Iterable[str] = SCOPES, reason: str = "manual", clear: bool = False) -> Dict[str, Any]:
+        """
+        Warm the given scopes and wait for completion
+
+        Skipped, with state "skipped", while another worker holds the
+        warm-up lock (or Redis can't be reached to take it).
+
+        Args:
+            scopes: Scopes to warm
+            reason: Shown in status()
+            clear: Clear the scopes' cache namespaces first (lock held), so
+                entries are rebuilt rather than served from the cache
+
+        Returns:
+            Final status (see status())
+        """
+        scopes = [scope for scope in SCOPES if scope in set(scopes)]
+        token = self._acquire_lock()
+        if token is None:
+            self._update(state="skipped", reason=reason, scopes=scopes)
+            logger.info(f"🔥 Cache warm-up ({reason}) skipped: another worker holds the lock")
+            return self.status()
+
+        try:
+            if clear:
+                self._clear(scopes)
+            return self._warm(scopes, reason)
+        finally:
+            self._release_lock(token)
+
+    def _acquire_lock(self) -> Optional[str]:
+        """Take the cross-worker warm-up lock; returns its token, or None if not taken"""
+        from services.cache_service import cache_service
+
+        token = uuid.uuid4().hex
+        try:
+            acquired = cache_service.redis_client.set(
+                WARMUP_LOCK_KEY, token, nx=True, ex=CacheConfig.WARMUP_LOCK_TTL
+            )
+        except Exception as e:
+            logger.error(f"Error acquiring cache warm-up lock: {e}")
+            return None
+        return token if acquired else None
+
+    def _release_lock(self, token: str) -> None:
+        """Release the warm-up lock if this run still holds it"""
+        from services.cache_service import RELEASE_LOCK_LUA, cache_service
+
+        try:
+            cache_service.redis_client.eval(RELEASE_LOCK_LUA, 1, WARMUP_LOCK_KEY, token)
+        except Exception as e:
+            logger.error(f"Error releasing cache warm-up lock: {e}")
+
+    def _clear(self, scopes: List[str]) -> None:
+        """Delete the cache namespaces of the given scopes"""
+        from services.cache_service import cache_service
+
+        for scope in scopes:
+            cache_service.delete_pattern(SCOPE_PATTERNS[scope])
+
+    def _warm(self, scopes: List[str], reason: str) -> Dict[str, Any]:
+        """Run the warm-up tasks of the given scopes (lock held)"""
+        started = time.monotonic()
+        self._update(
+            state="running", reason=reason, scopes=scopes, total=0, completed=0, failed=0,
+            started_at=datetime.now(timezone.utc).isoformat(), finished_at=None, duration_ms=None, last_error=None,
+        )
+
+        try:
+            tasks = self._tasks(scopes)
+        except Exception as e:
+            logger.error(f"Cache warm-up planning failed: {e}")
+            tasks = []
+            self._update(failed=1, last_error=str(e))
+
+        self._update(total=len(tasks))
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cache-warmup") as pool:
+            futures = {pool.submit(self._run_task, task): name for name, task in tasks}
+            for future in as_completed(futures):
+                error = future.result()
+                with self._lock:
+                    if error is None:
+                        self._status["completed"] += 1
+                    else:
+                        self._status["failed"] += 1
+                        self._status["last_error"] = f"{futures[future]}: {error}"
+
+        with self._lock:
+            self._status["state"] = "done" if not self._status["failed"] else "done_with_errors"
+            self._status["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self._status["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+            self._status["runs"] += 1
+            status = dict(self._status)
+
+        logger.info(
+            f"🔥 Cache warm-up ({reason}): {status['completed']}/{status['total']} entries "
+            f"in {status['duration_ms']}ms, {status['failed']} failed"
+        )
+        return status
+
+    def _run_task(self, task: Callable[[Session], Any]) -> Optional[str]:
+        """Run one task in its own session; returns the error message, if any"""
+        db = self.session_factory()
+        try:
+            task(db)
+            return None
+        except Exception as e:
+            return str(getattr(e, "detail", None) or e)
+        finally:
+            db.close()
+
+    def _tasks(self, scopes: List[str]) -> List[Task]:
+        """Build the (name, callable) tasks for the requested scopes"""
+        # Imported here: the services import this module for their hooks
+        from controllers.compat_controller import PRODUCT_SORT_ORDERS, get_categorias, get_producto, list_productos
+        from services.category_service import CategoryService
+        from services.product_service import ProductService
+
+        tasks: List[Task] = []
+        if "categories" in scopes:
+            tasks.append(("categories", lambda db: CategoryService(db).get_all_json()))
+            tasks.append(("compat categories", lambda db: get_categorias(db=db)))
+
+        if "products" in scopes:
+            tasks.append(("products", lambda db: ProductService(db).get_all_json()))
+            for sort in PRODUCT_SORT_ORDERS:
+                for page in range(1, self.catalog_pages + 1):
+                    tasks.append((
+                        f"catalog {sort} page {page}",
+                        lambda db, sort=sort, page=page: list_productos(sort=sort, page=page, db=db),
+                    ))
+
+            db = self.session_factory()
+            try:
+                top_ids = self._top_product_ids(db)
+            finally:
+                db.close()
+
+            for id_key in top_ids:
+                tasks.append((
+                    f"product {id_key}",
+                    lambda db, id_key=id_key: (ProductService(db).get_one_json(id_key),
+                                               get_producto(str(id_key), db=db)),
+                ))
+        return tasks
+
+    def _top_product_ids(self, db: Session) -> List[int]:
+        """Best-selling product ids, padded with the newest products"""
+        from models.order_detail import OrderDetailModel
+        from models.product import ProductModel
+
+        if self.top_products <= 0:
+            return []
+
+        best_sellers = (
+            db.query(OrderDetailModel.product_id)
+            .filter(OrderDetailModel.product_id.isnot(None))
+            .group_by(OrderDetailModel.product_id)
+            .order_by(func.sum(OrderDetailModel.quantity).desc())
+            .limit(self.top_products)
+            .all()
+        )
+        ids = [row[0] for row in best_sellers]
+
+        if len(ids) < self.top_products:
+            newest = (
+                db.query(ProductModel.id_key)
+                .order_by(ProductModel.id_key.desc())
+                .limit(self.top_products)
+                .all()
+            )
+            ids.extend(row[0] for row in newest if row[0] not in ids)
+        return ids[:self.top_products]
+
+    def _update(self, **fields: Any) -> None:
+        with self._lock:
+            self._status.update(fields)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Progress of the current or last warm-up
+
+        Returns:
+            {"state": idle|disabled|running|skipped|done|done_with_errors, "reason",
+             "scopes", "total", "completed", "failed", "started_at",
+             "finished_at", "duration_ms", "last_error", "runs", "scheduled"}
+        """
+        with self._lock:
+            status = dict(self._status)
+            status["scheduled"] = self._timer is not None or self._retry_timer is not None
+            return status
+
+
+# Global cache warmer instance
+cache_warmer = CacheWarmer()
@@ -1,13 +1,17 @@
 """Category service with Redis caching integration."""
 import logging
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.category import CategoryModel
-from repositories.category_repository import CategoryRepository
+from repositories.base_repository_impl import InstanceNotFoundError
+from repositories.category_repository import AsyncCategoryRepository, CategoryRepository
 from schemas.category_schema import CategorySchema
-from services.base_service_impl import BaseServiceImpl
+from services.base_async_service_impl import CachedAsyncServiceImpl
+from services.base_service_impl import BaseServiceImpl, json_array, to_json
 from services.cache_service import cache_service
+from services.cache_warmer import cache_warmer
 from utils.logging_utils import get_sanitized_logger
 
 logger = get_sanitized_logger(__name__)
@@ -28,35 +32,99 @@ class CategoryService(BaseServiceImpl):
         # Categories change rarely, so longer TTL (1 hour)
         self.cache_ttl = 3600
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[CategorySchema]:
+    def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[CategorySchema]:
         """
         Get all categories with long-lived cache
 
-        Cache key pattern: categories:list:skip:{skip}:limit:{limit}
+        Pages cache only the category ids; categories are hydrated from
+        their per-id keys with one MGET.
+
+        Cache key pattern: categories:ids:limit:{limit}:skip:{skip}
+        (keyset mode: categories:ids:after:{after_id}:limit:{limit})
         TTL: 1 hour (categories rarely change)
         """
-        cache_key = self.cache.build_key(
-            self.cache_prefix,
-            "list",
-            skip=skip,
-            limit=limit
-        )
+        if not self.cache.is_available():
+            return super().get_all(skip, limit, after_id)
 
-        # Try cache first
-        cached_categories = self.cache.get(cache_key)
-        if cached_categories is not None:
+        cache_key = self._page_key(skip, limit, after_id)
+        cached_ids = self.cache.get(cache_key)
+        if cached_ids is not None:
             logger.debug(f"Cache HIT: {cache_key}")
-            return [CategorySchema(**c) for c in cached_categories]
+            return [CategorySchema.model_validate_json(body) for body in self._get_many_json(cached_ids).values()]
 
-        # Cache miss
         logger.debug(f"Cache MISS: {cache_key}")
-        categories = super().get_all(skip, limit)
+        categories, _ = self._load_page(cache_key, skip, limit, after_id)
+        return categories
+
+    def get_all_json(self, skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None) -> Tuple[str, List[int]]:
+        """
+        Get a page of categories as a serialized JSON array
 
-        # Cache with longer TTL
-        categories_dict = [c.model_dump() for c in categories]
-        self.cache.set(cache_key, categories_dict, ttl=self.cache_ttl)
+        A cache hit joins the cached per-id JSON strings without building
+        any CategorySchema.
 
-        return categories
+        Returns:
+            (JSON array, id_key of each category in order)
+        """
+        if not self.cache.is_available():
+            return super().get_all_json(skip, limit, after_id)
+
+        cache_key = self._page_key(skip, limit, after_id)
+        cached_ids = self.cache.get(cache_key)
+        if cached_ids is not None:
+            logger.debug(f"Cache HIT: {cache_key}")
+            bodies = self._get_many_json(cached_ids)
+        else:
+            logger.debug(f"Cache MISS: {cache_key}")
+            _, bodies = self._load_page(cache_key, skip, limit, after_id)
+
+        return json_array(bodies.values()), list(bodies)
+
+    def _page_key(self, skip: int, limit: int, after_id: Optional[int]) -> str:
+        """Cache key of a page of category ids"""
+        page = {"after": after_id} if after_id is not None else {"skip": skip}
+        return self.cache.build_key(self.cache_prefix, "ids", limit=limit, **page)
+
+    def _load_page(self, cache_key: str, skip: int, limit: int,
+                   after_id: Optional[int]) -> Tuple[List[CategorySchema], Dict[int, str]]:
+        """Query a page and cache its id list and every category with the long TTL"""
+        categories = super().get_all(skip, limit, after_id)
+        bodies = {c.id_key: to_json(c) for c in categories}
+
+        self.cache.set(cache_key, list(bodies), ttl=self.cache_ttl)
+        self.cache.set_many(
+            {self._item_key(id_key): body for id_key, body in bodies.items()},
+            ttl=self.cache_ttl,
+        )
+        return categories, bodies
+
+    def _item_key(self, id_key: int) -> str:
+        """Cache key of a single category's JSON (shared with get_one)"""
+        return self.cache.build_key(self.cache_prefix, "id", id=id_key)
+
+    def _get_many_json(self, ids: List[int]) -> Dict[int, str]:
+        """Serialized categories by id, from per-id cache keys, loading misses in one query"""
+        keys = [self._item_key(id_key) for id_key in ids]
+        cached = self.cache.get_many(keys)
+
+        missing = [
+            id_key for id_key, key in zip(ids, keys)
+            if not isinstance(cached.get(key), str) and not self.cache.is_tombstone(cached.get(key))
+        ]
+        loaded = {c.id_key: to_json(c) for c in self.repository.find_many(missing)} if missing else {}
+        if loaded:
+            self.cache.set_many(
+                {self._item_key(id_key): body for id_key, body in loaded.items()},
+                ttl=self.cache_ttl,
+            )
+
+        bodies = {}
+        for id_key, key in zip(ids, keys):
+            body = loaded.get(id_key) or cached.get(key)
+            if isinstance(body, str):
+                bodies[id_key] = body
+        return bodies
 
     def get_one(self, id_key: int) -> CategorySchema:
         """
@@ -65,22 +133,54 @@ class CategoryService(BaseServiceImpl):
         Cache key pattern: categories:id:{id_key}
         TTL: 1 hour
         """
-        cache_key = self.cache.build_key(self.cache_prefix, "id", id=id_key)
+        cache_key = self._item_key(id_key)
 
         cached_category = self.cache.get(cache_key)
-        if cached_category is not None:
+        if isinstance(cached_category, str):
             logger.debug(f"Cache HIT: {cache_key}")
-            return CategorySchema(**cached_category)
+            return CategorySchema.model_validate_json(cached_category)
+        if self.cache.is_tombstone(cached_category):
+            logger.debug(f"Cache HIT (not found): {cache_key}")
+            raise self._not_found(id_key)
 
         logger.debug(f"Cache MISS: {cache_key}")
-        category = super().get_one(id_key)
+        category = self._find(cache_key, id_key)
 
-        self.cache.set(cache_key, category.model_dump(), ttl=self.cache_ttl)
+        self.cache.set(cache_key, to_json(category), ttl=self.cache_ttl)
 
         return category
 
+    def get_one_json(self, id_key: int) -> str:
+        """Get single category by ID as serialized JSON (no validation on a hit)"""
+        cache_key = self._item_key(id_key)
+
+        cached_category = self.cache.get(cache_key)
+        if isinstance(cached_category, str):
+            logger.debug(f"Cache HIT: {cache_key}")
+            return cached_category
+        if self.cache.is_tombstone(cached_category):
+            logger.debug(f"Cache HIT (not found): {cache_key}")
+            raise self._not_found(id_key)
+
+        logger.debug(f"Cache MISS: {cache_key}")
+        body = to_json(self._find(cache_key, id_key))
+        self.cache.set(cache_key, body, ttl=self.cache_ttl)
+        return body
+
+    def _find(self, cache_key: str, id_key: int) -> CategorySchema:
+        """Load a category from the database, tombstoning its key if it doesn't exist"""
+        try:
+            return super().get_one(id_key)
+        except InstanceNotFoundError:
+            self.cache.set_tombstone(cache_key)
+            raise
+
+    def _not_found(self, id_key: int) -> InstanceNotFoundError:
+        """Same error the repository raises for a missing category"""
+        return InstanceNotFoundError(f"{self.model.__name__} with id {id_key} not found")
+
     def save(self, schema: CategorySchema) -> CategorySchema:
-        """Create new category and invalidate cache"""
+        """Create new category and invalidate cache (including any tombstone for its id)"""
         category = super().save(schema)
         self._invalidate_all_cache()
         return category
@@ -121,8 +221,24 @@ class CategoryService(BaseServiceImpl):
         self._invalidate_all_cache()
 
     def _invalidate_all_cache(self):
-        """Invalidate all category caches"""
+        """Invalidate all category caches and schedule their warm-up"""
         pattern = f"{self.cache_prefix}:*"
         deleted_count = self.cache.delete_pattern(pattern)
         if deleted_count > 0:
             logger.info(f"Invalidated {deleted_count} category cache entries")
+        cache_warmer.schedule("categories", reason="category write")
+
+
+class AsyncCategoryService(CachedAsyncServiceImpl):
+    """Non-blocking category reads on an AsyncSession, sharing CategoryService's cache entries."""
+
+    cache_prefix = "categories"
+    cache_ttl = 3600  # As CategoryService
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(
+            repository_class=AsyncCategoryRepository,
+            model=CategoryModel,
+            schema=CategorySchema,
+            db=db
+        )
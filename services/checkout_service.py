@@ -0,0 +1,294 @@
+"""
+Checkout Service
+
+Order placement for the compat checkout (POST /api/boletas) as a single
+transaction pipeline:
+
+1. Find the client by email (created if new)
+2. Resolve every basket line's product in one query, by id or by
+   normalized name; products that don't exist yet are inserted in one batch
+3. Add the bill and the order and flush once (ids come back through
+   INSERT ... RETURNING)
+4. Reserve stock for every catalog product of the order in one batch
+   (services/stock_service.py), then insert every detail in one batched
+   statement. Placeholders (products created at checkout, flagged
+   ProductModel.placeholder) don't track stock and are never reserved
+5. Render the response from the in-memory objects, then commit
+
+The number of round trips doesn't grow with the basket size, and a failure
+at any step rolls back everything.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.bill import BillModel
+from models.category import CategoryModel
+from models.client import ClientModel
+from models.enums import DeliveryMethod, PaymentType, Status
+from models.order import OrderModel
+from models.order_detail import OrderDetailModel
+from models.product import ProductModel
+from services.stock_service import StockService
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+# Category of the products created at checkout for unknown basket items
+FALLBACK_CATEGORY = "Sin Categoría"
+
+
+class CheckoutLine(NamedTuple):
+    """One basket item as sent by the frontend"""
+    name: str
+    quantity: int
+    price: float
+    product_id: Optional[int] = None  # Cart items carry the product's "id" / "_id"
+
+    @property
+    def key(self) -> str:
+        """Normalized name, as matched against lower(name)"""
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, item: Dict[str, Any]) -> "CheckoutLine":
+        raw_id = str(item.get("id") or item.get("_id") or item.get("productoId") or "").strip()
+        return cls(
+            name=str(item.get("nombre") or "").strip(),
+            quantity=max(int(item.get("cantidad") or 1), 1),
+            price=float(item.get("precio") or 0),
+            product_id=int(raw_id) if raw_id.isdigit() else None,
+        )
+
+
+class CheckoutResult(NamedTuple):
+    """Outcome of a placed order"""
+    order: OrderModel
+    receipt: Any  # What render() returned
+    created_products: int  # Products inserted for unknown basket items
+    created_category: bool  # Whether the fallback category was inserted
+    reserved: Dict[int, int]  # {product_id: stock left} of every reserved product
+
+
+class CheckoutService:
+    """Places an order (client, bill, order, details) in one transaction"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def place_order(
+        self,
+        email: str,
+        name: str,
+        items: List[Dict[str, Any]],
+        total: float,
+        render: Callable[[OrderModel], Any]
+    ) -> CheckoutResult:
+        """
+        Run the checkout pipeline
+
+        Args:
+            email: Normalized client email
+            name: Client name (used if the client is new)
+            items: Basket items ({"nombre", "cantidad", "precio"})
+            total: Order total
+            render: Builds the response from the order before commit, while
+                every relationship is still loaded in memory
+
+        Returns:
+            CheckoutResult
+
+        Raises:
+            InsufficientStockError: If a product lacks stock, after rolling back
+            Exception: Any database error, after rolling back
+        """
+        lines = [CheckoutLine.parse(item) for item in items or []]
+        try:
+            client = self._find_or_add_client(email, name)
+            products, created, created_category = self._resolve_products(lines)
+
+            bill = BillModel(
+                bill_number=f"B-{datetime.now().strftime('%Y%m%d%H%M%S%f')[-14:]}",
+                discount=0,
+                date=date.today(),
+                total=total,
+                payment_type=PaymentType.CARD,
+                client=client,
+            )
+            order = OrderModel(
+                date=datetime.now(),
+                total=total,
+                delivery_method=DeliveryMethod.HOME_DELIVERY,
+                status=Status.PENDING,
+                client=client,
+                bill=bill,
+            )
+            self.db.add(order)
+            self.db.flush()  # Client, bill and order ids come back via RETURNING
+
+            order_id = order.id_key
+            reserved = self._reserve_stock(lines, products)
+            self._insert_details(order, lines, products)
+            receipt = render(order)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        logger.info(
+            f"Order {order_id} placed: {len(lines)} lines, "
+            f"{len(created)} new products"
+        )
+        return CheckoutResult(order, receipt, len(created), created_category, reserved)
+
+    def _reserve_stock(
+        self,
+        lines: List[CheckoutLine],
+        products: List[Optional[ProductModel]]
+    ) -> Dict[int, int]:
+        """
+        Deduct the ordered units from catalog stock in one batch
+
+        Placeholders, whether created by this checkout or an earlier one,
+        are not reserved.
+
+        Returns:
+            {product_id: stock left}
+
+        Raises:
+            InsufficientStockError: If any product lacks stock
+        """
+        quantities: Dict[int, int] = defaultdict(int)
+        for line, product in zip(lines, products):
+            if product is not None and not product.placeholder:
+                quantities[product.id_key] += line.quantity
+        return StockService(self.db).reserve(quantities)
+
+    def _insert_details(
+        self,
+        order: OrderModel,
+        lines: List[CheckoutLine],
+        products: List[Optional[ProductModel]]
+    ) -> None:
+        """
+        Insert the order's details in one batched statement
+
+        Detail ids are never read back, so the rows go out as a single
+        executemany without RETURNING (the unit of work would fall back to
+        one INSERT per row on drivers that can't sort RETURNING rows). The
+        same details are attached to the order in memory, outside the
+        session, for the receipt.
+        """
+        details = []
+        for line, product in zip(lines, products):
+            detail = OrderDetailModel(
+                quantity=line.quantity,
+                price=line.price,
+                order_id=order.id_key,
+                product_id=product.id_key if product is not None else None,
+            )
+            set_committed_value(detail, "product", product)
+            details.append(detail)
+
+        if details:
+            self.db.execute(insert(OrderDetailModel), [
+                {
+                    "quantity": detail.quantity,
+                    "price": detail.price,
+                    "order_id": detail.order_id,
+                    "product_id": detail.product_id,
+                }
+                for detail in details
+            ])
+        set_committed_value(order, "order_details", details)
+
+    def _find_or_add_client(self, email: str, name: str) -> ClientModel:
+        """Client with this email, or a new one inserted with the order"""
+        client = self.db.execute(
+            select(ClientModel).where(func.lower(ClientModel.email) == email)
+        ).scalars().first()
+        if client is None:
+            client = ClientModel(name=name, lastname="", email=email, telephone="0000000")
+            self.db.add(client)
+        return client
+
+    def _resolve_products(
+        self,
+        lines: List[CheckoutLine]
+    ) -> Tuple[List[Optional[ProductModel]], List[ProductModel], bool]:
+        """
+        Product of every basket line, matched in one query
+
+        A line matches by product id when the cart item carries one that
+        exists, otherwise by lowercased name (served by the lower(name)
+        index). Names matching nothing are inserted in one INSERT ...
+        RETURNING under the fallback category, flagged as placeholders; lines
+        with neither get None.
+
+        Returns:
+            (product per line, products created, category created)
+        """
+        ids = {line.product_id for line in lines if line.product_id is not None}
+        names = {line.key for line in lines if line.key}
+        if not ids and not names:
+            return [None] * len(lines), [], False
+
+        conditions = []
+        if ids:
+            conditions.append(ProductModel.id_key.in_(ids))
+        if names:
+            conditions.append(func.lower(ProductModel.name).in_(names))
+        by_id: Dict[int, ProductModel] = {}
+        by_name: Dict[str, ProductModel] = {}
+        rows = self.db.execute(
+            select(ProductModel).where(or_(*conditions)).order_by(ProductModel.id_key)
+        ).scalars()
+        for product in rows:
+            by_id[product.id_key] = product
+            by_name.setdefault(product.name.lower(), product)
+
+        def match(line: CheckoutLine) -> Optional[ProductModel]:
+            return by_id.get(line.product_id) or by_name.get(line.key)
+
+        missing: Dict[str, CheckoutLine] = {}
+        for line in lines:
+            if line.key and match(line) is None:
+                missing.setdefault(line.key, line)
+
+        created: List[ProductModel] = []
+        created_category = False
+        if missing:
+            category, created_category = self._fallback_category()
+            created = self.db.execute(
+                insert(ProductModel).returning(ProductModel),
+                [
+                    {
+                        "name": line.name,
+                        "price": max(line.price, 0),
+                        "stock": 0,
+                        "category_id": category.id_key,
+                        "placeholder": True,
+                    }
+                    for line in missing.values()
+                ],
+            ).scalars().all()
+            for product in created:
+                by_name[product.name.lower()] = product
+        return [match(line) for line in lines], created, created_category
+
+    def _fallback_category(self) -> Tuple[CategoryModel, bool]:
+        """Category for products created at checkout (flushed, not committed)"""
+        category = self.db.execute(
+            select(CategoryModel).where(CategoryModel.name == FALLBACK_CATEGORY)
+        ).scalars().first()
+        if category is not None:
+            return category, False
+
+        category = CategoryModel(name=FALLBACK_CATEGORY)
+        self.db.add(category)
+        self.db.flush()
+        return category, True
@@ -0,0 +1,174 @@
+"""
+Local Cache Module
+
+Per-worker in-process LRU cache used as the L1 tier in front of Redis.
+Entries expire by TTL and the cache is bounded both by entry count and by
+the approximate size of the stored payloads.
+"""
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Union
+
+from services.cache_codec import CacheCodec, cache_codec
+
+
+# Decoded values of these types can be handed to every caller
+_IMMUTABLE = (str, bytes, int, float, bool, type(None))
+
+
+class _Entry:
+    """A cached payload: the encoded bytes and their lazily decoded value"""
+
+    __slots__ = ("raw", "value", "decoded", "expires_at", "size")
+
+    def __init__(self, raw: Union[bytes, str], expires_at: float, size: int):
+        self.raw = raw
+        self.value = None
+        self.decoded = False
+        self.expires_at = expires_at
+        self.size = size
+
+
+class LocalCache:
+    """
+    Thread-safe LRU cache with per-entry TTL
+
+    Stores the payload exactly as it is kept in Redis, so repeated hits skip
+    the network round trip. Immutable values (e.g. the JSON bodies served
+    by the catalog endpoints) are decoded at most once and shared; dicts
+    and lists are decoded on every hit, so a caller mutating its value
+    can't change what other callers get.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        codec: Optional[CacheCodec] = None,
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.codec = codec or cache_codec
+        self.on_evict = on_evict  # Called with the key of each capacity eviction
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        """Return a live entry (marking it recently used) or None; lock held"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get the decoded value for key
+
+        Returns:
+            Cached value, or ``default`` if missing or expired
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                return default
+            if entry.decoded:
+                return entry.value
+            try:
+                value = self.codec.decode(entry.raw)
+            except ValueError:
+                self._remove(key)
+                return default
+            if isinstance(value, _IMMUTABLE):
+                entry.value = value
+                entry.decoded = True
+            return value
+
+    def set(self, key: str, raw: Union[bytes, str], ttl: float, value: Any = None, decoded: bool = False) -> bool:
+        """
+        Store a raw payload
+
+        Args:
+            key: Cache key
+            raw: Encoded payload, as stored in Redis
+            ttl: Time to live in seconds
+            value: Already-decoded value, if the caller has it (kept only
+                when immutable; the caller keeps its own instance otherwise)
+            decoded: Whether ``value`` holds the decoded payload
+
+        Returns:
+            False if the payload alone exceeds the byte budget
+        """
+        size = len(key) + len(raw)
+        if size > self.max_bytes or ttl <= 0:
+            return False
+
+        entry = _Entry(raw, time.monotonic() + ttl, size)
+        if decoded and isinstance(value, _IMMUTABLE):
+            entry.value = value
+            entry.decoded = True
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+                if self.on_evict is not None:
+                    self.on_evict(evicted_key)
+        return True
+
+    def delete(self, key: str) -> None:
+        """Remove key if present"""
+        with self._lock:
+            self._remove(key)
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Remove keys matching a Redis-style glob pattern"""
+        with self._lock:
+            matched = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in matched:
+                self._remove(key)
+            return len(matched)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Current size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
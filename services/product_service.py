@@ -1,14 +1,19 @@
 """Product service with Redis caching integration and sanitized logging."""
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.product import ProductModel
-from repositories.product_repository import ProductRepository
+from repositories.base_repository_impl import InstanceNotFoundError
+from repositories.product_repository import AsyncProductRepository, ProductRepository
 from schemas.product_schema import ProductSchema
-from services.base_service_impl import BaseServiceImpl
+from services.base_async_service_impl import CachedAsyncServiceImpl
+from services.base_service_impl import BaseServiceImpl, json_array, to_json
 from services.cache_service import cache_service
+from services.cache_warmer import cache_warmer
 from utils.logging_utils import get_sanitized_logger
+from utils.search import product_search_index
 
 logger = get_sanitized_logger(__name__)  # P11: Sanitized logging
 
@@ -26,37 +31,98 @@ class ProductService(BaseServiceImpl):
         self.cache = cache_service
         self.cache_prefix = "products"
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[ProductSchema]:
+    def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[ProductSchema]:
         """
         Get all products with caching
 
-        Cache key pattern: products:list:skip:{skip}:limit:{limit}
+        Pages cache only the product ids; products are hydrated from their
+        per-id keys with one MGET, so updating a product doesn't drop pages.
+
+        Cache key pattern: products:ids:limit:{limit}:skip:{skip}
+        (keyset mode: products:ids:after:{after_id}:limit:{limit})
         TTL: 5 minutes (default REDIS_CACHE_TTL)
         """
-        # Build cache key
-        cache_key = self.cache.build_key(
-            self.cache_prefix,
-            "list",
-            skip=skip,
-            limit=limit
-        )
+        if not self.cache.is_available():
+            return super().get_all(skip, limit, after_id)
 
-        # Try to get from cache
-        cached_products = self.cache.get(cache_key)
-        if cached_products is not None:
+        cache_key = self._page_key(skip, limit, after_id)
+        cached_ids = self.cache.get(cache_key)
+        if cached_ids is not None:
             logger.debug(f"Cache HIT: {cache_key}")
-            # Convert dict list back to ProductSchema list
-            return [ProductSchema(**p) for p in cached_products]
+            return [ProductSchema.model_validate_json(body) for body in self._get_many_json(cached_ids).values()]
 
-        # Cache miss - get from database
         logger.debug(f"Cache MISS: {cache_key}")
-        products = super().get_all(skip, limit)
+        products, _ = self._load_page(cache_key, skip, limit, after_id)
+        return products
 
-        # Cache the result (convert to dict for JSON serialization)
-        products_dict = [p.model_dump() for p in products]
-        self.cache.set(cache_key, products_dict)
+    def get_all_json(self, skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None) -> Tuple[str, List[int]]:
+        """
+        Get a page of products as a serialized JSON array
 
-        return products
+        Per-id entries hold each product's response JSON, so a cache hit
+        joins cached strings: no ProductSchema is built or validated.
+
+        Returns:
+            (JSON array, id_key of each product in order)
+        """
+        if not self.cache.is_available():
+            return super().get_all_json(skip, limit, after_id)
+
+        cache_key = self._page_key(skip, limit, after_id)
+        cached_ids = self.cache.get(cache_key)
+        if cached_ids is not None:
+            logger.debug(f"Cache HIT: {cache_key}")
+            bodies = self._get_many_json(cached_ids)
+        else:
+            logger.debug(f"Cache MISS: {cache_key}")
+            _, bodies = self._load_page(cache_key, skip, limit, after_id)
+
+        return json_array(bodies.values()), list(bodies)
+
+    def _page_key(self, skip: int, limit: int, after_id: Optional[int]) -> str:
+        """Cache key of a page of product ids"""
+        page = {"after": after_id} if after_id is not None else {"skip": skip}
+        return self.cache.build_key(self.cache_prefix, "ids", limit=limit, **page)
+
+    def _load_page(self, cache_key: str, skip: int, limit: int,
+                   after_id: Optional[int]) -> Tuple[List[ProductSchema], Dict[int, str]]:
+        """Query a page and cache its id list and every product (one round trip each)"""
+        products = super().get_all(skip, limit, after_id)
+        bodies = {p.id_key: to_json(p) for p in products}
+
+        self.cache.set(cache_key, list(bodies))
+        self.cache.set_many({self._item_key(id_key): body for id_key, body in bodies.items()})
+        return products, bodies
+
+    def _item_key(self, id_key: int) -> str:
+        """Cache key of a single product's JSON (shared with get_one)"""
+        return self.cache.build_key(self.cache_prefix, "id", id=id_key)
+
+    def _get_many_json(self, ids: List[int]) -> Dict[int, str]:
+        """
+        Serialized products by id, from per-id cache keys, loading misses in one query
+
+        Products deleted since the id list was cached are skipped.
+        """
+        keys = [self._item_key(id_key) for id_key in ids]
+        cached = self.cache.get_many(keys)
+
+        # Entries that aren't JSON strings predate the raw JSON format
+        missing = [
+            id_key for id_key, key in zip(ids, keys)
+            if not isinstance(cached.get(key), str) and not self.cache.is_tombstone(cached.get(key))
+        ]
+        loaded = {p.id_key: to_json(p) for p in self.repository.find_many(missing)} if missing else {}
+        if loaded:
+            self.cache.set_many({self._item_key(id_key): body for id_key, body in loaded.items()})
+
+        bodies = {}
+        for id_key, key in zip(ids, keys):
+            body = loaded.get(id_key) or cached.get(key)
+            if isinstance(body, str):
+                bodies[id_key] = body
+        return bodies
 
     def get_one(self, id_key: int) -> ProductSchema:
         """
@@ -65,29 +131,69 @@ class ProductService(BaseServiceImpl):
         Cache key pattern: products:id:{id_key}
         TTL: 5 minutes
         """
-        cache_key = self.cache.build_key(self.cache_prefix, "id", id=id_key)
+        cache_key = self._item_key(id_key)
 
         # Try cache first
         cached_product = self.cache.get(cache_key)
-        if cached_product is not None:
+        if isinstance(cached_product, str):
             logger.debug(f"Cache HIT: {cache_key}")
-            return ProductSchema(**cached_product)
+            return ProductSchema.model_validate_json(cached_product)
+        if self.cache.is_tombstone(cached_product):
+            logger.debug(f"Cache HIT (not found): {cache_key}")
+            raise self._not_found(id_key)
 
         # Get from database
         logger.debug(f"Cache MISS: {cache_key}")
-        product = super().get_one(id_key)
+        product = self._find(cache_key, id_key)
 
         # Cache the result
-        self.cache.set(cache_key, product.model_dump())
+        self.cache.set(cache_key, to_json(product))
 
         return product
 
+    def get_one_json(self, id_key: int) -> str:
+        """
+        Get single product by ID as serialized JSON (no validation on a hit)
+
+        Raises:
+            InstanceNotFoundError: If product doesn't exist
+        """
+        cache_key = self._item_key(id_key)
+
+        cached_product = self.cache.get(cache_key)
+        if isinstance(cached_product, str):
+            logger.debug(f"Cache HIT: {cache_key}")
+            return cached_product
+        if self.cache.is_tombstone(cached_product):
+            logger.debug(f"Cache HIT (not found): {cache_key}")
+            raise self._not_found(id_key)
+
+        logger.debug(f"Cache MISS: {cache_key}")
+        body = to_json(self._find(cache_key, id_key))
+        self.cache.set(cache_key, body)
+        return body
+
+    def _find(self, cache_key: str, id_key: int) -> ProductSchema:
+        """Load a product from the database, tombstoning its key if it doesn't exist"""
+        try:
+            return super().get_one(id_key)
+        except InstanceNotFoundError:
+            self.cache.set_tombstone(cache_key)
+            raise
+
+    def _not_found(self, id_key: int) -> InstanceNotFoundError:
+        """Same error the repository raises for a missing product"""
+        return InstanceNotFoundError(f"{self.model.__name__} with id {id_key} not found")
+
     def save(self, schema: ProductSchema) -> ProductSchema:
         """
         Create new product and invalidate list cache
         """
         product = super().save(schema)
 
+        # Drop a tombstone left by earlier lookups of this id
+        self.cache.delete(self._item_key(product.id_key))
+
         # Invalidate list cache (all paginated lists)
         self._invalidate_list_cache()
 
@@ -109,15 +215,16 @@ class ProductService(BaseServiceImpl):
             ValueError: If validation fails
         """
         # Build cache keys BEFORE update (prepare for invalidation)
-        cache_key = self.cache.build_key(self.cache_prefix, "id", id=id_key)
+        cache_key = self._item_key(id_key)
 
         try:
             # Update in database (atomic transaction)
             product = super().update(id_key, schema)
 
-            # Only invalidate cache AFTER successful DB commit
+            # Only invalidate cache AFTER successful DB commit. Id lists stay
+            # valid: the product is still on the same pages.
             self.cache.delete(cache_key)
-            self._invalidate_list_cache()
+            self._invalidate_list_cache(membership_changed=False)
 
             logger.info(f"Product {id_key} updated and cache invalidated successfully")
             return product
@@ -160,15 +267,39 @@ class ProductService(BaseServiceImpl):
         super().delete(id_key)
 
         # Invalidate specific product cache
-        cache_key = self.cache.build_key(self.cache_prefix, "id", id=id_key)
-        self.cache.delete(cache_key)
+        self.cache.delete(self._item_key(id_key))
 
         # Invalidate list cache
         self._invalidate_list_cache()
 
-    def _invalidate_list_cache(self):
-        """Invalidate all product list caches"""
-        pattern = f"{self.cache_prefix}:list:*"
-        deleted_count = self.cache.delete_pattern(pattern)
+    def _invalidate_list_cache(self, membership_changed: bool = True):
+        """
+        Invalidate product list caches (and the in-process search index)
+
+        products:list:* (catalog responses and counts) depends on product
+        fields and is cleared on every write. products:ids:* pages only
+        change when products are added or removed. The hottest entries are
+        warmed again in the background (services/cache_warmer.py).
+        """
+        product_search_index.invalidate()
+        deleted_count = self.cache.delete_pattern(f"{self.cache_prefix}:list:*")
+        if membership_changed:
+            deleted_count += self.cache.delete_pattern(f"{self.cache_prefix}:ids:*")
         if deleted_count > 0:
             logger.info(f"Invalidated {deleted_count} product list cache entries")
+        cache_warmer.schedule("products", reason="product write")
+
+
+class AsyncProductService(CachedAsyncServiceImpl):
+    """Non-blocking product reads on an AsyncSession, sharing ProductService's cache entries."""
+
+    cache_prefix = "products"
+    cache_ttl = None  # REDIS_CACHE_TTL, as ProductService
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(
+            repository_class=AsyncProductRepository,
+            model=ProductModel,
+            schema=ProductSchema,
+            db=db
+        )
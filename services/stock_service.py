@@ -0,0 +1,103 @@
+"""
+Stock Service
+
+Batched stock reservation for multi-line orders. Every product of the order
+is locked in one SELECT ... FOR UPDATE, in ascending id order, so two orders
+sharing products always lock them in the same sequence and can't deadlock.
+Quantities are validated against the locked stock and deducted with a
+single UPDATE. Nothing is committed: the reservation belongs to the caller's
+transaction and is rolled back with it.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.product import ProductModel
+from repositories.base_repository_impl import InstanceNotFoundError
+from utils.logging_utils import get_sanitized_logger
+
+logger = get_sanitized_logger(__name__)
+
+
+class InsufficientStockError(ValueError):
+    """Raised when some products don't have enough stock for an order"""
+
+    def __init__(self, shortages: Dict[int, Tuple[int, int]]):
+        """
+        Args:
+            shortages: {product_id: (requested, available)}
+        """
+        self.shortages = shortages
+        details = ", ".join(
+            f"product {product_id}: requested {requested}, available {available}"
+            for product_id, (requested, available) in sorted(shortages.items())
+        )
+        super().__init__(f"Insufficient stock ({details})")
+
+
+class StockService:
+    """Reserves stock for all lines of an order in a constant number of statements"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reserve(self, quantities: Dict[int, int]) -> Dict[int, int]:
+        """
+        Lock, validate and deduct stock for several products at once
+
+        Args:
+            quantities: {product_id: units to reserve}
+
+        Returns:
+            {product_id: stock left}
+
+        Raises:
+            InstanceNotFoundError: If a product doesn't exist
+            InsufficientStockError: If any product lacks stock (nothing is deducted)
+        """
+        ids: List[int] = sorted(product_id for product_id, quantity in quantities.items() if quantity > 0)
+        if not ids:
+            return {}
+
+        # ORDER BY id_key: rows are locked in the order they are read
+        stock = dict(self.db.execute(
+            select(ProductModel.id_key, ProductModel.stock)
+            .where(ProductModel.id_key.in_(ids))
+            .order_by(ProductModel.id_key)
+            .with_for_update()
+        ).all())
+
+        missing = [product_id for product_id in ids if product_id not in stock]
+        if missing:
+            raise InstanceNotFoundError(f"Products not found: {missing}")
+
+        shortages = {
+            product_id: (quantities[product_id], stock[product_id])
+            for product_id in ids
+            if stock[product_id] < quantities[product_id]
+        }
+        if shortages:
+            logger.warning(f"Stock reservation rejected: {shortages}")
+            raise InsufficientStockError(shortages)
+
+        self.db.execute(
+            update(ProductModel)
+            .where(ProductModel.id_key.in_(ids))
+            .values(stock=ProductModel.stock - case(
+                {product_id: quantities[product_id] for product_id in ids},
+                value=ProductModel.id_key,
+                else_=0,
+            ))
+            .execution_options(synchronize_session=False)
+        )
+
+        left = {product_id: stock[product_id] - quantities[product_id] for product_id in ids}
+        # Keep products already loaded in the session in step with the UPDATE
+        for product_id, value in left.items():
+            product = self.db.identity_map.get(self.db.identity_key(ProductModel, product_id))
+            if product is not None:
+                set_committed_value(product, "stock", value)
+        logger.info(f"Stock reserved for {len(ids)} products")
+        return left
@@ -3,6 +3,7 @@ import os
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from datetime import datetime, date
 from typing import Generator
@@ -15,11 +16,21 @@ os.environ['POSTGRES_USER'] = 'postgres'
 os.environ['POSTGRES_PASSWORD'] = 'postgres'
 os.environ['REDIS_HOST'] = 'localhost'
 os.environ['REDIS_PORT'] = '6379'
+os.environ['CACHE_WARMUP_ENABLED'] = 'false'  # Tests warm explicitly
 
 from models.base_model import base as Base
 from main import create_fastapi_app
 
 
+@pytest.fixture(autouse=True)
+def reset_redis_circuit_breaker():
+    """Every test starts with the shared Redis circuit closed."""
+    from config.redis_config import redis_breaker
+    redis_breaker.reset()
+    yield
+    redis_breaker.reset()
+
+
 # Test database URL
 TEST_DATABASE_URL = "sqlite:///:memory:"  # In-memory SQLite for fast testing
 
@@ -30,6 +41,7 @@ def engine():
     test_engine = create_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},  # SQLite specific
+        poolclass=StaticPool,  # One connection, so every session sees the same in-memory database
         echo=False
     )
     Base.metadata.create_all(bind=test_engine)
@@ -58,6 +70,23 @@ def db_session(engine) -> Generator[Session, None, None]:
         session.commit()
 
 
+@pytest.fixture(scope="function")
+async def async_db_session():
+    """Create an async session on a fresh in-memory aiosqlite database."""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session = async_sessionmaker(async_engine, expire_on_commit=False)()
+    try:
+        yield session
+    finally:
+        await session.close()
+        await async_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def client(db_session: Session) -> Generator[TestClient, None, None]:
     """Create a test client for API testing."""
@@ -282,21 +311,84 @@ def mock_redis(monkeypatch):
         def __init__(self):
             self.data = {}
             self.expirations = {}
+            self.published = []
 
         def get(self, key):
             return self.data.get(key)
 
-        def set(self, key, value, ex=None):
+        def mget(self, keys):
+            return [self.data.get(key) for key in keys]
+
+        def set(self, key, value, ex=None, nx=False):
+            if nx and key in self.data:
+                return None
             self.data[key] = value
             if ex:
                 self.expirations[key] = ex
             return True
 
-        def delete(self, key):
-            if key in self.data:
-                del self.data[key]
-            if key in self.expirations:
-                del self.expirations[key]
+        def setex(self, key, ttl, value):
+            return self.set(key, value, ex=ttl)
+
+        def delete(self, *keys):
+            deleted = 0
+            for key in keys:
+                if key in self.data:
+                    del self.data[key]
+                    deleted += 1
+                self.expirations.pop(key, None)
+            return deleted
+
+        def keys(self, pattern="*"):
+            import fnmatch
+            return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+        def scan_iter(self, match="*", count=None):
+            import fnmatch
+            return (key for key in list(self.data) if fnmatch.fnmatchcase(key, match))
+
+        def unlink(self, *keys):
+            return self.delete(*keys)
+
+        def sadd(self, key, *members):
+            current = self.data.setdefault(key, set())
+            added = len(set(members) - current)
+            current.update(members)
+            return added
+
+        def smembers(self, key):
+            return set(self.data.get(key, set()))
+
+        def srem(self, key, *members):
+            current = self.data.get(key, set())
+            removed = len(current & set(members))
+            current.difference_update(members)
+            return removed
+
+        def zadd(self, key, mapping):
+            current = self.data.setdefault(key, {})
+            added = len(set(mapping) - set(current))
+            current.update(mapping)
+            return added
+
+        def zremrangebyscore(self, key, min, max):
+            current = self.data.get(key, {})
+            removed = [m for m, score in current.items() if float(min) <= score <= float(max)]
+            for member in removed:
+                del current[member]
+            return len(removed)
+
+        def zrangebyscore(self, key, min, max):
+            current = self.data.get(key, {})
+            return sorted((m for m, score in current.items() if float(min) <= score <= float(max)),
+                          key=current.get)
+
+        def zcard(self, key):
+            return len(self.data.get(key, {}))
+
+        def flushdb(self):
+            self.data.clear()
+            self.expirations.clear()
             return True
 
         def incr(self, key):
@@ -308,33 +400,192 @@ def mock_redis(monkeypatch):
             self.expirations[key] = seconds
             return True
 
-        def pipeline(self):
+        def pttl(self, key):
+            if key not in self.data:
+                return -2
+            return self.expirations[key] * 1000 if key in self.expirations else -1
+
+        def pipeline(self, transaction=True):
             return MockPipeline(self)
 
+        def publish(self, channel, message):
+            self.published.append((channel, message))
+            return 0
+
+        def eval(self, script, numkeys, *keys_and_args):
+            """Runs the Lua source (lupa) with redis.call mapped to these methods"""
+            lupa = pytest.importorskip("lupa")
+            lua = lupa.LuaRuntime(unpack_returned_tuples=True)
+            commands = {"GET": self.get, "SET": self.set, "DEL": self.delete}
+
+            def call(name, *args):
+                result = commands[name.upper()](*args)
+                return False if result is None else result  # Redis nil reply -> Lua false
+
+            lua.globals().redis = lua.table(call=call)
+            keys = [str(k) for k in keys_and_args[:numkeys]]
+            args = [str(a) for a in keys_and_args[numkeys:]]
+            function = lua.execute(f"return function(KEYS, ARGV) {script} end")
+            return function(lua.table(*keys), lua.table(*args))
+
         def ping(self):
             return True
 
     class MockPipeline:
+        """Queues any MockRedis command and runs them in order on execute()"""
         def __init__(self, redis_client):
             self.redis = redis_client
             self.commands = []
 
-        def incr(self, key):
-            self.commands.append(('incr', key))
-            return self
-
-        def expire(self, key, seconds):
-            self.commands.append(('expire', key, seconds))
-            return self
+        def __getattr__(self, name):
+            def queue(*args, **kwargs):
+                self.commands.append((name, args, kwargs))
+                return self
+            return queue
 
         def execute(self):
-            results = []
-            for cmd in self.commands:
-                if cmd[0] == 'incr':
-                    results.append(self.redis.incr(cmd[1]))
-                elif cmd[0] == 'expire':
-                    results.append(self.redis.expire(cmd[1], cmd[2]))
+            results = [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
             self.commands = []
             return results
 
     return MockRedis()
+
+
+# Async Redis stand-in that really runs Lua scripts
+@pytest.fixture
+def mock_async_redis():
+    """
+    Mock redis.asyncio client for rate limiting tests.
+
+    Scripts run in an embedded Lua interpreter (lupa) against an in-memory
+    keyspace with expiry, so tests exercise the real Lua source. ``clock``
+    can be replaced to move time forward; ``round_trips`` counts calls.
+    """
+    lupa = pytest.importorskip("lupa")
+    import hashlib
+    import time as time_module
+
+    class MockScript:
+        """Mirrors redis-py's AsyncScript: EVALSHA, then SCRIPT LOAD on NOSCRIPT"""
+        def __init__(self, client, script):
+            self.client = client
+            self.script = script
+            self.sha = hashlib.sha1(script.encode()).hexdigest()
+
+        async def __call__(self, keys=None, args=None, client=None):
+            keys, args = list(keys or []), list(args or [])
+            try:
+                return await self.client.evalsha(self.sha, len(keys), *keys, *args)
+            except LookupError:
+                self.sha = await self.client.script_load(self.script)
+                return await self.client.evalsha(self.sha, len(keys), *keys, *args)
+
+    class MockAsyncRedis:
+        def __init__(self):
+            self.data = {}
+            self.expires_at = {}
+            self.scripts = {}
+            self.round_trips = 0
+            self.clock = time_module.time
+            self.lua = lupa.LuaRuntime(unpack_returned_tuples=True)
+            redis_table = self.lua.table()
+            redis_table.call = self._lua_call
+            self.lua.globals().redis = redis_table
+
+        # -- keyspace -------------------------------------------------------
+        def _alive(self, key):
+            deadline = self.expires_at.get(key)
+            if deadline is not None and deadline <= self.clock():
+                self.data.pop(key, None)
+                self.expires_at.pop(key, None)
+            return key in self.data
+
+        def _ttl_ms(self, key):
+            if not self._alive(key):
+                return -2
+            deadline = self.expires_at.get(key)
+            return -1 if deadline is None else int((deadline - self.clock()) * 1000)
+
+        def command(self, name, *args):
+            name = name.upper()
+            key = args[0] if args else None
+            if name == "GET":
+                return self.data.get(key) if self._alive(key) else None
+            if name == "SET":
+                self.data[key] = str(args[1])
+                self.expires_at.pop(key, None)
+                options = [str(a).upper() for a in args[2:]]
+                for unit, scale in (("PX", 1000), ("EX", 1)):
+                    if unit in options:
+                        self.expires_at[key] = self.clock() + float(args[2 + options.index(unit) + 1]) / scale
+                return "OK"
+            if name in ("INCR", "INCRBY"):
+                value = int(self.data[key]) if self._alive(key) else 0
+                value += int(args[1]) if name == "INCRBY" else 1
+                self.data[key] = str(value)
+                return value
+            if name in ("EXPIRE", "PEXPIRE"):
+                if not self._alive(key):
+                    return 0
+                scale = 1 if name == "EXPIRE" else 1000
+                self.expires_at[key] = self.clock() + float(args[1]) / scale
+                return 1
+            if name == "TTL":
+                ttl_ms = self._ttl_ms(key)
+                return ttl_ms if ttl_ms < 0 else -(-ttl_ms // 1000)
+            if name == "PTTL":
+                return self._ttl_ms(key)
+            if name == "DEL":
+                return sum(1 for k in args if self._alive(k) and self.data.pop(k, None) is not None)
+            if name == "TIME":
+                now = self.clock()
+                return [str(int(now)), str(int((now % 1) * 1_000_000))]
+            raise NotImplementedError(f"MockAsyncRedis does not implement {name}")
+
+        # -- Lua bridge -----------------------------------------------------
+        def _lua_call(self, name, *args):
+            result = self.command(name, *args)
+            if result is None:
+                return False  # Redis nil reply -> Lua false
+            if isinstance(result, list):
+                return self.lua.table(*result)
+            return result
+
+        def _from_lua(self, value):
+            if lupa.lua_type(value) == "table":
+                return [self._from_lua(value[i]) for i in range(1, len(value) + 1)]
+            if value is True:
+                return 1
+            if value is False or value is None:
+                return None
+            if isinstance(value, float):
+                return int(value)  # Redis truncates Lua numbers to integers
+            return value
+
+        # -- async client API -------------------------------------------------
+        def register_script(self, script):
+            return MockScript(self, script)
+
+        async def script_load(self, script):
+            self.round_trips += 1
+            sha = hashlib.sha1(script.encode()).hexdigest()
+            self.scripts[sha] = self.lua.execute(f"return function(KEYS, ARGV) {script} end")
+            return sha
+
+        async def evalsha(self, sha, numkeys, *keys_and_args):
+            self.round_trips += 1
+            if sha not in self.scripts:
+                raise LookupError("NOSCRIPT No matching script")
+            keys = [str(k) for k in keys_and_args[:numkeys]]
+            args = [str(a) for a in keys_and_args[numkeys:]]
+            result = self.scripts[sha](self.lua.table(*keys), self.lua.table(*args))
+            return self._from_lua(result)
+
+        async def get(self, key):
+            self.round_trips += 1
+            return self.command("GET", key)
+
+        async def ping(self):
+            return True
+
+    return MockAsyncRedis()
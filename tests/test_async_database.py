@@ -0,0 +1,180 @@
+"""Unit tests for the async database stack (engine URI, repository, service)."""
+import pytest
+
+from config.database import to_async_uri
+from models.category import CategoryModel
+from repositories.base_async_repository_impl import BaseAsyncRepositoryImpl
+from repositories.base_repository_impl import BaseRepositoryImpl, InstanceNotFoundError
+from schemas.category_schema import CategorySchema
+from services.base_async_service_impl import BaseAsyncServiceImpl
+
+
+class AsyncCategoryRepository(BaseAsyncRepositoryImpl):
+    def __init__(self, db):
+        super().__init__(CategoryModel, CategorySchema, db)
+
+
+class TestAsyncUri:
+    """Tests for sync -> async driver URI conversion."""
+
+    def test_postgres_uses_asyncpg(self):
+        assert to_async_uri("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+
+    def test_sqlite_uses_aiosqlite(self):
+        assert to_async_uri("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+    def test_unknown_scheme_unchanged(self):
+        assert to_async_uri("mysql://u@h/db") == "mysql://u@h/db"
+
+
+class TestBaseAsyncRepository:
+    """Tests for BaseAsyncRepositoryImpl CRUD operations."""
+
+    async def test_save_and_find(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+
+        saved = await repo.save(CategoryModel(name="Electronics"))
+        found = await repo.find(saved.id_key)
+
+        assert found.id_key == saved.id_key
+        assert found.name == "Electronics"
+        assert found.products == []
+
+    async def test_find_not_found(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+
+        with pytest.raises(InstanceNotFoundError):
+            await repo.find(999)
+
+    async def test_find_all_with_pagination(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+        await repo.save_all([CategoryModel(name=f"Cat {i}") for i in range(5)])
+
+        page = await repo.find_all(skip=1, limit=2)
+
+        assert [c.name for c in page] == ["Cat 1", "Cat 2"]
+
+    async def test_find_all_invalid_skip(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+
+        with pytest.raises(ValueError):
+            await repo.find_all(skip=-1)
+
+    async def test_update_blocks_protected_field(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+        saved = await repo.save(CategoryModel(name="Books"))
+
+        with pytest.raises(ValueError):
+            await repo.update(saved.id_key, {"id_key": 42})
+
+        updated = await repo.update(saved.id_key, {"name": "Comics"})
+        assert updated.name == "Comics"
+
+    def test_has_no_blocking_methods(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+
+        assert not isinstance(repo, BaseRepositoryImpl)
+        assert not hasattr(repo, "estimated_count")
+
+    async def test_remove(self, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+        saved = await repo.save(CategoryModel(name="Toys"))
+
+        await repo.remove(saved.id_key)
+
+        with pytest.raises(InstanceNotFoundError):
+            await repo.find(saved.id_key)
+
+
+class TestBaseAsyncService:
+    """Tests for BaseAsyncServiceImpl delegating to the async repository."""
+
+    async def test_save_and_get_all(self, async_db_session):
+        service = BaseAsyncServiceImpl(AsyncCategoryRepository, CategoryModel, CategorySchema, async_db_session)
+
+        created = await service.save(CategorySchema(name="Music"))
+        categories = await service.get_all()
+
+        assert created.id_key is not None
+        assert [c.name for c in categories] == ["Music"]
+        assert (await service.get_one(created.id_key)).name == "Music"
+
+
+class TestAsyncReadRoutes:
+    """Product and category read routes served on an AsyncSession when ASYNC_DB_ENABLED."""
+
+    @pytest.fixture
+    def app(self, monkeypatch, async_db_session):
+        from fastapi import FastAPI
+        from fastapi.responses import JSONResponse
+
+        from config.database import get_async_db, get_db
+        from controllers.category_controller import CategoryController
+        from controllers.product_controller import ProductController
+
+        monkeypatch.setattr("controllers.base_controller_impl.ASYNC_DB_ENABLED", True)
+        app = FastAPI()
+        app.include_router(ProductController().router, prefix="/products")
+        app.include_router(CategoryController().router, prefix="/categories")
+
+        @app.exception_handler(InstanceNotFoundError)
+        async def not_found(request, exc):
+            return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+        async def async_db():
+            yield async_db_session
+
+        def no_sync_db():
+            raise AssertionError("read route used the sync session")
+
+        app.dependency_overrides[get_async_db] = async_db
+        app.dependency_overrides[get_db] = no_sync_db
+        return app
+
+    @pytest.fixture
+    def cache(self, monkeypatch, mock_redis):
+        from services.cache_service import cache_service
+        from tests.test_cache_service import AsyncRedisView
+
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "async_redis_client", AsyncRedisView(mock_redis))
+        monkeypatch.setattr(cache_service, "local", None)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        return mock_redis
+
+    async def request(self, app, path):
+        import httpx
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path)
+
+    async def test_reads_use_the_async_session(self, app, async_db_session):
+        repo = AsyncCategoryRepository(async_db_session)
+        await repo.save_all([CategoryModel(name=f"Cat {i}") for i in range(3)])
+
+        page = await self.request(app, "/categories/?limit=2")
+        assert page.status_code == 200
+        assert [c["name"] for c in page.json()] == ["Cat 0", "Cat 1"]
+
+        rest = await self.request(app, f"/categories/?limit=2&cursor={page.headers['X-Next-Cursor']}")
+        assert [c["name"] for c in rest.json()] == ["Cat 2"]
+        assert "X-Next-Cursor" not in rest.headers
+
+        assert (await self.request(app, "/products/")).json() == []
+        assert (await self.request(app, "/products/999")).status_code == 404
+
+    async def test_reads_share_the_sync_cache_entries(self, app, async_db_session, cache):
+        from services.category_service import CategoryService
+
+        category = await AsyncCategoryRepository(async_db_session).save(CategoryModel(name="Games"))
+
+        first = await self.request(app, "/categories/")
+        assert first.json()[0]["name"] == "Games"
+        service = CategoryService(None)
+        assert service._page_key(0, 100, None) in cache.data
+        assert service._item_key(category.id_key) in cache.data
+
+        await async_db_session.execute(CategoryModel.__table__.delete())
+        await async_db_session.commit()
+        second = await self.request(app, "/categories/")
+        assert second.json() == first.json()  # Served from the cache
@@ -0,0 +1,918 @@
+"""Tests for CacheService tiers (services/cache_service.py, services/local_cache.py)."""
+import json
+import time
+
+import pytest
+
+from services.cache_codec import CacheCodec, CacheDecodeError, FLAG_ZLIB, cache_codec
+from services.cache_service import CacheService
+from services.local_cache import LocalCache
+
+
+@pytest.fixture
+def make_cache(mock_redis):
+    """Build CacheService instances sharing one (mock) Redis, like uvicorn workers"""
+    def factory(local=True):
+        cache = CacheService(local=LocalCache(max_entries=100, max_bytes=10_000) if local else None)
+        cache.redis_client = mock_redis
+        cache.enabled = True
+        return cache
+    return factory
+
+
+def deliver(mock_redis, *caches):
+    """Deliver published invalidations to every worker, as the listener would"""
+    for _, message in mock_redis.published:
+        for cache in caches:
+            cache.apply_invalidation(message)
+    mock_redis.published.clear()
+
+
+class TestLocalCache:
+    """Tests for the in-process L1 LRU."""
+
+    def test_decodes_once_and_counts_hits(self):
+        cache = LocalCache(max_entries=10, max_bytes=1000)
+        cache.set("k", '"body"', ttl=60)
+
+        first = cache.get("k")
+        assert first == "body"
+        assert cache.get("k") is first
+        assert cache.get("missing") is None
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_mutable_values_are_not_shared(self):
+        cache = LocalCache(max_entries=10, max_bytes=1000)
+        cache.set("k", '{"a": [1]}', ttl=60, value={"a": [1]}, decoded=True)
+
+        cache.get("k")["a"].append(2)
+        assert cache.get("k") == {"a": [1]}
+
+    def test_expired_entries_are_misses(self):
+        cache = LocalCache(max_entries=10, max_bytes=1000)
+        cache.set("k", "1", ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = LocalCache(max_entries=2, max_bytes=1000)
+        cache.set("a", "1", ttl=60)
+        cache.set("b", "2", ttl=60)
+        cache.get("a")  # b becomes least recently used
+        cache.set("c", "3", ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = LocalCache(max_entries=100, max_bytes=50)
+        cache.set("a", "x" * 20, ttl=60)
+        cache.set("b", "y" * 20, ttl=60)
+        cache.set("c", "z" * 20, ttl=60)
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] <= 50
+
+    def test_oversized_payload_not_stored(self):
+        cache = LocalCache(max_entries=100, max_bytes=10)
+        assert cache.set("k", "x" * 100, ttl=60) is False
+        assert cache.get("k") is None
+
+    def test_delete_pattern(self):
+        cache = LocalCache(max_entries=10, max_bytes=1000)
+        cache.set("products:list:1", "1", ttl=60)
+        cache.set("products:id:1", "1", ttl=60)
+
+        assert cache.delete_pattern("products:list:*") == 1
+        assert cache.get("products:id:1") == 1
+
+
+class TestTwoTierCache:
+    """Tests for CacheService with the L1 tier enabled."""
+
+    def test_l1_hit_skips_redis(self, make_cache, mock_redis):
+        cache = make_cache()
+        cache.set("categories:list", [{"id_key": 1}])
+
+        mock_redis.data.clear()  # Redis no longer has it; L1 does
+        assert cache.get("categories:list") == [{"id_key": 1}]
+        assert cache.stats()["l1"]["hits"] == 1
+
+    def test_redis_hit_fills_l1(self, make_cache, mock_redis):
+        writer, reader = make_cache(), make_cache()
+        writer.set("k", {"v": 1})
+
+        assert reader.get("k") == {"v": 1}
+        assert reader.stats()["redis"] == {"hits": 1, "misses": 0}
+        assert reader.get("k") == {"v": 1}
+        assert reader.stats()["l1"]["hits"] == 1
+
+    def test_string_values_use_l1(self, make_cache, mock_redis):
+        cache = make_cache()
+        cache.set("body", '{"x":1}')
+        mock_redis.data.clear()
+        assert cache.get("body") == '{"x":1}'
+
+    def test_cached_values_are_isolated_from_callers(self, make_cache):
+        cache = make_cache()
+        value = {"items": [1]}
+        cache.set("k", value)
+        value["items"].append(2)
+
+        assert cache.get("k") == {"items": [1]}
+
+    def test_values_read_from_redis_are_isolated_from_callers(self, make_cache, mock_redis):
+        writer, reader = make_cache(), make_cache()
+        writer.set("k", {"items": [1]})
+
+        reader.get("k")["items"].append(2)
+        reader.get_many(["k"])["k"]["items"].append(3)
+        assert reader.get("k") == {"items": [1]}
+
+    def test_l1_keeps_a_redis_hit_no_longer_than_redis(self, make_cache, mock_redis):
+        writer, reader = make_cache(), make_cache()
+        writer.set("products:list:count:abc", 30, ttl=1)
+        writer.set("products:id:id:9", {"n": 9})
+        mock_redis.expirations["products:id:id:9"] = 1
+
+        assert reader.get("products:list:count:abc") == 30
+        assert reader.get_many(["products:id:id:9"]) == {"products:id:id:9": {"n": 9}}
+        mock_redis.data.clear()
+        time.sleep(1.05)
+
+        assert reader.get("products:list:count:abc") is None
+        assert reader.get("products:id:id:9") is None
+
+    def test_delete_evicts_other_workers(self, make_cache, mock_redis):
+        worker_a, worker_b = make_cache(), make_cache()
+        worker_a.set("products:id:1", {"name": "old"})
+        assert worker_b.get("products:id:1") == {"name": "old"}
+
+        worker_a.delete("products:id:1")
+        deliver(mock_redis, worker_a, worker_b)
+
+        assert worker_b.get("products:id:1") is None
+
+    def test_delete_pattern_evicts_other_workers(self, make_cache, mock_redis):
+        worker_a, worker_b = make_cache(), make_cache()
+        worker_a.set("products:list:skip:0", [1])
+        worker_a.set("categories:list", [2])
+        worker_b.get("products:list:skip:0")
+        worker_b.get("categories:list")
+
+        worker_a.delete_pattern("products:list:*")
+        deliver(mock_redis, worker_a, worker_b)
+
+        assert worker_b.local.get("products:list:skip:0") is None
+        assert worker_b.local.get("categories:list") == [2]
+
+    @pytest.mark.parametrize("delete", [
+        lambda cache: cache.delete("products:list:skip:0"),
+        lambda cache: cache.delete_many(["products:list:skip:0"]),
+        lambda cache: cache.delete_pattern("products:list:*"),
+    ])
+    def test_invalidation_is_published_after_redis_is_cleared(self, make_cache, mock_redis, delete):
+        worker_a, worker_b = make_cache(), make_cache()
+        worker_a.set("products:list:skip:0", [1])
+        worker_b.get("products:list:skip:0")
+
+        publish = mock_redis.publish
+        refilled = []
+
+        def publish_then_refill(channel, message):
+            result = publish(channel, message)
+            deliver(mock_redis, worker_b)
+            refilled.append(worker_b.get("products:list:skip:0"))  # Next read on the other worker
+            return result
+        mock_redis.publish = publish_then_refill
+
+        delete(worker_a)
+
+        assert refilled == [None]
+        assert worker_b.local.get("products:list:skip:0") is None
+
+    def test_own_messages_ignored_and_garbage_tolerated(self, make_cache, mock_redis):
+        cache = make_cache()
+        cache.set("k", 1)
+        cache.apply_invalidation("not json")
+        cache.apply_invalidation('{"op": "all", "origin": "%s"}' % cache.worker_id)
+        assert cache.local.get("k") == 1
+
+    def test_without_l1_nothing_is_published(self, make_cache, mock_redis):
+        cache = make_cache(local=False)
+        cache.set("k", 1)
+        cache.delete("k")
+
+        assert mock_redis.published == []
+        assert cache.stats()["l1"] is None
+
+
+class TestIndexedInvalidation:
+    """Tests for delete_pattern without KEYS."""
+
+    @pytest.fixture
+    def cache(self, make_cache, mock_redis, monkeypatch):
+        def no_keys(pattern="*"):
+            raise AssertionError("KEYS must not be used")
+        monkeypatch.setattr(mock_redis, "keys", no_keys, raising=False)
+        return make_cache(local=False)
+
+    def seed(self, cache):
+        cache.set("products:list:limit:10:skip:0", [1])
+        cache.set("products:list:count:abc", 5)
+        cache.set("products:id:id:1", {"id_key": 1})
+        cache.set("categories:list:limit:10", [2])
+
+    def test_namespace_pattern_deletes_only_namespace(self, cache, mock_redis):
+        self.seed(cache)
+
+        assert cache.delete_pattern("products:list:*") == 2
+        assert cache.get("products:list:limit:10:skip:0") is None
+        assert cache.get("products:id:id:1") == {"id_key": 1}
+        assert cache.get("categories:list:limit:10") == [2]
+
+    def test_prefix_pattern_covers_every_namespace(self, cache):
+        self.seed(cache)
+
+        assert cache.delete_pattern("products:*") == 3
+        assert cache.get("categories:list:limit:10") == [2]
+
+    def test_keys_cached_after_invalidation_are_tracked(self, cache):
+        self.seed(cache)
+        cache.delete_pattern("products:list:*")
+
+        cache.set("products:list:limit:10:skip:0", [3])
+        assert cache.delete_pattern("products:list:*") == 1
+
+    def test_expired_keys_are_pruned_from_the_index(self, cache, mock_redis, monkeypatch):
+        now = [1_000_000.0]
+        monkeypatch.setattr(time, "time", lambda: now[0])
+        for digest in range(5):
+            cache.set(f"products:list:count:{digest}", digest, ttl=60)
+        now[0] += 61  # Those keys have expired in Redis
+
+        cache.set("products:list:count:new", 1, ttl=60)
+        assert mock_redis.zcard("cache:keys:products:list") == 1
+        assert cache.delete_pattern("products:list:*") == 1
+
+    def test_other_patterns_scan(self, cache, mock_redis):
+        self.seed(cache)
+        mock_redis.set("rate_limit:1.2.3.4", "1")
+
+        assert cache.delete_pattern("*:list:*") == 3
+        assert mock_redis.get("rate_limit:1.2.3.4") == "1"
+
+
+class TestBatchOperations:
+    """Tests for get_many / set_many / delete_many."""
+
+    def test_set_many_then_get_many(self, make_cache, mock_redis):
+        cache = make_cache(local=False)
+        cache.set_many({"products:id:id:1": {"n": 1}, "products:id:id:2": {"n": 2}}, ttl=30)
+
+        assert cache.get_many(["products:id:id:1", "products:id:id:3", "products:id:id:2"]) == {
+            "products:id:id:1": {"n": 1},
+            "products:id:id:2": {"n": 2},
+        }
+        assert mock_redis.expirations["products:id:id:1"] == 30
+        assert cache.stats()["redis"] == {"hits": 2, "misses": 1}
+
+    def test_get_many_uses_l1_before_mget(self, make_cache, mock_redis):
+        cache = make_cache()
+        cache.set_many({"a:b:1": 1, "a:b:2": 2})
+        mock_redis.data.clear()
+
+        assert cache.get_many(["a:b:1", "a:b:2"]) == {"a:b:1": 1, "a:b:2": 2}
+
+    def test_set_many_keys_are_indexed(self, make_cache):
+        cache = make_cache(local=False)
+        cache.set_many({"products:id:id:1": 1, "products:id:id:2": 2})
+        assert cache.delete_pattern("products:id:*") == 2
+
+    def test_delete_many_evicts_other_workers(self, make_cache, mock_redis):
+        worker_a, worker_b = make_cache(), make_cache()
+        worker_a.set_many({"k:1": 1, "k:2": 2})
+        worker_b.get_many(["k:1", "k:2"])
+
+        assert worker_a.delete_many(["k:1", "k:2", "k:3"]) == 2
+        deliver(mock_redis, worker_a, worker_b)
+
+        assert worker_b.get_many(["k:1", "k:2"]) == {}
+
+    def test_unavailable_cache(self, make_cache):
+        cache = make_cache(local=False)
+        cache.enabled = False
+        assert cache.get_many(["k"]) == {}
+        assert cache.set_many({"k": 1}) is False
+        assert cache.delete_many(["k"]) == 0
+
+
+class TestCacheCodec:
+    """Tests for the versioned cache payload format."""
+
+    VALUE = {"items": [{"id_key": i, "name": f"Product {i}", "price": 9.5} for i in range(50)], "total": 50}
+
+    @pytest.mark.parametrize("name", ["json", "msgpack"])
+    def test_round_trip(self, name):
+        if name == "msgpack":
+            pytest.importorskip("msgpack")
+        codec = CacheCodec(codec=name, compress_min_bytes=0)
+
+        for value in [self.VALUE, [1, 2], 3, 1.5, True, None, "text", "ñandú"]:
+            assert codec.decode(codec.encode(value)) == value
+
+    def test_strings_are_stored_as_text(self):
+        payload = CacheCodec(compress_min_bytes=0).encode('{"x":1}')
+        assert payload[2:] == b'{"x":1}'
+
+    def test_large_values_are_compressed(self):
+        codec = CacheCodec(codec="json", compress_min_bytes=256)
+        small, large = codec.encode([1]), codec.encode(self.VALUE)
+
+        assert not small[1] & FLAG_ZLIB
+        assert large[1] & FLAG_ZLIB
+        assert len(large) < len(CacheCodec(codec="json", compress_min_bytes=0).encode(self.VALUE))
+        assert codec.decode(large) == self.VALUE
+
+    def test_decodes_other_codecs_payloads(self):
+        pytest.importorskip("msgpack")
+        payload = CacheCodec(codec="json").encode(self.VALUE)
+        assert CacheCodec(codec="msgpack").decode(payload) == self.VALUE
+
+    def test_legacy_json_entries(self):
+        codec = CacheCodec()
+        assert codec.decode(b'{"a": 1}') == {"a": 1}
+        assert codec.decode("[1, 2]") == [1, 2]
+        assert codec.decode(b"plain text") == "plain text"
+
+    def test_unknown_version_and_corrupt_payloads(self):
+        codec = CacheCodec()
+        with pytest.raises(CacheDecodeError):
+            codec.decode(bytes((0xFF, 1)) + b"[]")
+        with pytest.raises(CacheDecodeError):
+            codec.decode(codec.encode(self.VALUE)[:-10])
+
+    def test_undecodable_entries_are_cache_misses(self, make_cache, mock_redis):
+        cache = make_cache()
+        mock_redis.data["k:1"] = bytes((0xFF, 1)) + b"[]"
+        mock_redis.data["k:2"] = cache.codec.encode(2)
+
+        assert cache.get("k:1") is None
+        assert cache.get_many(["k:1", "k:2"]) == {"k:2": 2}
+        assert cache.get_or_set("k:1", lambda: "new", ttl=60) == "new"
+
+
+@pytest.fixture
+def service_db(db_session):
+    """
+    Test database seeded with one category and three products
+
+    The products point at a category id with no row: ProductSchema
+    validation recurses through category.products otherwise.
+    """
+    from models.category import CategoryModel
+    from models.product import ProductModel
+
+    db_session.add(CategoryModel(name="Electronics"))
+    for i in range(3):
+        db_session.add(ProductModel(name=f"Product {i}", price=10.0 + i, stock=5, category_id=99))
+    db_session.commit()
+    return db_session
+
+
+class TestEntityHydration:
+    """ProductService/CategoryService cache id lists and hydrate per-id entries."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch, mock_redis):
+        from services.cache_service import cache_service
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        monkeypatch.setattr(cache_service, "local", None)
+        return mock_redis
+
+    def test_list_caches_ids_and_items(self, service_db, cache):
+        from services.product_service import ProductService
+
+        products = ProductService(service_db).get_all(limit=10)
+
+        assert cache_codec.decode(cache.data["products:ids:limit:10:skip:0"]) == [p.id_key for p in products]
+        assert all(f"products:id:id:{p.id_key}" in cache.data for p in products)
+
+    def test_update_keeps_id_pages_and_refreshes_item(self, service_db, cache):
+        from schemas.product_schema import ProductSchema
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        first = service.get_all(limit=10)[0]
+
+        service.update(first.id_key, ProductSchema(name="Renamed", price=first.price, category_id=first.category_id))
+
+        assert "products:ids:limit:10:skip:0" in cache.data
+        assert service.get_all(limit=10)[0].name == "Renamed"
+
+    def test_create_invalidates_id_pages(self, service_db, cache):
+        from schemas.product_schema import ProductSchema
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        service.get_all(limit=10)
+        service.save(ProductSchema(name="New", price=1.0, category_id=99))
+
+        assert len(service.get_all(limit=10)) == 4
+
+    def test_missing_items_loaded_in_one_query(self, service_db, cache, monkeypatch):
+        from repositories.base_repository_impl import BaseRepositoryImpl
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        ids = [p.id_key for p in service.get_all(limit=10)]
+        cache.delete(f"products:id:id:{ids[0]}", f"products:id:id:{ids[2]}")
+
+        calls = []
+        original = BaseRepositoryImpl.find_many
+        monkeypatch.setattr(BaseRepositoryImpl, "find_many",
+                            lambda self, wanted: calls.append(list(wanted)) or original(self, wanted))
+
+        assert [p.id_key for p in service.get_all(limit=10)] == ids
+        assert calls == [[ids[0], ids[2]]]
+
+    def test_category_list_hydrates_from_items(self, service_db, cache):
+        from services.category_service import CategoryService
+
+        service = CategoryService(service_db)
+        assert [c.name for c in service.get_all()] == ["Electronics"]
+        assert [c.name for c in service.get_all()] == ["Electronics"]
+        assert "categories:ids:limit:100:skip:0" in cache.data
+
+
+class TestRawJsonReads:
+    """Cache hits on the product/category routes skip Pydantic entirely."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch, mock_redis):
+        from services.cache_service import cache_service
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        monkeypatch.setattr(cache_service, "local", None)
+        return mock_redis
+
+    @pytest.fixture
+    def client(self, service_db):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from config.database import get_db
+        from controllers.category_controller import CategoryController
+        from controllers.product_controller import ProductController
+
+        app = FastAPI()
+        app.include_router(ProductController().router, prefix="/products")
+        app.include_router(CategoryController().router, prefix="/categories")
+        app.dependency_overrides[get_db] = lambda: service_db
+        return TestClient(app)
+
+    @staticmethod
+    def forbid_schema_construction(monkeypatch, schema):
+        def boom(*args, **kwargs):
+            raise AssertionError(f"{schema.__name__} constructed on a cache hit")
+        monkeypatch.setattr(schema, "__init__", boom)
+        monkeypatch.setattr(schema, "model_validate", boom)
+        monkeypatch.setattr(schema, "model_validate_json", boom)
+
+    def test_json_matches_response_model_serialization(self, service_db, cache):
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        body, ids = service.get_all_json(limit=10)
+        products = service.get_all(limit=10)
+
+        assert json.loads(body) == [p.model_dump(mode="json") for p in products]
+        assert ids == [p.id_key for p in products]
+
+    def test_product_hits_build_no_schemas(self, client, cache, monkeypatch):
+        from schemas.product_schema import ProductSchema
+
+        first = client.get("/products/?limit=2")
+        one = client.get(f"/products/{first.json()[0]['id_key']}")
+
+        self.forbid_schema_construction(monkeypatch, ProductSchema)
+        again = client.get("/products/?limit=2")
+        one_again = client.get(f"/products/{first.json()[0]['id_key']}")
+
+        assert again.status_code == 200
+        assert again.content == first.content
+        assert again.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+        assert one_again.content == one.content
+        assert one.json()["name"] == "Product 0"
+
+    def test_category_hits_build_no_schemas(self, client, cache, monkeypatch):
+        from schemas.category_schema import CategorySchema
+
+        first = client.get("/categories/")
+        self.forbid_schema_construction(monkeypatch, CategorySchema)
+
+        assert client.get("/categories/").content == first.content
+        assert [c["name"] for c in first.json()] == ["Electronics"]
+
+    def test_legacy_dict_entries_are_reloaded(self, service_db, cache):
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        _, ids = service.get_all_json(limit=10)
+        cache.data[f"products:id:id:{ids[0]}"] = json.dumps({"id_key": ids[0], "name": "stale"})
+
+        body, _ = service.get_all_json(limit=10)
+        assert json.loads(body)[0]["name"] == "Product 0"
+
+    def test_missing_product_raises(self, service_db, cache):
+        from repositories.base_repository_impl import InstanceNotFoundError
+        from services.product_service import ProductService
+
+        with pytest.raises(InstanceNotFoundError):
+            ProductService(service_db).get_one_json(9999)
+
+
+class TestNegativeCaching:
+    """Lookups of missing ids are answered by short-lived tombstones."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch, mock_redis):
+        from services.cache_service import cache_service
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        monkeypatch.setattr(cache_service, "local", None)
+        return mock_redis
+
+    @pytest.fixture
+    def finds(self, monkeypatch):
+        from repositories.base_repository_impl import BaseRepositoryImpl
+        calls = []
+        original = BaseRepositoryImpl.find
+        monkeypatch.setattr(BaseRepositoryImpl, "find",
+                            lambda self, id_key: calls.append(id_key) or original(self, id_key))
+        return calls
+
+    @pytest.mark.parametrize("method", ["get_one", "get_one_json"])
+    def test_missing_product_hits_database_once(self, service_db, cache, finds, method):
+        from config.constants import CacheConfig
+        from repositories.base_repository_impl import InstanceNotFoundError
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        for _ in range(3):
+            with pytest.raises(InstanceNotFoundError):
+                getattr(service, method)(9999)
+
+        assert finds == [9999]
+        assert cache.expirations["products:id:id:9999"] == CacheConfig.NEGATIVE_TTL
+
+    def test_creating_product_clears_tombstone(self, service_db, cache):
+        from repositories.base_repository_impl import InstanceNotFoundError
+        from schemas.product_schema import ProductSchema
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        with pytest.raises(InstanceNotFoundError):
+            service.get_one(4)
+
+        created = service.save(ProductSchema(name="New", price=1.0, category_id=99))
+
+        assert created.id_key == 4
+        assert service.get_one(4).name == "New"
+
+    def test_creating_category_clears_tombstone(self, service_db, cache, finds):
+        from repositories.base_repository_impl import InstanceNotFoundError
+        from schemas.category_schema import CategorySchema
+        from services.category_service import CategoryService
+
+        service = CategoryService(service_db)
+        for _ in range(2):
+            with pytest.raises(InstanceNotFoundError):
+                service.get_one_json(2)
+        assert finds == [2]
+
+        service.save(CategorySchema(name="Books"))
+        assert json.loads(service.get_one_json(2))["name"] == "Books"
+
+    def test_tombstones_in_id_pages_are_skipped(self, service_db, cache):
+        from services.cache_service import cache_service
+        from services.product_service import ProductService
+
+        service = ProductService(service_db)
+        _, ids = service.get_all_json(limit=10)
+        cache_service.set_tombstone(f"products:id:id:{ids[0]}")
+
+        assert service.get_all_json(limit=10)[1] == ids[1:]
+
+
+class TestGetOrSet:
+    """Tests for stale-while-revalidate get_or_set."""
+
+    @pytest.fixture
+    def cache(self, make_cache):
+        return make_cache(local=False)
+
+    def make_stale(self, cache, mock_redis, key):
+        entry = cache.codec.decode(mock_redis.data[key])
+        entry["_s"] = time.time() - 1
+        mock_redis.data[key] = cache.codec.encode(entry)
+
+    def test_cold_miss_computes_once_per_worker(self, cache):
+        import concurrent.futures
+
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"data": 1}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(lambda _: cache.get_or_set("k:1", slow, ttl=60), range(20)))
+
+        assert len(calls) == 1
+        assert all(result == {"data": 1} for result in results)
+
+    def test_fresh_value_is_not_recomputed(self, cache):
+        cache.get_or_set("k:1", lambda: 1, ttl=60, soft_ttl=30)
+        assert cache.get_or_set("k:1", lambda: 2, ttl=60, soft_ttl=30) == 1
+
+    def test_stale_value_served_while_one_caller_refreshes(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60, soft_ttl=30)
+        self.make_stale(cache, mock_redis, "k:1")
+
+        assert cache.get_or_set("k:1", lambda: "new", ttl=60, soft_ttl=30, background=False) == "old"
+        assert cache.get_or_set("k:1", lambda: "newer", ttl=60, soft_ttl=30) == "new"
+        assert "lock:k:1" not in mock_redis.data
+
+    def test_background_refresh(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60, soft_ttl=30)
+        self.make_stale(cache, mock_redis, "k:1")
+
+        assert cache.get_or_set("k:1", lambda: "new", ttl=60, soft_ttl=30) == "old"
+        cache._executor.shutdown(wait=True)
+        cache._executor = None
+
+        assert cache.get_or_set("k:1", lambda: "newer", ttl=60, soft_ttl=30) == "new"
+
+    def test_no_refresh_while_another_worker_holds_lock(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60, soft_ttl=30)
+        self.make_stale(cache, mock_redis, "k:1")
+        mock_redis.set("lock:k:1", "other-worker")
+
+        calls = []
+        value = cache.get_or_set("k:1", lambda: calls.append(1), ttl=60, soft_ttl=30, background=False)
+
+        assert value == "old"
+        assert calls == []
+
+    def test_failed_refresh_keeps_stale_value(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60, soft_ttl=30)
+        self.make_stale(cache, mock_redis, "k:1")
+
+        def boom():
+            raise RuntimeError("db down")
+
+        assert cache.get_or_set("k:1", boom, ttl=60, soft_ttl=30, background=False) == "old"
+        assert "lock:k:1" not in mock_redis.data
+
+    def test_expired_lock_taken_by_another_worker_is_not_released(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60, soft_ttl=30)
+        self.make_stale(cache, mock_redis, "k:1")
+
+        def slow_refresh():
+            # Our lock expires mid-refresh and another worker takes it
+            mock_redis.delete("lock:k:1")
+            mock_redis.set("lock:k:1", "other-worker")
+            return "new"
+
+        cache.get_or_set("k:1", slow_refresh, ttl=60, soft_ttl=30, background=False)
+
+        assert mock_redis.data["lock:k:1"] == "other-worker"
+
+    def test_xfetch_refreshes_early(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60, soft_ttl=30)
+        entry = cache.codec.decode(mock_redis.data["k:1"])
+        entry["_d"] = 10.0  # Slow to compute, so refresh well ahead of expiry
+        entry["_s"] = time.time() + 1
+        mock_redis.data["k:1"] = cache.codec.encode(entry)
+
+        assert cache.get_or_set("k:1", lambda: "new", ttl=60, soft_ttl=30) == "old"  # beta=0: not yet
+        assert cache.get_or_set("k:1", lambda: "new", ttl=60, soft_ttl=30,
+                                beta=1000.0, background=False) == "old"
+        assert cache.get_or_set("k:1", lambda: "newer", ttl=60, soft_ttl=30) == "new"
+
+    def test_hard_expiry_recomputes(self, cache, mock_redis):
+        cache.get_or_set("k:1", lambda: "old", ttl=60)
+        del mock_redis.data["k:1"]
+        assert cache.get_or_set("k:1", lambda: "new", ttl=60) == "new"
+
+    def test_cold_miss_error_propagates(self, cache):
+        def boom():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_set("k:1", boom)
+        assert cache._inflight == {}
+
+
+class TestCacheMetrics:
+    """Tests for per-namespace cache counters and latency histograms."""
+
+    def test_counters_are_grouped_by_namespace(self, make_cache):
+        cache = make_cache(local=False)
+        cache.set("products:id:1", {"id": 1})
+        cache.get("products:id:1")
+        cache.get("products:id:2")
+        cache.get("categories:id:1")
+        cache.get_many(["products:id:1", "products:id:3"])
+
+        snapshot = cache.metrics.snapshot()
+        products = snapshot["namespaces"]["products:id"]
+        assert (products["hits"], products["misses"], products["sets"]) == (2, 2, 1)
+        assert products["hit_ratio"] == 0.5
+        assert snapshot["namespaces"]["categories:id"]["misses"] == 1
+        assert snapshot["totals"]["misses"] == 3
+
+    def test_l1_hits_and_evictions(self, mock_redis):
+        cache = CacheService(local=LocalCache(max_entries=2, max_bytes=10_000))
+        cache.redis_client = mock_redis
+        cache.enabled = True
+        for i in range(4):
+            cache.set(f"products:id:{i}", i)
+        cache.get("products:id:3")
+
+        counters = cache.metrics.snapshot()["namespaces"]["products:id"]
+        assert counters["evictions"] == 2
+        assert counters["hits"] == 1
+
+    def test_errors_and_decode_failures(self, make_cache, mock_redis):
+        cache = make_cache(local=False)
+        mock_redis.data["products:id:1"] = bytes((0xFF, 0))  # Unknown format version
+        assert cache.get("products:id:1") is None
+
+        class BrokenPipeline:
+            def __getattr__(self, name):
+                raise ConnectionError("redis down")
+
+        mock_redis.pipeline = lambda transaction=False: BrokenPipeline()
+        assert cache.set("products:id:2", 1) is False
+
+        counters = cache.metrics.snapshot()["namespaces"]["products:id"]
+        assert counters["errors"] == 2
+        assert counters["misses"] == 1
+
+    def test_fallback_computes_and_lock_waits(self, make_cache):
+        import concurrent.futures
+
+        cache = make_cache(local=False)
+
+        def slow():
+            time.sleep(0.05)
+            return 1
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(lambda _: cache.get_or_set("products:list:1", slow, ttl=60), range(5)))
+        assert cache.metrics.snapshot()["namespaces"]["products:list"]["lock_waits"] == 4
+
+        cache.enabled = False
+        cache.get_or_set("products:list:1", lambda: 2)
+        assert cache.metrics.snapshot()["namespaces"]["products:list"]["fallback_computes"] == 1
+
+    def test_latency_histograms(self, make_cache):
+        cache = make_cache(local=False)
+        cache.set("products:id:1", 1)
+        cache.get("products:id:1")
+        cache.get_many(["products:id:2"])
+
+        latency = cache.metrics.snapshot()["namespaces"]["products:id"]["latency"]
+        assert set(latency) == {"get", "set", "mget"}
+        assert latency["get"]["count"] == 1
+        assert latency["get"]["buckets"]["+Inf"] == 1
+        assert latency["get"]["p99_ms"] is not None
+
+    def test_reset(self, make_cache):
+        cache = make_cache(local=False)
+        cache.get("products:id:1")
+        cache.metrics.reset()
+        assert cache.metrics.snapshot()["namespaces"] == {}
+
+    def test_health_check_summary_and_endpoint(self, monkeypatch, mock_redis):
+        from controllers.health_check import cache_metrics, health_check
+        from services.cache_service import cache_service
+
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        monkeypatch.setattr(cache_service, "local", None)
+        cache_service.metrics.reset()
+        cache_service.get("products:id:1")
+
+        summary = health_check()["checks"]["cache"]
+        assert summary["misses"] == 1
+        assert summary["namespaces"] == {"products:id": 0.0}
+
+        body = cache_metrics()
+        assert body["available"] is True
+        assert body["namespaces"]["products:id"]["misses"] == 1
+        assert "pid" in body
+
+
+class AsyncRedisView:
+    """redis.asyncio-style view of mock_redis: same keyspace, awaitable calls"""
+
+    class Pipeline:
+        def __init__(self, pipe):
+            self.pipe = pipe
+
+        def __getattr__(self, name):
+            return getattr(self.pipe, name)  # Commands are queued synchronously
+
+        async def execute(self):
+            return self.pipe.execute()
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def pipeline(self, transaction=True):
+        return self.Pipeline(self.redis.pipeline(transaction))
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class TestAsyncCache:
+    """Tests for the asyncio counterparts (aget, aset, aget_many, aset_many, adelete)."""
+
+    @pytest.fixture
+    def make_async_cache(self, make_cache, mock_redis):
+        def factory(local=True):
+            cache = make_cache(local=local)
+            cache.async_redis_client = AsyncRedisView(mock_redis)
+            return cache
+        return factory
+
+    async def test_shares_keyspace_with_sync_methods(self, make_async_cache):
+        cache = make_async_cache(local=False)
+        assert await cache.aset("products:id:1", {"n": 1}, ttl=30) is True
+        assert cache.get("products:id:1") == {"n": 1}
+
+        cache.set("products:id:2", "body")
+        assert await cache.aget("products:id:2") == "body"
+        assert await cache.aget("products:id:3") is None
+        assert cache.stats()["redis"] == {"hits": 2, "misses": 1}
+
+    async def test_batch_operations_index_keys(self, make_async_cache, mock_redis):
+        cache = make_async_cache(local=False)
+        assert await cache.aset_many({"products:id:1": 1, "products:id:2": 2}, ttl=30)
+
+        assert await cache.aget_many(["products:id:1", "products:id:3", "products:id:2"]) == {
+            "products:id:1": 1,
+            "products:id:2": 2,
+        }
+        assert mock_redis.expirations["products:id:1"] == 30
+        assert cache.delete_pattern("products:id:*") == 2
+
+    async def test_l1_is_shared(self, make_async_cache, mock_redis):
+        cache = make_async_cache()
+        await cache.aset_many({"a:b:1": 1, "a:b:2": 2})
+        mock_redis.data.clear()
+
+        assert await cache.aget("a:b:1") == 1
+        assert await cache.aget_many(["a:b:1", "a:b:2"]) == {"a:b:1": 1, "a:b:2": 2}
+
+    async def test_adelete_evicts_other_workers(self, make_async_cache, mock_redis):
+        worker_a, worker_b = make_async_cache(), make_async_cache()
+        await worker_a.aset("k:1", 1)
+        assert await worker_b.aget("k:1") == 1
+
+        assert await worker_a.adelete("k:1") is True
+        deliver(mock_redis, worker_a, worker_b)
+        assert await worker_b.aget("k:1") is None
+
+    async def test_errors_are_counted(self, make_async_cache, mock_redis):
+        cache = make_async_cache(local=False)
+
+        def broken(*args, **kwargs):
+            raise ConnectionError("redis down")
+        mock_redis.get = broken
+        mock_redis.pipeline = broken
+
+        assert await cache.aget("products:id:1") is None
+        assert await cache.aset("products:id:1", 1) is False
+        assert cache.metrics.snapshot()["namespaces"]["products:id"]["errors"] == 2
+
+    async def test_unavailable_without_async_client(self, make_cache):
+        cache = make_cache(local=False)
+        cache.async_redis_client = None
+
+        assert await cache.aget("k") is None
+        assert await cache.aset("k", 1) is False
+        assert await cache.aget_many(["k"]) == {}
+        assert await cache.adelete("k") is False
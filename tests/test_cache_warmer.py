@@ -0,0 +1,200 @@
+"""Tests for the background cache warm-up (services/cache_warmer.py)."""
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from controllers.compat_controller import PRODUCT_SORT_ORDERS, get_categorias, list_productos
+from models.category import CategoryModel
+from models.order_detail import OrderDetailModel
+from models.product import ProductModel
+from services.cache_warmer import CacheWarmer
+from utils.search import product_search_index
+
+
+@pytest.fixture
+def session_factory(db_session):
+    """Sessions the warmer opens, on the seeded shared test database"""
+    product_search_index.invalidate()
+    category = CategoryModel(name="Librería")
+    db_session.add(category)
+    db_session.flush()
+    # Products point at a category id with no row: ProductSchema validation
+    # recurses through category.products otherwise
+    for i in range(30):
+        db_session.add(ProductModel(name=f"Producto {i}", price=1.0 + i, stock=3, category_id=99))
+    db_session.commit()
+
+    yield sessionmaker(bind=db_session.get_bind())
+
+    product_search_index.invalidate()
+
+
+@pytest.fixture
+def cache(monkeypatch, mock_redis):
+    from services.cache_service import cache_service
+    monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+    monkeypatch.setattr(cache_service, "enabled", True)
+    monkeypatch.setattr(cache_service, "local", None)
+    return mock_redis
+
+
+def make_warmer(session_factory, **kwargs):
+    options = dict(enabled=True, concurrency=2, catalog_pages=2, top_products=3, debounce_seconds=0.05)
+    options.update(kwargs)
+    return CacheWarmer(session_factory=session_factory, **options)
+
+
+class TestCacheWarmer:
+    """Warm-up coverage, progress and concurrency."""
+
+    def test_warms_catalog_categories_and_top_products(self, session_factory, cache):
+        status = make_warmer(session_factory).run(reason="test")
+
+        # 2 category tasks, product page, 2 pages per sort, 3 top products
+        assert status["total"] == 3 + 2 * len(PRODUCT_SORT_ORDERS) + 3
+        assert status["completed"] == status["total"]
+        assert status["failed"] == 0
+        assert status["state"] == "done"
+
+        db = session_factory()
+        for sort in PRODUCT_SORT_ORDERS:
+            assert list_productos(sort=sort, page=2, db=db).headers["X-Cache"] == "HIT"
+        assert get_categorias(db=db).headers["X-Cache"] == "HIT"
+        assert "products:ids:limit:100:skip:0" in cache.data
+        assert "categories:ids:limit:100:skip:0" in cache.data
+        db.close()
+
+    def test_top_products_are_best_sellers_then_newest(self, session_factory, cache):
+        db = session_factory()
+        db.add(OrderDetailModel(product_id=5, quantity=10, price=6.0))
+        db.add(OrderDetailModel(product_id=7, quantity=3, price=8.0))
+        db.add(OrderDetailModel(product_id=5, quantity=1, price=6.0))
+        db.commit()
+
+        assert make_warmer(session_factory)._top_product_ids(db) == [5, 7, 30]
+        db.close()
+
+    def test_scope_limits_tasks(self, session_factory, cache):
+        status = make_warmer(session_factory).run(scopes=["categories"])
+        assert status["total"] == 2
+        assert not any(key.startswith("products:") for key in cache.data)
+
+    def test_concurrency_limit(self, session_factory, cache):
+        open_sessions, peak = [0], [0]
+        lock = threading.Lock()
+
+        class TrackedSession:
+            def __init__(self):
+                self.session = session_factory()
+                with lock:
+                    open_sessions[0] += 1
+                    peak[0] = max(peak[0], open_sessions[0])
+                time.sleep(0.005)
+
+            def __getattr__(self, name):
+                return getattr(self.session, name)
+
+            def close(self):
+                with lock:
+                    open_sessions[0] -= 1
+                self.session.close()
+
+        make_warmer(TrackedSession, concurrency=2).run()
+        assert peak[0] <= 2
+
+    def test_failures_are_counted(self, session_factory, cache, monkeypatch):
+        from services.category_service import CategoryService
+
+        def boom(self, *args, **kwargs):
+            raise RuntimeError("db down")
+        monkeypatch.setattr(CategoryService, "get_all_json", boom)
+
+        status = make_warmer(session_factory).run(scopes=["categories"])
+        assert status["failed"] == 1
+        assert status["state"] == "done_with_errors"
+        assert "db down" in status["last_error"]
+
+    def test_scheduled_warmups_are_coalesced(self, session_factory, cache):
+        warmer = make_warmer(session_factory)
+        warmer.schedule("products", reason="product write")
+        warmer.schedule("categories", reason="category write")
+        assert warmer.status()["scheduled"] is True
+
+        deadline = time.monotonic() + 5
+        while warmer.status()["runs"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.1)
+
+        status = warmer.status()
+        assert status["runs"] == 1
+        assert status["scopes"] == ["categories", "products"]
+
+    def test_one_worker_warms_at_a_time(self, session_factory, cache):
+        from services.cache_warmer import WARMUP_LOCK_KEY
+        cache.set(WARMUP_LOCK_KEY, "other-worker", ex=300)
+
+        status = make_warmer(session_factory).run(reason="startup")
+
+        assert status["state"] == "skipped"
+        assert status["runs"] == 0
+        assert "products:ids:limit:100:skip:0" not in cache.data
+        assert cache.data[WARMUP_LOCK_KEY] == "other-worker"
+
+    def test_startup_warm_up_is_not_retried(self, session_factory, cache):
+        from services.cache_warmer import WARMUP_LOCK_KEY
+        cache.set(WARMUP_LOCK_KEY, "other-worker", ex=300)
+        warmer = make_warmer(session_factory)
+
+        assert warmer.start(reason="startup") is True
+        warmer._thread.join(timeout=5)
+
+        assert warmer.status()["state"] == "skipped"
+        assert warmer.status()["scheduled"] is False
+
+    def test_skipped_invalidation_warm_up_is_retried_once_the_lock_is_free(self, session_factory, cache):
+        from services.cache_service import cache_service
+        from services.cache_warmer import WARMUP_LOCK_KEY
+        from services.cache_codec import cache_codec
+        cache.set(WARMUP_LOCK_KEY, "other-worker", ex=300)
+        warmer = make_warmer(session_factory)
+
+        warmer.schedule("categories", reason="category write")
+        deadline = time.monotonic() + 5
+        while not (warmer.status()["state"] == "skipped" and warmer.status()["scheduled"]):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert warmer.status()["runs"] == 0
+
+        # The holder finishes after caching a page read before the write
+        page = "categories:ids:limit:100:skip:0"
+        cache_service.set(page, [999])
+        cache.delete(WARMUP_LOCK_KEY)
+
+        while warmer.status()["runs"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert warmer.status()["state"] == "done"
+        assert cache_codec.decode(cache.data[page]) != [999]  # Rebuilt, not served stale
+
+    def test_lock_is_released_after_a_run(self, session_factory, cache):
+        from services.cache_warmer import WARMUP_LOCK_KEY
+        warmer = make_warmer(session_factory)
+
+        assert warmer.run(scopes=["categories"])["state"] == "done"
+        assert WARMUP_LOCK_KEY not in cache.data
+        assert warmer.run(scopes=["categories"])["runs"] == 2
+
+    def test_disabled_or_without_cache(self, session_factory, cache, monkeypatch):
+        from services.cache_service import cache_service
+
+        assert make_warmer(session_factory, enabled=False).start() is False
+        assert make_warmer(session_factory, enabled=False).status()["state"] == "disabled"
+
+        monkeypatch.setattr(cache_service, "enabled", False)
+        assert make_warmer(session_factory).start() is False
+
+    def test_health_check_reports_progress(self):
+        from controllers.health_check import health_check
+
+        assert health_check()["checks"]["cache_warmup"]["state"] == "disabled"
@@ -0,0 +1,328 @@
+"""Tests for the single-transaction checkout of POST /api/boletas."""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from controllers.compat_controller import BillBody, create_bill
+from models.category import CategoryModel
+from models.client import ClientModel
+from models.order import OrderModel
+from models.product import ProductModel
+from services.checkout_service import FALLBACK_CATEGORY, CheckoutService
+from services.stock_service import InsufficientStockError, StockService
+
+
+@pytest.fixture(autouse=True)
+def no_webhook(monkeypatch):
+    """Checkouts never call the n8n confirmation webhook"""
+    monkeypatch.setattr("controllers.compat_controller.N8N_WEBHOOK_URL", None)
+
+
+@pytest.fixture
+def catalog(db_session):
+    category = CategoryModel(name="Librería")
+    db_session.add(category)
+    db_session.flush()
+    products = [
+        ProductModel(name=f"Producto {i}", price=10.0 + i, stock=100, category_id=category.id_key)
+        for i in range(20)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return products
+
+
+@pytest.fixture
+def statements(db_session):
+    """SQL statements and commits issued by the session, counted from here on"""
+    counts = {"sql": [], "commits": 0}
+
+    def on_execute(*args):
+        counts["sql"].append(args[2])
+
+    def on_commit(session):
+        counts["commits"] += 1
+    event.listen(db_session.get_bind(), "before_cursor_execute", on_execute)
+    event.listen(db_session, "after_commit", on_commit)
+
+    yield counts
+
+    # The engine is shared by the whole test run
+    event.remove(db_session.get_bind(), "before_cursor_execute", on_execute)
+
+
+def basket(count, start=0):
+    return [
+        {"nombre": f"producto {i}", "cantidad": 2, "precio": 10.0 + i}
+        for i in range(start, start + count)
+    ]
+
+
+class TestCheckout:
+    """Client, bill, order and details placed in one transaction."""
+
+    def test_receipt_and_rows(self, db_session, catalog, statements):
+        response = create_bill(
+            BillBody(usuarioEmail=" Ana@Example.com ", usuarioNombre="Ana", productos=basket(3), total=66.0),
+            db=db_session,
+        )
+
+        assert response["mensaje"] == "Boleta registrada"
+        receipt = response["boleta"]
+        assert receipt["usuarioEmail"] == "ana@example.com"
+        assert receipt["usuarioNombre"] == "Ana"
+        assert receipt["productos"] == [
+            {"nombre": f"Producto {i}", "cantidad": 2, "precio": 10.0 + i} for i in range(3)
+        ]
+        assert receipt["total"] == 66.0
+        assert receipt["billNumber"].startswith("B-")
+        assert statements["commits"] == 1
+
+        order = db_session.execute(select(OrderModel)).scalars().one()
+        assert str(order.bill.id_key) == receipt["id"]
+        assert order.client.email == "ana@example.com"
+        assert [detail.product_id for detail in order.order_details] == [p.id_key for p in catalog[:3]]
+
+    def test_round_trips_do_not_grow_with_the_basket(self, db_session, catalog, statements):
+        create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=basket(1), total=10.0), db=db_session)
+        small = len(statements["sql"])
+
+        statements["sql"].clear()
+        create_bill(BillBody(usuarioEmail="b@example.com", usuarioNombre="B", productos=basket(20), total=500.0), db=db_session)
+
+        assert len(statements["sql"]) == small
+        assert statements["commits"] == 2
+
+    def test_unknown_products_are_created_in_one_batch(self, db_session, catalog, statements, monkeypatch):
+        invalidated = []
+        monkeypatch.setattr("controllers.compat_controller.invalidate_product_caches",
+                            lambda: invalidated.append("products"))
+        monkeypatch.setattr("controllers.compat_controller.invalidate_category_caches",
+                            lambda: invalidated.append("categories"))
+        items = basket(1) + [
+            {"nombre": "Goma", "cantidad": 1, "precio": 3.0},
+            {"nombre": "Tijera", "cantidad": 0, "precio": -1},
+            {"nombre": "goma", "cantidad": 1, "precio": 3.0},
+        ]
+
+        receipt = create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=16.0),
+                              db=db_session)["boleta"]
+
+        assert [line["nombre"] for line in receipt["productos"]] == ["Producto 0", "Goma", "Tijera", "Goma"]
+        assert receipt["productos"][2]["cantidad"] == 1
+        inserts = [sql for sql in statements["sql"] if sql.startswith("INSERT INTO products")]
+        assert len(inserts) == 1
+        assert statements["commits"] == 1
+        assert invalidated == ["products", "categories"]
+
+        created = db_session.execute(
+            select(ProductModel).where(ProductModel.name.in_(["Goma", "Tijera"]))
+        ).scalars().all()
+        assert sorted((p.name, p.price, p.stock) for p in created) == [("Goma", 3.0, 0), ("Tijera", 0, 0)]
+        assert {p.category.name for p in created} == {FALLBACK_CATEGORY}
+
+    def test_existing_client_is_reused(self, db_session, catalog):
+        db_session.add(ClientModel(name="Ana", lastname="Pérez", email="ana@example.com", telephone="1"))
+        db_session.commit()
+
+        receipt = create_bill(BillBody(usuarioEmail="ANA@example.com", usuarioNombre="Otra",
+                                       productos=basket(1), total=10.0), db=db_session)["boleta"]
+
+        assert receipt["usuarioNombre"] == "Ana"
+        assert db_session.execute(select(ClientModel)).scalars().all()[0].lastname == "Pérez"
+        assert len(db_session.execute(select(ClientModel)).scalars().all()) == 1
+
+    def test_failure_rolls_back_everything(self, db_session, catalog):
+        def broken_render(order):
+            raise RuntimeError("render failed")
+
+        with pytest.raises(RuntimeError):
+            CheckoutService(db_session).place_order(
+                "new@example.com", "Nuevo", basket(2) + [{"nombre": "Goma"}], 20.0, broken_render
+            )
+
+        assert db_session.execute(select(OrderModel)).scalars().all() == []
+        assert db_session.execute(
+            select(ClientModel).where(ClientModel.email == "new@example.com")
+        ).scalars().first() is None
+        assert db_session.execute(
+            select(ProductModel).where(ProductModel.name == "Goma")
+        ).scalars().first() is None
+
+
+class TestProductResolution:
+    """Basket items matched to products in one query, by id or name."""
+
+    def test_items_match_by_id_before_name(self, db_session, catalog, statements):
+        items = [
+            {"id": str(catalog[5].id_key), "nombre": "Nombre viejo", "cantidad": 1, "precio": 15.0},
+            {"_id": str(catalog[6].id_key), "nombre": "Producto 7", "cantidad": 1, "precio": 16.0},
+            {"id": "999", "nombre": "PRODUCTO 8", "cantidad": 1, "precio": 18.0},  # Deleted product
+            {"productoId": "abc", "nombre": "Producto 9", "cantidad": 1, "precio": 19.0},
+        ]
+        statements["sql"].clear()
+
+        receipt = create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=68.0),
+                              db=db_session)["boleta"]
+
+        assert [line["nombre"] for line in receipt["productos"]] == [
+            "Producto 5", "Producto 6", "Producto 8", "Producto 9"
+        ]
+        product_selects = [sql for sql in statements["sql"] if sql.startswith("SELECT") and "FROM products" in sql]
+        assert len(product_selects) == 2  # Resolution, then the stock lock
+        assert not any(sql.startswith("INSERT INTO products") for sql in statements["sql"])
+
+    def test_name_lookup_uses_the_lower_name_index(self, db_session, catalog):
+        plan = db_session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id_key FROM products WHERE lower(name) IN ('producto 1', 'producto 2')"
+        ).all()
+
+        assert any("ix_products_lower_name" in row[-1] for row in plan)
+
+
+class TestStockReservation:
+    """Stock locked, validated and deducted for all lines at once."""
+
+    def test_checkout_deducts_stock_per_product(self, db_session, catalog):
+        items = basket(2) + [{"nombre": "Producto 0", "cantidad": 3, "precio": 10.0}]
+
+        create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=62.0),
+                    db=db_session)
+
+        db_session.expire_all()
+        assert [p.stock for p in catalog[:3]] == [95, 98, 100]
+
+    def test_shortage_rejects_the_whole_order(self, db_session, catalog):
+        catalog[1].stock = 1
+        db_session.commit()
+        items = basket(3)  # 2 units each
+
+        with pytest.raises(HTTPException) as exc:
+            create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=66.0),
+                        db=db_session)
+
+        assert exc.value.status_code == 400
+        assert f"producto {catalog[1].id_key} (disponible 1)" in exc.value.detail
+        db_session.expire_all()
+        assert [p.stock for p in catalog[:3]] == [100, 1, 100]
+        assert db_session.execute(select(OrderModel)).scalars().all() == []
+
+    def test_reserve_is_one_lock_and_one_update(self, db_session, catalog, statements):
+        ids = [catalog[3].id_key, catalog[0].id_key, catalog[7].id_key]
+        statements["sql"].clear()
+
+        left = StockService(db_session).reserve({ids[0]: 4, ids[1]: 1, ids[2]: 0})
+
+        assert left == {ids[1]: 99, ids[0]: 96}
+        assert len(statements["sql"]) == 2
+        assert statements["sql"][0].rstrip().endswith("ORDER BY products.id_key")
+        assert statements["sql"][1].startswith("UPDATE products SET stock=")
+        assert catalog[3].stock == 96  # Loaded products follow the UPDATE
+
+    def test_shortage_reports_every_product(self, db_session, catalog):
+        ids = [catalog[0].id_key, catalog[1].id_key]
+
+        with pytest.raises(InsufficientStockError) as exc:
+            StockService(db_session).reserve({ids[0]: 101, ids[1]: 500})
+
+        assert exc.value.shortages == {ids[0]: (101, 100), ids[1]: (500, 100)}
+        assert isinstance(exc.value, ValueError)
+
+    def test_created_placeholders_are_not_reserved(self, db_session, catalog):
+        items = [{"nombre": "Goma", "cantidad": 2, "precio": 3.0}]
+
+        create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=6.0),
+                    db=db_session)
+
+        goma = db_session.execute(select(ProductModel).where(ProductModel.name == "Goma")).scalars().one()
+        assert goma.stock == 0
+
+    def test_placeholders_from_earlier_orders_are_not_reserved(self, db_session, catalog, statements):
+        items = [{"nombre": "Goma", "cantidad": 2, "precio": 3.0}] + basket(1)
+
+        for email in ("a@example.com", "b@example.com"):
+            statements["sql"].clear()
+            create_bill(BillBody(usuarioEmail=email, usuarioNombre="A", productos=items, total=26.0),
+                        db=db_session)
+
+        assert not any(sql.startswith("INSERT INTO products") for sql in statements["sql"])
+        assert len(db_session.execute(select(OrderModel)).scalars().all()) == 2
+        db_session.expire_all()
+        goma = db_session.execute(select(ProductModel).where(ProductModel.name == "Goma")).scalars().one()
+        assert goma.stock == 0
+        assert catalog[0].stock == 96  # Catalog products are still reserved
+
+    def test_catalog_products_in_the_fallback_category_are_reserved(self, db_session, catalog):
+        # Deleting a category moves its products to the fallback category
+        fallback = CategoryModel(name=FALLBACK_CATEGORY)
+        db_session.add(fallback)
+        db_session.flush()
+        catalog[0].category_id = fallback.id_key
+        catalog[0].stock = 1
+        db_session.commit()
+
+        with pytest.raises(HTTPException) as exc:
+            create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=basket(1), total=20.0),
+                        db=db_session)
+
+        assert f"producto {catalog[0].id_key} (disponible 1)" in exc.value.detail
+
+    def test_created_products_are_flagged_as_placeholders(self, db_session, catalog):
+        items = [{"nombre": "Goma", "cantidad": 2, "precio": 3.0}] + basket(1)
+
+        create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=26.0),
+                    db=db_session)
+
+        flagged = db_session.execute(select(ProductModel.name).where(ProductModel.placeholder)).scalars().all()
+        assert flagged == ["Goma"]
+
+
+class TestCheckoutCacheInvalidation:
+    """Cached stock is dropped after every reservation."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch, mock_redis):
+        from services.cache_service import cache_service
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        monkeypatch.setattr(cache_service, "local", None)
+        return cache_service
+
+    def test_reserved_products_and_lists_are_invalidated(self, db_session, catalog, cache, mock_redis):
+        touched, untouched = catalog[0].id_key, catalog[5].id_key
+        keys = {
+            "touched": cache.build_key("products", "id", id=touched),
+            "untouched": cache.build_key("products", "id", id=untouched),
+            "page": cache.build_key("products", "ids", limit=10, skip=0),
+            "catalog": cache.build_key("products", "list", "compat", "abc"),
+            "count": cache.build_key("products", "list", "count", "abc"),
+            "compat item": cache.build_key("products", "list", "compat", "item", touched),
+        }
+        for key in keys.values():
+            cache.set(key, "cached", ttl=60)
+
+        create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=basket(1), total=20.0),
+                    db=db_session)
+
+        assert [name for name, key in keys.items() if key in mock_redis.data] == ["untouched", "page"]
+
+    def test_stock_changes_do_not_schedule_a_warm_up(self, db_session, catalog, cache, monkeypatch):
+        scheduled = []
+        monkeypatch.setattr("controllers.compat_controller.cache_warmer.schedule",
+                            lambda scope, reason: scheduled.append(scope))
+
+        create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=basket(1), total=20.0),
+                    db=db_session)
+
+        assert scheduled == []
+
+    def test_rejected_order_keeps_the_cache(self, db_session, catalog, cache, mock_redis):
+        key = cache.build_key("products", "id", id=catalog[0].id_key)
+        cache.set(key, "cached", ttl=60)
+        items = [{"nombre": "Producto 0", "cantidad": 500, "precio": 10.0}]
+
+        with pytest.raises(HTTPException):
+            create_bill(BillBody(usuarioEmail="a@example.com", usuarioNombre="A", productos=items, total=10.0),
+                        db=db_session)
+
+        assert key in mock_redis.data
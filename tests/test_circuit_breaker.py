@@ -0,0 +1,234 @@
+"""Tests for the Redis circuit breaker (utils/circuit_breaker.py, config/redis_config.py)."""
+import pytest
+
+from config.redis_config import GuardedRedis
+from services.cache_service import CacheService
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock():
+    return [1000.0]
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        "redis",
+        failure_rate=0.5,
+        slow_call_seconds=0.1,
+        slow_call_rate=0.5,
+        min_calls=4,
+        window_seconds=10,
+        open_seconds=5,
+        half_open_calls=2,
+        clock=lambda: clock[0],
+    )
+
+
+class TestCircuitBreaker:
+    """State transitions and thresholds."""
+
+    def test_opens_on_error_rate(self, breaker):
+        for failed in (False, True, False):
+            assert breaker.allow()
+            breaker.record(0.001, failed=failed)
+        assert breaker.state == "closed"  # Below min_calls
+
+        breaker.record(0.001, failed=True)
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.snapshot()["short_circuited"] == 1
+
+    def test_opens_on_slow_calls(self, breaker):
+        for seconds in (0.2, 0.01, 0.3, 0.01):
+            breaker.record(seconds)
+        assert breaker.state == "open"
+
+    def test_old_calls_leave_the_window(self, breaker, clock):
+        breaker.record(0.001, failed=True)
+        breaker.record(0.001, failed=True)
+        clock[0] += 11
+        breaker.record(0.001)
+        breaker.record(0.001)
+        breaker.record(0.001, failed=True)
+        assert breaker.state == "closed"
+        assert breaker.snapshot()["calls"] == 3
+
+    def test_half_open_trials_close_the_circuit(self, breaker, clock):
+        for _ in range(4):
+            breaker.record(0.001, failed=True)
+        clock[0] += 5
+
+        assert breaker.state == "half_open"
+        assert breaker.allow() and breaker.allow()
+        assert not breaker.allow()  # Only half_open_calls trials
+        breaker.record(0.001)
+        breaker.record(0.001)
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self, breaker, clock):
+        for _ in range(4):
+            breaker.record(0.001, failed=True)
+        clock[0] += 5
+
+        assert breaker.allow()
+        breaker.record(0.5)  # Slow counts as a failed trial
+        snapshot = breaker.snapshot()
+        assert snapshot["state"] == "open"
+        assert snapshot["times_opened"] == 2
+        assert snapshot["retry_in_seconds"] == 5
+
+
+class TestGuardedRedis:
+    """Redis clients wrapped with the breaker."""
+
+    def test_commands_are_short_circuited_when_open(self, breaker, mock_redis):
+        client = GuardedRedis(mock_redis, breaker)
+        client.set("k", "v")
+        assert client.get("k") == "v"
+        assert breaker.snapshot()["calls"] == 2
+
+        def broken(key):
+            raise ConnectionError("redis down")
+        mock_redis.get = broken
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                client.get("k")
+        assert breaker.state == "open"
+
+        calls = []
+        mock_redis.get = lambda key: calls.append(key)
+        with pytest.raises(CircuitOpenError):
+            client.get("k")
+        assert calls == []
+
+    def test_pipeline_is_one_call(self, breaker, mock_redis):
+        pipe = GuardedRedis(mock_redis, breaker).pipeline(transaction=False)
+        pipe.set("a", 1)
+        pipe.set("b", 2)
+        assert pipe.execute() == [True, True]
+        assert breaker.snapshot()["calls"] == 1
+
+    async def test_async_calls_are_timed_when_awaited(self, breaker, mock_async_redis):
+        client = GuardedRedis(mock_async_redis, breaker)
+        assert await client.get("missing") is None
+        assert breaker.snapshot()["calls"] == 1
+
+    def test_errors_of_the_caller_do_not_count(self, breaker, mock_redis):
+        def wrong_type(key):
+            raise ValueError("WRONGTYPE")
+        mock_redis.get = wrong_type
+        client = GuardedRedis(mock_redis, breaker)
+        for _ in range(4):
+            with pytest.raises(ValueError):
+                client.get("k")
+        assert breaker.state == "closed"
+
+
+class TestCacheServiceBreaker:
+    """CacheService skips Redis while the circuit is open."""
+
+    @pytest.fixture
+    def cache(self, breaker, mock_redis):
+        cache = CacheService(local=None)
+        cache.breaker = breaker
+        cache.redis_client = GuardedRedis(mock_redis, breaker)
+        cache.enabled = True
+        return cache
+
+    def test_open_circuit_makes_cache_unavailable(self, cache, breaker, mock_redis):
+        cache.set("products:id:1", 1)
+        for _ in range(4):
+            breaker.record(0.001, failed=True)
+
+        assert cache.is_available() is False
+        assert cache.get("products:id:1") is None
+        assert cache.get_or_set("products:id:2", lambda: 2) == 2
+        assert "products:id:2" not in mock_redis.data
+        assert cache.metrics_snapshot()["circuit_breaker"] == "open"
+
+    def test_slow_redis_opens_the_circuit(self, cache, breaker, mock_redis, monkeypatch):
+        import time
+        get = mock_redis.get
+
+        def slow_get(key):
+            time.sleep(0.12)
+            return get(key)
+        mock_redis.get = slow_get
+
+        for i in range(4):
+            cache.get(f"products:id:{i}")
+        assert breaker.state == "open"
+        assert cache.get("products:id:1") is None
+
+
+class TestHealthCheckBreaker:
+    """Circuit state in /health_check, without a ping per call."""
+
+    def test_reports_breaker_and_skips_ping_after_recent_success(self, monkeypatch):
+        from config.redis_config import redis_breaker, redis_config
+        from controllers.health_check import health_check
+
+        pings = []
+
+        class Client:
+            def ping(self):
+                pings.append(1)
+                return True
+
+        monkeypatch.setattr(redis_config, "_client", Client())
+        with pytest.MonkeyPatch.context() as patch_db:
+            patch_db.setattr("controllers.health_check.check_connection", lambda: True)
+            first = health_check()["checks"]["redis"]
+            second = health_check()["checks"]["redis"]
+
+        assert first["status"] == second["status"] == "up"
+        assert first["circuit_breaker"]["state"] == "closed"
+        assert len(pings) == 1  # The first ping's success answers the second check
+
+        for _ in range(redis_breaker.min_calls):
+            redis_breaker.record(0.001, failed=True)
+        redis = health_check()["checks"]["redis"]
+        assert redis["status"] == "down"
+        assert redis["health"] == "degraded"
+        assert redis["circuit_breaker"]["state"] == "open"
+        assert len(pings) == 1
+
+
+class TestStartupWithoutRedis:
+    """Clients survive a failed startup ping, so the cache recovers."""
+
+    def test_clients_are_kept_and_connect_once_redis_is_up(self, monkeypatch):
+        import redis
+        from config.redis_config import RedisConfig
+
+        def refused(self, **kwargs):
+            raise redis.ConnectionError("Connection refused")
+
+        monkeypatch.setattr(redis.Redis, "ping", refused)
+        config = object.__new__(RedisConfig)  # Fresh instance, not the singleton
+        config._initialize_client()
+
+        assert config.get_client() is not None
+        assert config.get_binary_client() is not None
+        assert config.get_async_binary_client() is not None
+        assert config.is_available() is False
+
+        monkeypatch.setattr(redis.Redis, "ping", lambda self, **kwargs: True)
+        assert config.is_available() is True
+
+    def test_async_pools_wait_for_a_free_connection(self, monkeypatch):
+        import redis
+        import redis.asyncio as aioredis
+        from config.redis_config import RedisConfig
+
+        monkeypatch.setenv("REDIS_POOL_TIMEOUT", "0.5")
+        monkeypatch.setattr(redis.Redis, "ping", lambda self, **kwargs: True)
+        config = object.__new__(RedisConfig)
+        config._initialize_client()
+
+        for pool in (config._async_pool, config._async_binary_pool):
+            assert isinstance(pool, aioredis.BlockingConnectionPool)
+            assert pool.timeout == 0.5
+        assert config.pool_stats()["async"]["created"] == 0
@@ -0,0 +1,167 @@
+"""Tests for the Redis response cache of the compat catalog endpoints."""
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from controllers.compat_controller import (
+    CategoryBody,
+    CategoryRenameBody,
+    ProductBody,
+    admin_create_product,
+    admin_delete_product,
+    admin_update_product,
+    create_categoria,
+    get_categorias,
+    get_producto,
+    list_productos,
+    rename_categoria,
+)
+from models.category import CategoryModel
+from models.product import ProductModel
+from utils.search import product_search_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_search_index():
+    """The in-process index never carries products over from another test"""
+    product_search_index.invalidate()
+    yield
+    product_search_index.invalidate()
+
+
+@pytest.fixture
+def cache(monkeypatch, mock_redis):
+    from services.cache_service import cache_service
+    monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+    monkeypatch.setattr(cache_service, "enabled", True)
+    return mock_redis
+
+
+@pytest.fixture
+def product(db_session):
+    category = CategoryModel(name="Librería")
+    db_session.add(category)
+    db_session.flush()
+    product = ProductModel(name="Lápiz HB", price=10.0, stock=5, category_id=category.id_key)
+    db_session.add(product)
+    db_session.commit()
+    return product
+
+
+def listing(db_session, **params):
+    defaults = dict(q=None, categoria=None, precioMin=None, precioMax=None, conStock=False,
+                    sort=None, page=1, limit=12, cursor=None, conteo=None)
+    defaults.update(params)
+    return list_productos(db=db_session, **defaults)
+
+
+def body(response):
+    return json.loads(response.body)
+
+
+class TestProductListCache:
+    """Tests for GET /api/productos response caching."""
+
+    def test_second_request_is_served_from_cache(self, db_session, product, cache):
+        first = listing(db_session)
+        second = listing(db_session)
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.body == first.body
+        assert body(second)["productos"][0]["nombre"] == "Lápiz HB"
+
+    def test_equivalent_queries_share_entry(self, db_session, product, cache):
+        listing(db_session, q="Lápiz", precioMin=5, sort="desconocido")
+        response = listing(db_session, q="  lapiz ", precioMin=5.0, sort="reciente")
+        assert response.headers["X-Cache"] == "HIT"
+
+    def test_different_pages_are_cached_separately(self, db_session, product, cache):
+        listing(db_session, page=1)
+        assert listing(db_session, page=2).headers["X-Cache"] == "MISS"
+
+    def test_errors_are_not_cached(self, db_session, product, cache):
+        with pytest.raises(HTTPException):
+            listing(db_session, cursor="garbage!!")
+        assert cache.keys("products:list:compat:*") == []
+
+    def test_product_writes_invalidate(self, db_session, product, cache):
+        listing(db_session)
+
+        admin_update_product(
+            str(product.id_key),
+            ProductBody(nombre="Lápiz 2B", categoria="Librería", precio=12.0, stock=5),
+            db=db_session,
+        )
+        response = listing(db_session)
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert body(response)["productos"][0]["nombre"] == "Lápiz 2B"
+
+    def test_works_without_redis(self, db_session, product):
+        response = listing(db_session)
+        assert body(response)["paginacion"]["total"] == 1
+
+
+class TestProductItemCache:
+    """Tests for GET /api/productos/{id} response caching."""
+
+    def test_item_cached_and_invalidated_on_delete(self, db_session, product, cache):
+        product_id = str(product.id_key)
+        assert get_producto(product_id, db=db_session).headers["X-Cache"] == "MISS"
+        assert get_producto(product_id, db=db_session).headers["X-Cache"] == "HIT"
+
+        admin_delete_product(product_id, db=db_session)
+
+        with pytest.raises(HTTPException) as exc:
+            get_producto(product_id, db=db_session)
+        assert exc.value.status_code == 404
+
+    def test_missing_id_is_tombstoned_until_created(self, db_session, product, cache):
+        missing_id = str(product.id_key + 1)
+        statements = []
+        event.listen(db_session.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc:
+                get_producto(missing_id, db=db_session)
+            assert exc.value.status_code == 404
+        assert len(statements) == 1
+
+        admin_create_product(
+            ProductBody(nombre="Goma", categoria="Librería", precio=3.0, stock=1),
+            db=db_session,
+        )
+        assert body(get_producto(missing_id, db=db_session))["nombre"] == "Goma"
+
+    def test_category_rename_refreshes_item(self, db_session, product, cache):
+        get_producto(str(product.id_key), db=db_session)
+
+        rename_categoria("Librería", CategoryRenameBody(nuevo="Escolar"), db=db_session)
+
+        assert body(get_producto(str(product.id_key), db=db_session))["categoria"] == "Escolar"
+
+
+class TestCategoryListCache:
+    """Tests for GET /api/categorias response caching."""
+
+    def test_category_list_cached_and_invalidated(self, db_session, product, cache):
+        assert body(get_categorias(db=db_session)) == ["Librería"]
+        assert get_categorias(db=db_session).headers["X-Cache"] == "HIT"
+
+        create_categoria(CategoryBody(nombre="Arte"), db=db_session)
+
+        assert body(get_categorias(db=db_session)) == ["Arte", "Librería"]
+
+    def test_product_with_new_category_invalidates(self, db_session, product, cache):
+        get_categorias(db=db_session)
+
+        admin_create_product(
+            ProductBody(nombre="Témpera", categoria="Arte", precio=8.0, stock=2),
+            db=db_session,
+        )
+
+        assert body(get_categorias(db=db_session)) == ["Arte", "Librería"]
@@ -435,6 +435,119 @@ class TestConcurrentStockOperations:
         print("✅ Delete concurrency test PASSED - Stock restored correctly!")
 
 
+@pytest.mark.integration
+class TestConcurrentCheckoutReservations:
+    """Benchmark batched stock reservation of multi-line checkouts"""
+
+    def test_overlapping_checkouts_neither_oversell_nor_deadlock(self):
+        """
+        100 concurrent 3-line checkouts over 5 products with 30 units each
+
+        Scenario:
+        - Every order takes 1 unit of 3 neighbouring products; odd orders
+          list them in reverse, so locking rows in basket order would deadlock
+        - Each product is requested 60 times: about half the orders must be
+          rejected, atomically (no partial stock deduction)
+        - Stock reservation locks rows in id order in one statement, so no
+          request may fail with anything other than insufficient stock
+        """
+        import time
+        import uuid
+        from config.database import SessionLocal
+        from services.checkout_service import CheckoutService
+        from services.stock_service import InsufficientStockError
+
+        suffix = uuid.uuid4().hex[:8]
+        setup_db = SessionLocal()
+        category = CategoryModel(name=f"Benchmark {suffix}")
+        setup_db.add(category)
+        setup_db.flush()
+        products = [
+            ProductModel(name=f"Bench {suffix} {i}", price=10.0, stock=30, category_id=category.id_key)
+            for i in range(5)
+        ]
+        setup_db.add_all(products)
+        setup_db.commit()
+        product_ids = [product.id_key for product in products]
+
+        def checkout(request_num: int):
+            """Place one 3-line order, timing it"""
+            lines = [product_ids[(request_num + offset) % 5] for offset in range(3)]
+            if request_num % 2:
+                lines.reverse()
+            items = [{"id": str(product_id), "nombre": "", "cantidad": 1, "precio": 10.0} for product_id in lines]
+
+            thread_db = SessionLocal()
+            start = time.perf_counter()
+            try:
+                CheckoutService(thread_db).place_order(
+                    f"bench{request_num}-{suffix}@example.com", "Bench", items, 30.0, render=lambda order: None
+                )
+                return {"status": "success", "lines": lines, "seconds": time.perf_counter() - start}
+            except InsufficientStockError:
+                return {"status": "insufficient_stock", "seconds": time.perf_counter() - start}
+            except Exception as e:
+                return {"status": "error", "error": str(e)}
+            finally:
+                thread_db.close()
+
+        print("\n🧪 Benchmarking 100 concurrent 3-line checkouts...")
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(checkout, range(100)))
+        elapsed = time.perf_counter() - started
+
+        try:
+            successes = [r for r in results if r["status"] == "success"]
+            rejected = [r for r in results if r["status"] == "insufficient_stock"]
+            errors = [r for r in results if r["status"] == "error"]
+            latencies = sorted(r["seconds"] for r in successes + rejected)
+
+            print(f"\n📊 Results:")
+            print(f"  ✅ Orders placed: {len(successes)}")
+            print(f"  ❌ Insufficient stock: {len(rejected)}")
+            print(f"  🔥 Errors: {len(errors)}")
+            print(f"  ⏱️  {100 / elapsed:.0f} checkouts/s, "
+                  f"p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+
+            assert errors == [], f"Expected no errors (deadlocks), got {errors}"
+            assert len(successes) + len(rejected) == 100
+
+            sold = {product_id: 0 for product_id in product_ids}
+            for result in successes:
+                for product_id in result["lines"]:
+                    sold[product_id] += 1
+
+            setup_db.expire_all()
+            for product in products:
+                assert product.stock >= 0
+                assert product.stock == 30 - sold[product.id_key], \
+                    f"Product {product.id_key}: stock {product.stock}, sold {sold[product.id_key]}"
+
+            details = setup_db.query(OrderDetailModel).filter(
+                OrderDetailModel.product_id.in_(product_ids)
+            ).count()
+            assert details == 3 * len(successes)
+            assert len(successes) <= 50  # 150 units in stock, 3 per order
+
+            print("✅ Checkout reservation benchmark PASSED - No overselling or deadlocks!")
+        finally:
+            order_ids = [
+                order_id for (order_id,) in setup_db.query(OrderDetailModel.order_id)
+                .filter(OrderDetailModel.product_id.in_(product_ids)).distinct()
+            ]
+            setup_db.query(OrderDetailModel).filter(OrderDetailModel.order_id.in_(order_ids)).delete(synchronize_session=False)
+            bill_ids = [bill_id for (bill_id,) in setup_db.query(OrderModel.bill_id).filter(OrderModel.id_key.in_(order_ids))]
+            setup_db.query(OrderModel).filter(OrderModel.id_key.in_(order_ids)).delete(synchronize_session=False)
+            setup_db.query(BillModel).filter(BillModel.id_key.in_(bill_ids)).delete(synchronize_session=False)
+            setup_db.query(ClientModel).filter(ClientModel.email.like(f"bench%-{suffix}@example.com")).delete(synchronize_session=False)
+            setup_db.query(ProductModel).filter(ProductModel.id_key.in_(product_ids)).delete(synchronize_session=False)
+            setup_db.query(CategoryModel).filter(CategoryModel.id_key == category.id_key).delete(synchronize_session=False)
+            setup_db.commit()
+            setup_db.close()
+
+
 @pytest.mark.integration
 class TestConcurrentCacheOperations:
     """Test concurrent cache operations with distributed locks"""
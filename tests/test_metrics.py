@@ -0,0 +1,106 @@
+"""Tests for the Prometheus /metrics endpoint (config/metrics_config.py)."""
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from config.constants import MetricsConfig
+from controllers.metrics_controller import router as metrics_router
+from middleware.request_id_middleware import RequestIDMiddleware
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample(body, name, **labels):
+    """Value of the sample with this name and (at least) these labels"""
+    for family in text_string_to_metric_families(body):
+        for s in family.samples:
+            if s.name == name and all(s.labels.get(k) == v for k, v in labels.items()):
+                return s.value
+    return None
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/metrics-test/items/{item_id}")
+    def get_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="missing")
+        return {"id": item_id}
+
+    app.include_router(metrics_router)
+    app.add_middleware(RequestIDMiddleware)
+    return TestClient(app)
+
+
+class TestMetricsEndpoint:
+    """Per-route request metrics and pool gauges."""
+
+    def test_routes_are_labelled_by_template(self, client):
+        before = sample(client.get("/metrics").text, "http_requests_total",
+                        route="/metrics-test/items/{item_id}", status="200") or 0
+
+        for item_id in (1, 2, 3):
+            assert client.get(f"/metrics-test/items/{item_id}").status_code == 200
+        client.get("/metrics-test/items/0")
+
+        body = client.get("/metrics").text
+        assert sample(body, "http_requests_total", method="GET",
+                      route="/metrics-test/items/{item_id}", status="200") == before + 3
+        assert sample(body, "http_requests_total", route="/metrics-test/items/{item_id}", status="404") >= 1
+        assert sample(body, "http_request_duration_seconds_count", method="GET",
+                      route="/metrics-test/items/{item_id}") >= 4
+        assert "/metrics-test/items/1" not in body
+
+    def test_unmatched_paths_share_one_label(self, client):
+        client.get("/metrics-test/nope/123")
+        client.get("/metrics-test/nope/456")
+
+        body = client.get("/metrics").text
+        assert sample(body, "http_requests_total", route="unmatched", status="404") >= 2
+        assert "/nope/" not in body
+
+    def test_in_flight_gauge_returns_to_zero(self, client):
+        client.get("/metrics-test/items/1")
+        # The scrape itself is the only request in flight
+        assert sample(client.get("/metrics").text, "http_requests_in_flight", method="GET") == 1.0
+
+    def test_pool_gauges(self, client, monkeypatch):
+        from config.redis_config import redis_config
+
+        monkeypatch.setattr(redis_config, "pool_stats", lambda: {
+            "binary": {"max": 50, "created": 3, "in_use": 1, "idle": 2},
+        })
+        body = client.get("/metrics").text
+        assert sample(body, "db_pool_connections", state="size") is not None
+        assert sample(body, "db_pool_connections", state="checked_out") is not None
+        assert sample(body, "redis_pool_connections", pool="binary", state="in_use") == 1.0
+        assert sample(body, "redis_pool_connections", pool="binary", state="max") == 50.0
+
+    def test_metrics_are_aggregated_across_workers(self, tmp_path, monkeypatch):
+        """Two worker processes write samples; one scrape reports both"""
+        from config.metrics_config import prepare_multiprocess_dir, render_metrics
+
+        metrics_dir = prepare_multiprocess_dir(str(tmp_path / "prometheus"))
+        worker = (
+            "from config.metrics_config import observe_request\n"
+            "observe_request('GET', '/products/{id_key}', 200, 0.02)\n"
+        )
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], cwd=PROJECT_ROOT, env=env, check=True)
+
+        monkeypatch.setattr(MetricsConfig, "MULTIPROC_DIR", metrics_dir)
+        body, content_type = render_metrics()
+        body = body.decode()
+
+        assert content_type.startswith("text/plain")
+        assert sample(body, "http_requests_total", route="/products/{id_key}", status="200") == 2.0
+        assert sample(body, "http_request_duration_seconds_bucket",
+                      route="/products/{id_key}", le="0.025") == 2.0
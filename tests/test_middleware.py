@@ -403,3 +403,365 @@ class TestRateLimiterIntegration:
         # 6th request should be blocked
         response = client.get("/endpoint1")
         assert response.status_code == 429
+
+
+class TestPureASGIMiddleware:
+    """Tests for the pure-ASGI RequestIDMiddleware and RateLimiterMiddleware."""
+
+    @pytest.fixture
+    def app(self, mock_async_redis):
+        from fastapi.responses import StreamingResponse
+        from middleware.request_id_middleware import RequestIDMiddleware, get_request_id
+
+        app = FastAPI()
+
+        @app.get("/test")
+        async def test_endpoint(request: Request):
+            return {"request_id": get_request_id(request)}
+
+        @app.get("/stream")
+        async def stream():
+            async def chunks():
+                for i in range(3):
+                    yield f"chunk-{i};"
+            return StreamingResponse(chunks(), media_type="text/plain")
+
+        with patch("middleware.rate_limiter.get_redis_async_client", return_value=mock_async_redis):
+            app.add_middleware(RequestIDMiddleware)
+            app.add_middleware(RateLimiterMiddleware, calls=3, period=60, algorithm="fixed_window")
+            yield app
+
+    def test_request_id_is_echoed_or_generated(self, app):
+        client = TestClient(app)
+
+        response = client.get("/test", headers={"X-Request-ID": "abc-123"})
+        assert response.headers["X-Request-ID"] == "abc-123"
+        assert response.json() == {"request_id": "abc-123"}
+        assert response.headers["X-Response-Time"].endswith("ms")
+
+        generated = client.get("/test").headers["X-Request-ID"]
+        assert len(generated) == 36
+
+    def test_rate_limit_headers_and_429(self, app):
+        client = TestClient(app)
+
+        response = client.get("/test")
+        assert response.headers["X-RateLimit-Limit"] == "3"
+        assert response.headers["X-RateLimit-Remaining"] == "2"
+        assert response.headers["X-RateLimit-Reset"] == "60"
+
+        client.get("/test")
+        client.get("/test")
+        blocked = client.get("/test")
+        assert blocked.status_code == 429
+        assert blocked.headers["Retry-After"] == "60"
+        assert blocked.headers["X-RateLimit-Remaining"] == "0"
+        assert "Rate limit exceeded" in blocked.json()["detail"]
+
+    def test_excluded_paths_are_not_counted(self, app, mock_async_redis):
+        @app.get("/health_check")
+        async def health():
+            return {"status": "healthy"}
+
+        client = TestClient(app)
+        for _ in range(5):
+            assert client.get("/health_check").status_code == 200
+        assert not mock_async_redis.data
+
+    def test_streaming_responses_pass_through(self, app):
+        client = TestClient(app)
+
+        with client.stream("GET", "/stream") as response:
+            chunks = list(response.iter_text())
+
+        assert "".join(chunks) == "chunk-0;chunk-1;chunk-2;"
+        assert response.headers["X-Request-ID"]
+        assert response.headers["X-RateLimit-Limit"] == "3"
+
+
+class TestLuaRateLimiting:
+    """Tests for single-round-trip rate limiting (middleware/rate_limit_backends.py)."""
+
+    @pytest.fixture
+    def backend(self, mock_async_redis):
+        from middleware.rate_limit_backends import RedisRateLimitBackend
+        return RedisRateLimitBackend(mock_async_redis)
+
+    async def test_one_round_trip_per_request(self, backend, mock_async_redis):
+        await backend.hit("rate_limit:1.2.3.4", 5, 60)  # Loads the script
+        mock_async_redis.round_trips = 0
+
+        for _ in range(4):
+            await backend.hit("rate_limit:1.2.3.4", 5, 60)
+        assert mock_async_redis.round_trips == 4
+
+    async def test_counts_remaining_and_blocks(self, backend):
+        results = [await backend.hit("rate_limit:ip", 3, 60) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results] == [2, 1, 0, 0]
+        assert all(r.reset == 60 for r in results)
+
+    async def test_window_is_not_extended_by_later_requests(self, backend, mock_async_redis):
+        now = [1000.0]
+        mock_async_redis.clock = lambda: now[0]
+
+        await backend.hit("rate_limit:ip", 2, 60)
+        now[0] += 45
+        await backend.hit("rate_limit:ip", 2, 60)
+        blocked = await backend.hit("rate_limit:ip", 2, 60)
+        assert not blocked.allowed
+        assert blocked.reset == 15
+
+        now[0] += 15
+        assert (await backend.hit("rate_limit:ip", 2, 60)).allowed
+
+    async def test_script_is_reloaded_after_redis_restart(self, backend, mock_async_redis):
+        await backend.hit("rate_limit:ip", 5, 60)
+        mock_async_redis.scripts.clear()  # SCRIPT FLUSH / restart
+
+        assert (await backend.hit("rate_limit:ip", 5, 60)).remaining == 3
+
+    def test_middleware_falls_back_to_local_limits_when_redis_errors(self, mock_async_redis, monkeypatch):
+        app = FastAPI()
+
+        @app.get("/test")
+        async def test_endpoint():
+            return {"message": "success"}
+
+        async def broken(*args, **kwargs):
+            raise ConnectionError("redis down")
+        monkeypatch.setattr(mock_async_redis, "evalsha", broken)
+
+        with patch("middleware.rate_limiter.get_redis_async_client", return_value=mock_async_redis):
+            app.add_middleware(RateLimiterMiddleware, calls=1, period=60)
+            client = TestClient(app)
+            responses = [client.get("/test") for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [200, 429, 429]
+        assert responses[0].headers["X-RateLimit-Remaining"] == "0"
+
+    def test_endpoint_rate_limiter(self, mock_async_redis):
+        from middleware.endpoint_rate_limiter import EndpointRateLimiter
+
+        with patch("middleware.endpoint_rate_limiter.get_redis_async_client", return_value=mock_async_redis):
+            limiter = EndpointRateLimiter(calls=2, period=60, algorithm="fixed_window")
+
+        app = FastAPI()
+
+        @app.post("/orders")
+        @limiter
+        async def create_order(request: Request):
+            return {"ok": True}
+
+        client = TestClient(app)
+        assert [client.post("/orders").status_code for _ in range(3)] == [200, 200, 429]
+        assert client.post("/orders").headers["Retry-After"] == "60"
+
+
+class TestRateLimitAlgorithms:
+    """Tests for sliding-window and GCRA limits and per-route-group budgets."""
+
+    @pytest.fixture
+    def clock(self, mock_async_redis):
+        now = [6000.0]  # A window boundary for 60s windows
+        mock_async_redis.clock = lambda: now[0]
+        return now
+
+    @pytest.fixture
+    def backend(self, mock_async_redis):
+        from middleware.rate_limit_backends import RedisRateLimitBackend
+        return RedisRateLimitBackend(mock_async_redis)
+
+    async def test_sliding_window_blocks_boundary_bursts(self, backend, clock):
+        async def burst(algorithm, count):
+            return sum([(await backend.hit(algorithm, 10, 60, algorithm)).allowed for _ in range(count)])
+
+        for algorithm in ("fixed_window", "sliding_window"):
+            assert await burst(algorithm, 1) == 1
+        clock[0] += 59
+        assert await burst("fixed_window", 9) == 9
+        assert await burst("sliding_window", 9) == 9
+        clock[0] += 2  # Both windows rolled over
+
+        assert await burst("fixed_window", 10) == 10  # 19 requests in 2 seconds
+        assert await burst("sliding_window", 10) == 0
+
+    async def test_sliding_window_retry_after_is_accurate(self, backend, clock):
+        for _ in range(10):
+            assert (await backend.hit("ip", 10, 60, "sliding_window")).allowed
+
+        blocked = await backend.hit("ip", 10, 60, "sliding_window")
+        assert not blocked.allowed
+        assert blocked.retry_after == 66  # 10 * (54/60) + 1 <= 10 six seconds into the next window
+        assert blocked.reset == 120
+
+        clock[0] += 65
+        assert not (await backend.hit("ip", 10, 60, "sliding_window")).allowed
+        clock[0] += 1
+        assert (await backend.hit("ip", 10, 60, "sliding_window")).allowed
+
+    async def test_rejected_requests_do_not_extend_the_lockout(self, backend, clock):
+        for _ in range(10):
+            await backend.hit("ip", 10, 60, "sliding_window")
+
+        for _ in range(100):  # A client hammering while blocked
+            clock[0] += 1
+            result = await backend.hit("ip", 10, 60, "sliding_window")
+            if result.allowed:
+                break
+        assert result.allowed
+        assert clock[0] - 6000 == 66
+
+    async def test_gcra_allows_burst_then_spaces_requests(self, backend, clock):
+        results = [await backend.hit("ip", 10, 60, "gcra") for _ in range(11)]
+
+        assert [r.remaining for r in results[:10]] == list(range(9, -1, -1))
+        assert not results[10].allowed
+        assert results[10].retry_after == 6  # One request every period / limit
+        assert results[10].reset == 60
+
+        clock[0] += 6
+        assert (await backend.hit("ip", 10, 60, "gcra")).allowed
+        assert not (await backend.hit("ip", 10, 60, "gcra")).allowed
+
+    async def test_zero_limit_always_blocks(self, backend, clock):
+        for algorithm in ("fixed_window", "sliding_window", "gcra"):
+            result = await backend.hit(f"ip:{algorithm}", 0, 60, algorithm)
+            assert not result.allowed
+            assert result.retry_after > 0
+
+    def test_unknown_algorithm_is_rejected(self):
+        with pytest.raises(ValueError):
+            RateLimiterMiddleware(app=None, algorithm="leaky")
+
+    def test_route_groups_have_separate_budgets(self, mock_async_redis):
+        from middleware.rate_limiter import RouteGroup
+
+        app = FastAPI()
+
+        @app.get("/api/productos")
+        async def productos():
+            return []
+
+        @app.post("/api/boletas")
+        async def boletas():
+            return {"ok": True}
+
+        @app.get("/api/boletas/{email}")
+        async def boletas_de(email: str):
+            return []
+
+        groups = (
+            RouteGroup("checkout", ("POST",), ("/api/boletas",), 2, 60, "gcra"),
+            RouteGroup("catalog", ("GET",), ("/api/productos",), 5, 60, "sliding_window"),
+        )
+        with patch("middleware.rate_limiter.get_redis_async_client", return_value=mock_async_redis):
+            app.add_middleware(RateLimiterMiddleware, calls=3, period=60, route_groups=groups)
+            client = TestClient(app)
+
+            assert [client.post("/api/boletas").status_code for _ in range(3)] == [200, 200, 429]
+            catalog = [client.get("/api/productos") for _ in range(5)]
+            other = client.get("/api/boletas/a@b.cl")
+
+        assert all(r.status_code == 200 for r in catalog)
+        assert catalog[0].headers["X-RateLimit-Limit"] == "5"
+        assert other.headers["X-RateLimit-Limit"] == "3"  # GET falls through to the default budget
+        assert {key.rsplit(":", 1)[0] for key in mock_async_redis.data} >= {
+            "rate_limit:checkout", "rate_limit:catalog:testclient", "rate_limit:testclient",
+        }
+
+
+class TestLocalRateLimitFallback:
+    """Tests for the in-memory fallback used while Redis is down."""
+
+    @pytest.fixture
+    def clock(self):
+        return [100.0]
+
+    async def test_token_bucket_refills_over_time(self, clock):
+        from middleware.rate_limit_backends import LocalRateLimitBackend
+        local = LocalRateLimitBackend(clock=lambda: clock[0])
+
+        results = [await local.hit("ip", 10, 60) for _ in range(11)]
+        assert [r.remaining for r in results[:10]] == list(range(9, -1, -1))
+        assert not results[10].allowed
+        assert results[10].retry_after == 6  # One token every 6 seconds
+        assert results[10].reset == 60
+
+        clock[0] += 6
+        assert (await local.hit("ip", 10, 60)).allowed
+        assert not (await local.hit("ip", 10, 60)).allowed
+
+    async def test_memory_is_bounded_by_lru(self, clock):
+        from middleware.rate_limit_backends import LocalRateLimitBackend
+        local = LocalRateLimitBackend(max_keys=3, clock=lambda: clock[0])
+
+        for key in ("a", "b", "c"):
+            await local.hit(key, 1, 60)
+        await local.hit("a", 1, 60)  # "a" is now the most recently used
+        await local.hit("d", 1, 60)
+
+        assert len(local) == 3
+        assert not (await local.hit("a", 1, 60)).allowed
+        assert (await local.hit("b", 1, 60)).allowed  # Evicted: full bucket again
+
+    async def test_switches_to_local_and_back_to_redis(self, mock_async_redis, monkeypatch, clock):
+        from middleware.rate_limit_backends import FailoverRateLimitBackend
+        from utils.circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=5, half_open_calls=1, clock=lambda: clock[0])
+        backend = FailoverRateLimitBackend(mock_async_redis, breaker=breaker, clock=lambda: clock[0])
+        working = mock_async_redis.evalsha
+        probes = []
+
+        async def broken(*args, **kwargs):
+            probes.append(clock[0])
+            raise ConnectionError("redis down")
+
+        await backend.hit("ip", 3, 60, "fixed_window")
+        monkeypatch.setattr(mock_async_redis, "evalsha", broken)
+
+        results = [await backend.hit("ip", 3, 60, "fixed_window") for _ in range(4)]
+        assert backend.mode == "local"
+        assert breaker.state == "open"
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert probes == [100.0]  # Redis is skipped while the circuit is open
+
+        monkeypatch.setattr(mock_async_redis, "evalsha", working)
+        clock[0] += 5
+        result = await backend.hit("ip", 3, 60, "fixed_window")
+        assert backend.mode == "redis"
+        assert breaker.state == "closed"
+        assert result.remaining == 1  # Counted in Redis again
+
+    def test_middleware_limits_without_redis(self):
+        app = FastAPI()
+
+        @app.get("/test")
+        async def test_endpoint():
+            return {"message": "success"}
+
+        with patch("middleware.rate_limiter.get_redis_async_client", return_value=None):
+            app.add_middleware(RateLimiterMiddleware, calls=2, period=60)
+            client = TestClient(app)
+            responses = [client.get("/test") for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [200, 200, 429]
+        assert responses[2].headers["Retry-After"] == "30"
+
+    def test_endpoint_rate_limiter_without_redis(self):
+        from middleware.endpoint_rate_limiter import EndpointRateLimiter
+
+        with patch("middleware.endpoint_rate_limiter.get_redis_async_client", return_value=None):
+            limiter = EndpointRateLimiter(calls=1, period=60)
+
+        app = FastAPI()
+
+        @app.post("/orders")
+        @limiter
+        async def create_order(request: Request):
+            return {"ok": True}
+
+        client = TestClient(app)
+        assert [client.post("/orders").status_code for _ in range(2)] == [200, 429]
@@ -0,0 +1,187 @@
+"""Tests for keyset (cursor) pagination of products and generic repositories."""
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from controllers.compat_controller import PRODUCT_SORT_ORDERS, list_productos
+from models.category import CategoryModel
+from models.product import ProductModel
+from repositories.category_repository import CategoryRepository
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Seed 25 products with duplicated names and prices to exercise tie-breaks."""
+    category = CategoryModel(name="Librería")
+    db_session.add(category)
+    db_session.flush()
+
+    for i in range(25):
+        db_session.add(ProductModel(
+            name=f"Producto {i % 7}",
+            price=float(10 + i % 5),
+            stock=i % 3,
+            category_id=category.id_key,
+        ))
+    db_session.commit()
+    return category
+
+
+def list_page(db_session, **params):
+    defaults = dict(q=None, categoria=None, precioMin=None, precioMax=None, conStock=False,
+                    sort=None, page=1, limit=12, cursor=None)
+    defaults.update(params)
+    return json.loads(list_productos(db=db_session, **defaults).body)
+
+
+class TestCursorTokens:
+    """Tests for opaque cursor encoding."""
+
+    def test_round_trip(self):
+        payload = {"s": "precio_asc", "v": [12.5, 7]}
+        assert decode_cursor(encode_cursor(payload)) == payload
+
+    def test_garbage_token_rejected(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor!!")
+
+
+class TestProductKeysetPagination:
+    """Keyset pages must match offset pages for every supported sort order."""
+
+    @pytest.mark.parametrize("sort", list(PRODUCT_SORT_ORDERS))
+    def test_cursor_walk_matches_offset(self, db_session, catalog, sort):
+        offset_ids = []
+        for page in range(1, 5):
+            offset_ids += [p["id"] for p in list_page(db_session, sort=sort, page=page, limit=7)["productos"]]
+
+        cursor_ids = []
+        result = list_page(db_session, sort=sort, limit=7)
+        while True:
+            cursor_ids += [p["id"] for p in result["productos"]]
+            cursor = result["paginacion"]["siguienteCursor"]
+            if cursor is None:
+                break
+            result = list_page(db_session, sort=sort, limit=7, cursor=cursor)
+            assert result["paginacion"]["pagina"] is None
+
+        assert len(cursor_ids) == 25
+        assert cursor_ids == offset_ids
+
+    def test_cursor_with_filters(self, db_session, catalog):
+        first = list_page(db_session, sort="precio_desc", conStock=True, limit=5)
+        second = list_page(db_session, sort="precio_desc", conStock=True, limit=5,
+                           cursor=first["paginacion"]["siguienteCursor"])
+
+        ids = [p["id"] for p in first["productos"] + second["productos"]]
+        assert len(set(ids)) == 10
+        assert all(p["stock"] > 0 for p in first["productos"] + second["productos"])
+
+    def test_cursor_from_other_sort_rejected(self, db_session, catalog):
+        cursor = list_page(db_session, sort="nombre_asc", limit=5)["paginacion"]["siguienteCursor"]
+
+        with pytest.raises(HTTPException) as exc:
+            list_page(db_session, sort="precio_asc", limit=5, cursor=cursor)
+        assert exc.value.status_code == 400
+
+    @pytest.mark.parametrize("sort, values", [
+        ("reciente", ["x"]),
+        ("nombre_asc", [3, 1]),
+        ("precio_desc", ["caro", 1]),
+        ("precio_asc", [1.5, True]),
+        ("nombre_asc", [None, 1]),
+        ("precio_desc", [None, 1]),
+    ])
+    def test_cursor_values_of_the_wrong_type_rejected(self, db_session, catalog, sort, values):
+        with pytest.raises(HTTPException) as exc:
+            list_page(db_session, sort=sort, limit=5, cursor=encode_cursor({"s": sort, "v": values}))
+        assert exc.value.status_code == 400
+
+    @pytest.mark.parametrize("missing", ["name", "price"])
+    def test_sort_columns_are_not_null(self, db_session, catalog, missing):
+        from sqlalchemy.exc import IntegrityError
+
+        values = dict(name="Sin datos", price=1.0, stock=1, category_id=catalog.id_key)
+        values[missing] = None
+        db_session.add(ProductModel(**values))
+        with pytest.raises(IntegrityError):
+            db_session.flush()
+        db_session.rollback()
+
+    def test_last_page_has_no_cursor(self, db_session, catalog):
+        result = list_page(db_session, limit=50)
+        assert result["paginacion"]["siguienteCursor"] is None
+
+
+class TestRepositoryKeysetPagination:
+    """Tests for BaseRepositoryImpl.find_all(after_id=...)."""
+
+    def test_after_id_returns_next_rows_in_id_order(self, db_session):
+        repo = CategoryRepository(db_session)
+        saved = repo.save_all([CategoryModel(name=f"Cat {i}") for i in range(6)])
+
+        page = repo.find_all(limit=2, after_id=saved[1].id_key)
+
+        assert [c.id_key for c in page] == [saved[2].id_key, saved[3].id_key]
+
+
+class TestProductCountCache:
+    """Tests for the cached/estimated total in paginacion."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch, mock_redis):
+        from services.cache_service import cache_service
+        monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+        monkeypatch.setattr(cache_service, "enabled", True)
+        return mock_redis
+
+    def test_total_is_cached_per_filter_set(self, db_session, catalog, cache):
+        first = list_page(db_session, conStock=True)
+        assert first["paginacion"]["totalExacto"] is True
+
+        count_keys = cache.keys("products:list:count:*")
+        assert len(count_keys) == 1
+
+        # A stale cached total proves the next page didn't count again
+        cache.data[count_keys[0]] = "999"
+        assert list_page(db_session, conStock=True, page=2)["paginacion"]["total"] == 999
+        assert list_page(db_session, conStock=False)["paginacion"]["total"] == 25
+
+    def test_equivalent_filters_share_key(self):
+        from controllers.compat_controller import product_count_key
+
+        assert product_count_key("", None, 10, None, None) == product_count_key(None, "", 10.0, None, False)
+        assert product_count_key("lapiz", None, None, None, False) != product_count_key("lapiz", None, None, None, True)
+
+    def test_product_write_invalidates_counts(self, db_session, catalog, cache):
+        from controllers.compat_controller import ProductBody, admin_create_product
+
+        list_page(db_session)
+        assert cache.keys("products:list:count:*")
+
+        admin_create_product(
+            ProductBody(nombre="Goma", categoria="Librería", precio=5.0, stock=3),
+            db=db_session,
+        )
+
+        assert cache.keys("products:list:count:*") == []
+        assert list_page(db_session)["paginacion"]["total"] == 26
+
+    def test_estimated_mode_falls_back_to_exact_off_postgres(self, db_session, catalog):
+        result = list_page(db_session, conteo="estimado")
+
+        assert result["paginacion"]["total"] == 25
+        assert result["paginacion"]["totalExacto"] is True
+
+    def test_offset_pages_are_ordered_by_id(self, db_session):
+        repo = CategoryRepository(db_session)
+        saved = repo.save_all([CategoryModel(name=f"Cat {i}") for i in range(6)])
+        db_session.query(CategoryModel).filter(CategoryModel.id_key == saved[0].id_key).update({"name": "Z"})
+        db_session.commit()
+
+        first = repo.find_all(skip=0, limit=3)
+        second = repo.find_all(limit=3, after_id=first[-1].id_key)
+
+        assert [c.id_key for c in first + second] == [c.id_key for c in saved]
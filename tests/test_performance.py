@@ -0,0 +1,343 @@
+"""
+Performance Benchmarks
+
+Before/after benchmarks for performance-related changes. Each benchmark
+prints its measurements and asserts the improvement holds.
+
+Run only these with: pytest tests/test_performance.py -m slow -s
+"""
+import asyncio
+import time
+from typing import List
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from config.database import get_db
+from controllers.base_controller_impl import BaseControllerImpl
+from schemas.category_schema import CategorySchema
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, int(round(pct / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+@pytest.mark.slow
+class TestSyncHandlerThreadpool:
+    """Benchmark: blocking CRUD handlers on the event loop vs the threadpool"""
+
+    QUERY_SECONDS = 0.02  # Simulated DB round trip
+    CONCURRENT_REQUESTS = 50
+
+    class SlowService:
+        """Service stub whose get_all blocks like a real DB query"""
+
+        def get_all(self, skip: int = 0, limit: int = 100, after_id=None):
+            time.sleep(TestSyncHandlerThreadpool.QUERY_SECONDS)
+            return [{"id_key": 1, "name": "Electronics"}]
+
+    def _build_event_loop_app(self) -> FastAPI:
+        """Previous behavior: async handler calling the blocking service"""
+        app = FastAPI()
+        service = self.SlowService()
+
+        @app.get("/categories/")
+        async def get_all(skip: int = 0, limit: int = 100, db=Depends(get_db)):
+            return service.get_all(skip=skip, limit=limit)
+
+        return app
+
+    def _build_threadpool_app(self) -> FastAPI:
+        """Current behavior: routes generated by BaseControllerImpl"""
+        app = FastAPI()
+        controller = BaseControllerImpl(
+            schema=CategorySchema,
+            service_factory=lambda db: self.SlowService(),
+        )
+        app.include_router(controller.router, prefix="/categories")
+        return app
+
+    async def _measure(self, app: FastAPI) -> List[float]:
+        """Fire concurrent requests and return per-request latencies (ms)"""
+        app.dependency_overrides[get_db] = lambda: None
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            async def timed_request():
+                start = time.perf_counter()
+                response = await client.get("/categories/")
+                assert response.status_code == 200
+                return (time.perf_counter() - start) * 1000
+
+            return await asyncio.gather(
+                *(timed_request() for _ in range(self.CONCURRENT_REQUESTS))
+            )
+
+    async def test_threadpool_handlers_reduce_p99_latency(self):
+        before = await self._measure(self._build_event_loop_app())
+        after = await self._measure(self._build_threadpool_app())
+
+        before_p99 = percentile(before, 99)
+        after_p99 = percentile(after, 99)
+
+        print(f"\n📊 {self.CONCURRENT_REQUESTS} concurrent requests, "
+              f"{self.QUERY_SECONDS * 1000:.0f}ms blocking query each:")
+        print(f"  async handler (event loop): p50={percentile(before, 50):.1f}ms p99={before_p99:.1f}ms")
+        print(f"  sync handler (threadpool):  p50={percentile(after, 50):.1f}ms p99={after_p99:.1f}ms")
+
+        # Serialized on the loop, p99 approaches N * query time
+        assert after_p99 < before_p99 / 2, \
+            f"Expected threadpool p99 ({after_p99:.1f}ms) well below event loop p99 ({before_p99:.1f}ms)"
+
+
+class TestConfigureThreadpool:
+    """Threadpool size validation"""
+
+    async def test_explicit_size_is_applied(self):
+        from anyio import to_thread
+        from config.threadpool_config import configure_threadpool
+
+        limiter = to_thread.current_default_thread_limiter()
+        previous = limiter.total_tokens
+        try:
+            assert configure_threadpool(7) == 7
+            assert limiter.total_tokens == 7
+        finally:
+            limiter.total_tokens = previous
+
+    @pytest.mark.parametrize("size", [0, -1])
+    async def test_invalid_size_is_rejected(self, size, monkeypatch):
+        from config.constants import ConcurrencyConfig
+        from config.threadpool_config import configure_threadpool
+
+        with pytest.raises(ValueError):
+            configure_threadpool(size)
+
+        monkeypatch.setattr(ConcurrencyConfig, "THREADPOOL_SIZE", size)
+        with pytest.raises(ValueError):
+            configure_threadpool()
+
+
+@pytest.mark.slow
+class TestProductSearchIndexScaling:
+    """Benchmark: in-process search latency vs catalog size"""
+
+    WORDS = ["lapiz", "cuaderno", "goma", "regla", "carpeta", "marcador", "tijera", "compas"]
+
+    @staticmethod
+    def _code(i: int) -> str:
+        """Pseudo-random SKU-like code, unique per product"""
+        return f"{(i * 2654435761) % 2**32:08x}"
+
+    def _build_index(self, size: int):
+        from utils.search import ProductSearchIndex
+
+        class Rows:
+            """Minimal stand-in for db.query(...).all()"""
+            def __init__(self, rows):
+                self.rows = rows
+
+            def query(self, *columns):
+                return self
+
+            def all(self):
+                return self.rows
+
+        rows = [(i, f"{self.WORDS[i % len(self.WORDS)]} {self._code(i)}") for i in range(size)]
+        index = ProductSearchIndex()
+        db = Rows(rows)
+        index.search(db, "warmup")
+        return index, db
+
+    def _measure(self, size: int, rounds: int = 200) -> float:
+        """Median latency (ms) of a selective two-term search"""
+        index, db = self._build_index(size)
+        samples = []
+        for i in range(rounds):
+            start = time.perf_counter()
+            index.search(db, f"tijera {self._code(i * 8 + 6)}")
+            samples.append((time.perf_counter() - start) * 1000)
+        return percentile(samples, 50)
+
+    def test_search_latency_stays_flat(self):
+        small = self._measure(1_000)
+        large = self._measure(100_000)
+
+        print(f"\n📊 Selective search p50: 1k products={small:.3f}ms, 100k products={large:.3f}ms")
+
+        # A linear scan would be ~100x slower on the larger catalog
+        assert large < small * 10, \
+            f"Expected near-flat latency, got {small:.3f}ms -> {large:.3f}ms"
+
+
+@pytest.mark.slow
+class TestCacheInvalidationScaling:
+    """Benchmark: KEYS-based vs indexed delete_pattern with a large keyspace"""
+
+    UNRELATED_KEYS = 100_000
+    PRODUCT_LIST_KEYS = 50
+
+    def test_indexed_invalidation_ignores_unrelated_keys(self, mock_redis):
+        from services.cache_service import CacheService
+
+        cache = CacheService(local=None)
+        cache.redis_client = mock_redis
+        cache.enabled = True
+
+        for i in range(self.UNRELATED_KEYS):
+            mock_redis.data[f"session:{i}"] = "x"
+
+        def seed():
+            for i in range(self.PRODUCT_LIST_KEYS):
+                cache.set(f"products:list:limit:10:skip:{i * 10}", [i])
+
+        # Previous implementation: KEYS pattern + DEL
+        seed()
+        start = time.perf_counter()
+        mock_redis.delete(*mock_redis.keys("products:list:*"))
+        keys_ms = (time.perf_counter() - start) * 1000
+
+        seed()
+        start = time.perf_counter()
+        deleted = cache.delete_pattern("products:list:*")
+        indexed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n📊 Invalidate {self.PRODUCT_LIST_KEYS} keys among {self.UNRELATED_KEYS:,} unrelated keys:")
+        print(f"  KEYS + DEL:      {keys_ms:.2f}ms")
+        print(f"  namespace index: {indexed_ms:.2f}ms")
+
+        assert deleted == self.PRODUCT_LIST_KEYS
+        assert indexed_ms < keys_ms / 10
+
+
+@pytest.mark.slow
+class TestCacheCodecDecodeCost:
+    """Benchmark: per-hit decode cost and payload size, JSON vs the cache codec"""
+
+    ROUNDS = 2000
+
+    PAGE = [
+        {
+            "id_key": i,
+            "name": f"Producto {i} lápiz HB",
+            "price": 9.5 + i,
+            "stock": i % 7,
+            "category_id": i % 5,
+            "image_url": f"https://res.cloudinary.com/demo/image/upload/v1/products/{i}.jpg",
+        }
+        for i in range(100)
+    ]
+
+    def _decode_us(self, decode, payload) -> float:
+        """Median decode time (µs) over ROUNDS runs"""
+        samples = []
+        for _ in range(self.ROUNDS):
+            start = time.perf_counter()
+            decode(payload)
+            samples.append((time.perf_counter() - start) * 1_000_000)
+        return percentile(samples, 50)
+
+    def test_msgpack_decodes_faster_and_compression_shrinks_payloads(self):
+        import json
+        pytest.importorskip("msgpack")
+        from services.cache_codec import CacheCodec
+
+        legacy = json.dumps(self.PAGE)
+        msgpack_codec = CacheCodec(codec="msgpack", compress_min_bytes=0)
+        compressed_codec = CacheCodec(codec="msgpack", compress_min_bytes=1024)
+        plain, compressed = msgpack_codec.encode(self.PAGE), compressed_codec.encode(self.PAGE)
+
+        json_us = self._decode_us(json.loads, legacy)
+        msgpack_us = self._decode_us(msgpack_codec.decode, plain)
+        compressed_us = self._decode_us(compressed_codec.decode, compressed)
+
+        print(f"\n📊 Decode a {len(self.PAGE)}-product page (p50):")
+        print(f"  json.loads (previous):  {json_us:.1f}µs, {len(legacy.encode()):,} bytes")
+        print(f"  msgpack:                {msgpack_us:.1f}µs, {len(plain):,} bytes")
+        print(f"  msgpack + zlib:         {compressed_us:.1f}µs, {len(compressed):,} bytes")
+
+        assert msgpack_us < json_us
+        assert len(compressed) < len(legacy.encode()) / 4
+
+
+@pytest.mark.slow
+class TestMiddlewareStackOverhead:
+    """Benchmark: per-request cost of BaseHTTPMiddleware vs pure ASGI middleware"""
+
+    REQUESTS = 1000
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        return app
+
+    def _build_base_http_app(self, mock_redis) -> FastAPI:
+        """Previous behavior: the same two layers as BaseHTTPMiddleware dispatchers"""
+        from starlette.middleware.base import BaseHTTPMiddleware
+
+        app = self._build_app()
+
+        async def request_id(request, call_next):
+            request.state.request_id = request.headers.get("X-Request-ID") or "generated"
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request.state.request_id
+            return response
+
+        async def rate_limit(request, call_next):
+            pipe = mock_redis.pipeline()
+            pipe.incr("rate_limit:bench")
+            pipe.expire("rate_limit:bench", 60)
+            pipe.execute()
+            response = await call_next(request)
+            response.headers["X-RateLimit-Remaining"] = str(mock_redis.get("rate_limit:bench"))
+            return response
+
+        app.add_middleware(BaseHTTPMiddleware, dispatch=request_id)
+        app.add_middleware(BaseHTTPMiddleware, dispatch=rate_limit)
+        return app
+
+    def _build_asgi_app(self, mock_async_redis) -> FastAPI:
+        """Current behavior: the middleware classes added by create_fastapi_app"""
+        from unittest.mock import patch
+
+        from middleware.rate_limiter import RateLimiterMiddleware
+        from middleware.request_id_middleware import RequestIDMiddleware
+
+        app = self._build_app()
+        app.add_middleware(RequestIDMiddleware)
+        with patch("middleware.rate_limiter.get_redis_async_client", return_value=mock_async_redis):
+            app.add_middleware(RateLimiterMiddleware, calls=10 ** 9, period=60)
+            app.middleware_stack = app.build_middleware_stack()  # Instantiate while patched
+        return app
+
+    async def _measure(self, app) -> float:
+        """p50 latency (µs) of sequential requests"""
+        samples = []
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            for _ in range(self.REQUESTS):
+                start = time.perf_counter()
+                response = await client.get("/ping")
+                samples.append((time.perf_counter() - start) * 1_000_000)
+                assert response.status_code == 200
+        return percentile(samples, 50)
+
+    async def test_pure_asgi_middleware_removes_per_request_overhead(self, mock_redis, mock_async_redis):
+        bare_us = await self._measure(self._build_app())
+        base_http_us = await self._measure(self._build_base_http_app(mock_redis))
+        asgi_us = await self._measure(self._build_asgi_app(mock_async_redis))
+
+        print(f"\n📊 Sequential GET /ping, {self.REQUESTS} requests (p50):")
+        print(f"  no middleware:                  {bare_us:.0f}µs")
+        print(f"  2x BaseHTTPMiddleware (before): {base_http_us:.0f}µs (+{base_http_us - bare_us:.0f}µs)")
+        print(f"  2x pure ASGI (after):           {asgi_us:.0f}µs (+{asgi_us - bare_us:.0f}µs)")
+
+        limiter_counts = [count for key, count in mock_async_redis.data.items() if key.startswith("rate_limit:")]
+        assert [int(count) for count in limiter_counts] == [self.REQUESTS]  # The limiter was active
+        assert asgi_us < base_http_us
@@ -0,0 +1,118 @@
+"""Tests for accent-insensitive product search (utils/search.py)."""
+import json
+
+import pytest
+
+from controllers.compat_controller import list_productos
+from models.category import CategoryModel
+from models.product import ProductModel
+from utils.search import (
+    ProductSearchIndex,
+    escape_like,
+    normalize_text,
+    product_search_filter,
+    product_search_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_search_index():
+    """The in-process index never carries products over from another test"""
+    product_search_index.invalidate()
+    yield
+    product_search_index.invalidate()
+
+
+@pytest.fixture
+def products(db_session):
+    category = CategoryModel(name="Librería")
+    db_session.add(category)
+    db_session.flush()
+
+    names = ["Lápiz HB", "Lapicera Azul", "Cuaderno Rivadavia", "Goma de Borrar", "Lápiz Color 100%"]
+    for name in names:
+        db_session.add(ProductModel(name=name, price=10.0, stock=5, category_id=category.id_key))
+    db_session.commit()
+    return {p.name: p.id_key for p in db_session.query(ProductModel).all()}
+
+
+def search_names(db_session, q):
+    result = list_productos(
+        q=q, categoria=None, precioMin=None, precioMax=None, conStock=False,
+        sort="nombre_asc", page=1, limit=50, cursor=None, conteo=None, db=db_session,
+    )
+    return [p["nombre"] for p in json.loads(result.body)["productos"]]
+
+
+class TestNormalizeText:
+    """Tests for search normalization."""
+
+    def test_strips_accents_case_and_spaces(self):
+        assert normalize_text("  Lápiz   HB ") == "lapiz hb"
+        assert normalize_text("ÑANDÚ") == "nandu"
+
+    def test_empty_values(self):
+        assert normalize_text(None) == ""
+        assert normalize_text("   ") == ""
+
+    def test_escape_like(self):
+        assert escape_like("100%_a") == "100\\%\\_a"
+
+
+class TestProductSearchIndex:
+    """Tests for the in-process trigram index."""
+
+    def test_accent_insensitive_match(self, db_session, products):
+        assert ProductSearchIndex().search(db_session, "lapiz") == {
+            products["Lápiz HB"], products["Lápiz Color 100%"]
+        }
+
+    def test_all_terms_must_match(self, db_session, products):
+        assert ProductSearchIndex().search(db_session, "LAPIZ hb") == {products["Lápiz HB"]}
+
+    def test_short_terms_scan_names(self, db_session, products):
+        assert ProductSearchIndex().search(db_session, "hb") == {products["Lápiz HB"]}
+
+    def test_no_match(self, db_session, products):
+        assert ProductSearchIndex().search(db_session, "tijera") == set()
+
+    def test_stale_until_invalidated(self, db_session, products):
+        index = ProductSearchIndex()
+        assert index.search(db_session, "tijera") == set()
+
+        db_session.add(ProductModel(name="Tijera Escolar", price=5.0, stock=1))
+        db_session.commit()
+        assert index.search(db_session, "tijera") == set()
+
+        index.invalidate()
+        assert len(index.search(db_session, "tijera")) == 1
+
+    def test_blank_query_has_no_filter(self, db_session):
+        assert product_search_filter(db_session, "   ") is None
+
+
+class TestCatalogSearch:
+    """Tests for the q filter of GET /api/productos."""
+
+    def test_unaccented_query_finds_accented_names(self, db_session, products):
+        assert search_names(db_session, "lapiz") == ["Lápiz Color 100%", "Lápiz HB"]
+
+    def test_substring_match(self, db_session, products):
+        assert search_names(db_session, "rivada") == ["Cuaderno Rivadavia"]
+
+    def test_wildcards_matched_literally(self, db_session, products):
+        assert search_names(db_session, "100%") == ["Lápiz Color 100%"]
+        assert search_names(db_session, "%") == ["Lápiz Color 100%"]
+
+    def test_no_results(self, db_session, products):
+        assert search_names(db_session, "tijera") == []
+
+    def test_admin_create_refreshes_index(self, db_session, products):
+        from controllers.compat_controller import ProductBody, admin_create_product
+
+        assert search_names(db_session, "tijera") == []
+        admin_create_product(
+            ProductBody(nombre="Tijéra Escolar", categoria="Librería", precio=5.0, stock=3),
+            db=db_session,
+        )
+        assert search_names(db_session, "tijera") == ["Tijéra Escolar"]
@@ -0,0 +1,236 @@
+"""
+Circuit Breaker
+
+Stops calling a dependency that is failing or slow, so callers fall back at
+once instead of each waiting for a socket timeout.
+
+States:
+    closed      Calls go through. Outcomes are counted in a rolling window
+                of one-second buckets; once it holds at least min_calls, the
+                circuit opens when the share of failed calls reaches
+                failure_rate or the share of calls slower than
+                slow_call_seconds reaches slow_call_rate.
+    open        Calls are refused (allow() is False) for open_seconds.
+    half_open   Up to half_open_calls trial calls are let through. If all of
+                them succeed quickly the circuit closes; the first failed or
+                slow one opens it again.
+
+Thread-safe; one breaker can be shared by sync code in threadpool workers
+and async code on the event loop.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with error-rate and latency thresholds"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 0.25,
+        slow_call_rate: float = 0.5,
+        min_calls: int = 20,
+        window_seconds: float = 10.0,
+        open_seconds: float = 5.0,
+        half_open_calls: int = 3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Dependency name (logs, health output)
+            failure_rate: Share of failed calls that opens the circuit
+            slow_call_seconds: Calls taking at least this long count as slow
+            slow_call_rate: Share of slow calls that opens the circuit
+            min_calls: Calls needed in the window before rates are evaluated
+            window_seconds: Rolling window length
+            open_seconds: How long the circuit stays open before probing
+            half_open_calls: Trial calls needed to close the circuit again
+            clock: Monotonic time source in seconds
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the circuit and forget every recorded call"""
+        with self._lock:
+            self._state = CLOSED
+            self._buckets: Deque[List[int]] = deque()  # [second, calls, failures, slow]
+            self._opened_at = 0.0
+            self._trials = 0
+            self._trial_successes = 0
+            self._last_success_at: Optional[float] = None
+            self.times_opened = 0
+            self.short_circuited = 0
+
+    # -- state ------------------------------------------------------------
+
+    def _current_state(self, now: float) -> str:
+        """State at now, moving open -> half_open once open_seconds passed"""
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+            logger.info(f"🔄 Circuit '{self.name}' half-open: probing")
+        return self._state
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open"""
+        with self._lock:
+            return self._current_state(self.clock())
+
+    def is_open(self) -> bool:
+        """True while calls are refused outright (no trial calls left to make)"""
+        return self.state == OPEN
+
+    def succeeded_within(self, seconds: float) -> bool:
+        """True if a call succeeded in the last ``seconds`` and the circuit is closed"""
+        with self._lock:
+            now = self.clock()
+            return (
+                self._current_state(now) == CLOSED
+                and self._last_success_at is not None
+                and now - self._last_success_at < seconds
+            )
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._buckets.clear()
+        self.times_opened += 1
+        logger.warning(f"⚠️  Circuit '{self.name}' open for {self.open_seconds}s: {reason}")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._buckets.clear()
+        logger.info(f"✅ Circuit '{self.name}' closed")
+
+    # -- calls ------------------------------------------------------------
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be made now
+
+        Every allowed call must be followed by record(), so half-open trial
+        slots are given back.
+        """
+        with self._lock:
+            state = self._current_state(self.clock())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        """
+        Record the outcome of an allowed call
+
+        Args:
+            seconds: Call duration
+            failed: True if the dependency failed (not for errors of the caller)
+        """
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            now = self.clock()
+            state = self._current_state(now)
+            if not failed:
+                self._last_success_at = now
+
+            if state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now, "trial call failed" if failed else f"trial call took {seconds * 1000:.0f}ms")
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._close()
+                return
+            if state == OPEN:
+                return  # Allowed before the circuit opened
+
+            second = int(now)
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append([second, 0, 0, 0])
+            bucket = self._buckets[-1]
+            bucket[1] += 1
+            bucket[2] += failed
+            bucket[3] += slow
+
+            calls, failures, slow_calls = self._totals(now)
+            if calls < self.min_calls:
+                return
+            if failures / calls >= self.failure_rate:
+                self._open(now, f"{failures}/{calls} calls failed")
+            elif slow_calls / calls >= self.slow_call_rate:
+                self._open(now, f"{slow_calls}/{calls} calls slower than {self.slow_call_seconds * 1000:.0f}ms")
+
+    def _totals(self, now: float) -> Tuple[int, int, int]:
+        """Calls, failures and slow calls in the window (drops expired buckets)"""
+        horizon = now - self.window_seconds
+        while self._buckets and self._buckets[0][0] + 1 <= horizon:
+            self._buckets.popleft()
+        calls = failures = slow_calls = 0
+        for _, bucket_calls, bucket_failures, bucket_slow in self._buckets:
+            calls += bucket_calls
+            failures += bucket_failures
+            slow_calls += bucket_slow
+        return calls, failures, slow_calls
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        State, window counts and thresholds (for /health_check)
+
+        Returns:
+            {"state", "calls", "failures", "slow_calls", "times_opened",
+             "short_circuited", "retry_in_seconds", "thresholds": {...}}
+        """
+        with self._lock:
+            now = self.clock()
+            state = self._current_state(now)
+            calls, failures, slow_calls = self._totals(now)
+            retry_in = self.open_seconds - (now - self._opened_at) if state == OPEN else None
+            return {
+                "state": state,
+                "calls": calls,
+                "failures": failures,
+                "slow_calls": slow_calls,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+                "retry_in_seconds": round(retry_in, 2) if retry_in is not None else None,
+                "thresholds": {
+                    "failure_rate": self.failure_rate,
+                    "slow_call_ms": self.slow_call_seconds * 1000,
+                    "slow_call_rate": self.slow_call_rate,
+                    "min_calls": self.min_calls,
+                    "window_seconds": self.window_seconds,
+                    "open_seconds": self.open_seconds,
+                },
+            }
@@ -0,0 +1,141 @@
+"""
+Pagination Utilities
+
+Keyset (cursor) pagination helpers. Instead of OFFSET, which scans and throws
+away every skipped row, a keyset page continues from the sort values of the
+last row already returned, so deep pages cost the same as the first one.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON payload.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token is malformed or doesn't match the query"""
+    pass
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """
+    Encode a cursor payload as an opaque token
+
+    Args:
+        payload: JSON-serializable values identifying the last row of a page
+
+    Returns:
+        URL-safe token without padding
+    """
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """
+    Decode a cursor token produced by encode_cursor
+
+    Raises:
+        InvalidCursorError: If the token can't be decoded
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    if not isinstance(payload, dict):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return payload
+
+
+def keyset_filter(
+    order: Sequence[Tuple[ColumnElement, bool]],
+    values: List[Any]
+) -> ColumnElement:
+    """
+    Build the WHERE clause selecting rows strictly after a cursor position
+
+    When every column sorts the same way this is a row-value comparison,
+    ``(a, b) > (x, y)``, which Postgres answers with a single range scan on a
+    composite index. Mixed directions expand to
+    ``a > x OR (a = x AND b < y)``. The last column must be unique
+    (e.g. id_key) so the position is unambiguous, and every column must be
+    NOT NULL: a comparison with NULL is never true, so NULL rows would be
+    skipped and a NULL cursor value would end pagination early.
+
+    Args:
+        order: (column, ascending) pairs matching the query's ORDER BY
+        values: Cursor values, one per column
+
+    Returns:
+        SQLAlchemy boolean clause
+
+    Raises:
+        InvalidCursorError: If the values don't match the sort columns in
+            number or type, or one of them is null
+    """
+    if not isinstance(values, list) or len(order) != len(values):
+        raise InvalidCursorError("Cursor does not match sort order")
+    for (column, _), value in zip(order, values):
+        if not _matches_column_type(column, value):
+            raise InvalidCursorError("Cursor value does not match its sort column")
+
+    columns = [column for column, _ in order]
+    directions = {ascending for _, ascending in order}
+
+    if len(directions) == 1:
+        ascending = directions.pop()
+        row, position = tuple_(*columns), tuple_(*values)
+        return row > position if ascending else row < position
+
+    clauses = []
+    for i, (column, ascending) in enumerate(order):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        after = column > values[i] if ascending else column < values[i]
+        clauses.append(and_(*equal_prefix, after) if equal_prefix else after)
+    return or_(*clauses)
+
+
+def _matches_column_type(column: ColumnElement, value: Any) -> bool:
+    """Whether a decoded cursor value can be compared with a column"""
+    if value is None:
+        return False
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return True
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def order_by_clauses(order: Sequence[Tuple[ColumnElement, bool]]) -> list:
+    """Convert (column, ascending) pairs to ORDER BY clauses"""
+    return [column.asc() if ascending else column.desc() for column, ascending in order]
+
+
+def next_cursor(
+    row: Optional[Any],
+    fields: Sequence[str],
+    **extra: Any
+) -> Optional[str]:
+    """
+    Build the cursor pointing after ``row``
+
+    Args:
+        row: Last row of the current page (None when the page wasn't full)
+        fields: Attribute names matching the sort columns
+        **extra: Extra payload entries (e.g. the sort key) to bind the cursor
+
+    Returns:
+        Cursor token, or None if there is no next page
+    """
+    if row is None:
+        return None
+    return encode_cursor({"v": [getattr(row, field) for field in fields], **extra})